@@ -0,0 +1,95 @@
+"""
+Спільні функції стендів продуктивності: перцентилі, зведення затримок,
+метадані запуску та порівняння результатів між комітами.
+"""
+import json
+import os
+import platform
+import subprocess
+import time
+from typing import Dict, List, Optional
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Метрики, що порівнюються з базовим запуском: (шлях у результатах, чи "більше - краще")
+COMPARED_METRICS = (
+    (("overall", "p50_ms"), False),
+    (("overall", "p95_ms"), False),
+    (("overall", "p99_ms"), False),
+    (("throughput_updates_per_s",), True),
+    (("allocations", "peak_bytes_per_update_avg"), False),
+)
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Повертає перцентиль (метод найближчого рангу) або None для порожнього списку."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
+
+
+def summarize(values: List[float]) -> Dict[str, Optional[float]]:
+    """Повертає зведення затримок у мілісекундах."""
+    return {
+        "count": len(values),
+        "p50_ms": percentile(values, 50),
+        "p95_ms": percentile(values, 95),
+        "p99_ms": percentile(values, 99),
+        "mean_ms": sum(values) / len(values) if values else None,
+        "max_ms": max(values) if values else None,
+    }
+
+
+def run_metadata() -> Dict[str, str]:
+    """Повертає метадані запуску: коміт, версію Python, платформу та час."""
+    try:
+        revision = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        revision = "unknown"
+    return {
+        "commit": revision,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def _lookup(results: dict, path: tuple) -> Optional[float]:
+    value = results
+    for key in path:
+        if not isinstance(value, dict) or key not in value:
+            return None
+        value = value[key]
+    return value
+
+
+def compare_results(baseline_path: str, current: dict, max_regression_pct: float) -> bool:
+    """
+    Друкує порівняння з базовими результатами й повідомляє, чи немає регресій.
+
+    :param baseline_path: JSON-файл результатів попереднього запуску.
+    :param current: Результати поточного запуску.
+    :param max_regression_pct: Допустиме погіршення метрики, %.
+    :returns: True, якщо жодна метрика не погіршилася більше ніж на ``max_regression_pct``.
+    """
+    with open(baseline_path, "r", encoding="utf-8") as file_handle:
+        baseline = json.load(file_handle)
+    print(f"Comparison with {baseline.get('meta', {}).get('commit', baseline_path)}:")
+    ok = True
+    for path, higher_is_better in COMPARED_METRICS:
+        old, new = _lookup(baseline, path), _lookup(current, path)
+        if not old or new is None:
+            continue
+        change = (new - old) / old * 100.0
+        regression = -change if higher_is_better else change
+        marker = ""
+        if regression > max_regression_pct:
+            marker = "  <-- REGRESSION"
+            ok = False
+        print(f"  {'.'.join(path):40} {old:12.3f} -> {new:12.3f} ({change:+.1f}%){marker}")
+    return ok
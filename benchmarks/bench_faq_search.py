@@ -0,0 +1,113 @@
+"""
+Стенд швидкодії пошуку FAQ.
+
+Будує індекс :class:`for_test.faq_search.FaqIndex` для ``faq.json`` і для
+синтетичної бази з тисячами питань (див. :func:`synthetic_faq`) та вимірює
+час побудови індексу і затримку пошуку довільного тексту (p50/p95/p99).
+
+Приклад::
+
+    cd /opt/mytgbot
+    python benchmarks/bench_faq_search.py --entries 5000 --queries 2000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from typing import Dict, List
+from bench_common import REPO_ROOT, run_metadata, summarize
+
+
+def synthetic_faq(base: Dict[str, Dict[str, str]], entries: int, seed: int = 1) -> Dict[str, Dict[str, str]]:
+    """
+    Генерує базу FAQ заданого розміру для кожної мови.
+
+    Словник - слова питань ``base`` плюс стільки ж нових слів, скільки питань
+    (склеєні початки й закінчення реальних слів). Слова в питаннях обираються
+    з розподілом Ципфа, як у природній мові: кілька слів трапляються дуже часто,
+    більшість - рідко.
+    """
+    rng = random.Random(seed)
+    data = {}
+    for lang, questions in base.items():
+        words = sorted({word for question in questions for word in question.rstrip("?").lower().split()})
+        vocabulary = list(words)
+        while len(vocabulary) < len(words) + entries:
+            head, tail = rng.choice(words), rng.choice(words)
+            vocabulary.append(head[:max(2, len(head) // 2)] + tail[len(tail) // 2:])
+        weights = [1.0 / rank for rank in range(1, len(vocabulary) + 1)]
+        generated = dict(questions)
+        while len(generated) < entries:
+            question = rng.choices(vocabulary, weights=weights, k=rng.randint(4, 9))
+            generated[" ".join(question).capitalize() + "?"] = f"Відповідь {len(generated)}"
+        data[lang] = generated
+    return data
+
+
+def make_queries(data: Dict[str, Dict[str, str]], count: int, seed: int = 2) -> List[tuple]:
+    """Генерує запити: частини питань зі зміненими закінченнями та випадковий шум."""
+    rng = random.Random(seed)
+    pool = [(lang, question) for lang, questions in data.items() for question in questions]
+    queries = []
+    for _ in range(count):
+        lang, question = rng.choice(pool)
+        words = question.rstrip("?").split()
+        words = rng.sample(words, k=max(1, len(words) // 2))
+        # Імітуємо інше закінчення слова / друкарську помилку
+        words = [word[:-1] if len(word) > 5 and rng.random() < 0.5 else word for word in words]
+        queries.append((lang, " ".join(words)))
+    return queries
+
+
+def measure(index, queries: List[tuple]) -> Dict:
+    """Вимірює затримку пошуку для кожного запиту, мс."""
+    latencies = []
+    found = 0
+    for lang, query in queries:
+        started = time.perf_counter()
+        match = index.search(query, lang)
+        latencies.append((time.perf_counter() - started) * 1000)
+        found += match is not None
+    result = summarize(latencies)
+    result["found_ratio"] = found / len(queries) if queries else 0.0
+    return result
+
+
+def main():
+    """Командний рядок стенду."""
+    parser = argparse.ArgumentParser(description="Стенд швидкодії пошуку FAQ.")
+    parser.add_argument("--faq", default="faq.json", help="Файл FAQ, з якого беруться слова питань.")
+    parser.add_argument("--entries", type=int, default=5000, help="Кількість питань на мову в синтетичній базі.")
+    parser.add_argument("--queries", type=int, default=2000, help="Кількість запитів.")
+    parser.add_argument("--output", help="Зберегти результати у JSON-файл.")
+    args = parser.parse_args()
+    sys.path.insert(0, REPO_ROOT)
+    from for_test.faq_search import FaqIndex # pylint: disable=import-outside-toplevel
+
+    with open(args.faq, "r", encoding="utf-8") as file_handle:
+        base = json.load(file_handle)
+
+    results = {"meta": run_metadata(), "config": {"entries": args.entries, "queries": args.queries}}
+    for name, data in (("faq_json", base), ("synthetic", synthetic_faq(base, args.entries))):
+        started = time.perf_counter()
+        index = FaqIndex(data)
+        build_ms = (time.perf_counter() - started) * 1000
+        queries = make_queries(data, args.queries)
+        # Прогрів
+        measure(index, queries[:100])
+        results[name] = {
+            "entries_per_language": {lang: len(questions) for lang, questions in data.items()},
+            "build_ms": build_ms,
+            "search": measure(index, queries),
+        }
+
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+    if args.output:
+        with open(os.path.abspath(args.output), "w", encoding="utf-8") as file_handle:
+            json.dump(results, file_handle, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,327 @@
+"""
+Навантажувальний стенд обробників Telegram-бота.
+
+Відтворює тисячі синтетичних користувачів через справжню маршрутизацію
+``register_handlers`` (Application.process_update) за сценарієм
+старт → вибір мови → FAQ → відповідь FAQ → інформація про суд →
+запис на консультацію (ПІБ → дата → час). Замість Telegram API використовується фейковий транспорт,
+що записує вихідні виклики бота та повертає коректні відповіді, тому
+вимірюється код бота й python-telegram-bot, а не накладні витрати моків.
+
+Звітує затримку обробки оновлення (p50/p95/p99, загалом і для кожного кроку),
+пропускну здатність та виділення пам'яті на одне оновлення (tracemalloc,
+окремий послідовний прохід). Помилки, які обробники перехопили й залогували
+(``ERR_*``), рахуються окремо; якщо вони є, стенд завершується з кодом 1. Результати зберігаються у JSON, який можна
+порівняти з результатами іншого коміту.
+
+Стенд працює в тимчасовій копії каталогу з файлами даних, тому не змінює
+реальні записи та мовні налаштування.
+
+Приклад::
+
+    cd /opt/mytgbot
+    python benchmarks/bench_handlers.py --users 2000 --output bench.json
+    python benchmarks/bench_handlers.py --users 2000 --compare bench.json
+"""
+import argparse
+import asyncio
+import gc
+import json
+import logging
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Tuple
+from telegram import Update
+from telegram.ext import ApplicationBuilder
+from telegram.request import BaseRequest, RequestData
+from bench_common import REPO_ROOT, compare_results, run_metadata, summarize
+
+BENCH_BOT_TOKEN = "123456:BENCHMARK"
+FIRST_USER_ID = 20_000_000
+# Файли даних, які копіюються в тимчасовий робочий каталог стенду
+DATA_FILES = ("faq.json", "court_info.json", "court_schedule.json", "contacts.json", "admins.json")
+
+
+class FakeTelegramRequest(BaseRequest):
+    """Транспорт python-telegram-bot, що імітує Bot API без мережі.
+
+    Записує кількість викликів кожного методу та останню клавіатуру,
+    надіслану в кожен чат (щоб синтетичний користувач міг "натиснути" кнопку).
+    """
+
+    def __init__(self):
+        self.calls: Counter = Counter()
+        self.last_markup: Dict[int, dict] = {}
+        self._message_id = 0
+
+    @property
+    def read_timeout(self) -> Optional[float]:
+        return None
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
+
+    async def do_request(self, url: str, method: str, request_data: Optional[RequestData] = None,
+                         read_timeout=None, write_timeout=None, connect_timeout=None,
+                         pool_timeout=None) -> Tuple[int, bytes]:
+        api_method = url.rsplit("/", 1)[-1]
+        params = request_data.parameters if request_data is not None else {}
+        self.calls[api_method] += 1
+        if api_method == "getMe":
+            result = {"id": 123456, "is_bot": True, "first_name": "Bench", "username": "bench_bot"}
+        elif api_method == "sendMessage":
+            chat_id = int(params.get("chat_id", 0))
+            self._message_id += 1
+            if "reply_markup" in params:
+                self.last_markup[chat_id] = params["reply_markup"]
+            result = {
+                "message_id": self._message_id, "date": int(time.time()),
+                "chat": {"id": chat_id, "type": "private"}, "text": params.get("text", "")
+            }
+        else:
+            result = True
+        return 200, json.dumps({"ok": True, "result": result}).encode("utf-8")
+
+
+class ErrorLogCounter(logging.Handler):
+    """Рахує записи логу рівня ERROR і вище за кодом помилки (наприклад, ``ERR_HANDLER_005``).
+
+    Обробники бота перехоплюють винятки, відповідають користувачу загальним
+    повідомленням і лише логують помилку, тому без цього лічильника збій
+    кроку сценарію не було б видно в результатах стенду.
+    """
+
+    def __init__(self):
+        super().__init__(level=logging.ERROR)
+        self.counts: Counter = Counter()
+
+    def emit(self, record: logging.LogRecord):
+        code = str(record.msg).split(":", 1)[0]
+        self.counts[code if code.startswith("ERR_") else record.name] += 1
+
+
+def _message(user_id: int, text: str) -> dict:
+    message = {
+        "message_id": 1, "date": int(time.time()), "text": text,
+        "chat": {"id": user_id, "type": "private"},
+        "from": {"id": user_id, "is_bot": False, "first_name": "Bench"},
+    }
+    if text.startswith("/"):
+        message["entities"] = [{"type": "bot_command", "offset": 0, "length": len(text.split()[0])}]
+    return {"message": message}
+
+
+def _callback(user_id: int, data: str) -> dict:
+    return {"callback_query": {
+        "id": str(user_id), "chat_instance": "1", "data": data,
+        "from": {"id": user_id, "is_bot": False, "first_name": "Bench"},
+        "message": {"message_id": 1, "date": int(time.time()), "text": "-",
+                    "chat": {"id": user_id, "type": "private"}},
+    }}
+
+
+def _pick_button(markup: Optional[dict], rng: random.Random) -> Optional[str]:
+    """Повертає текст або callback_data випадкової кнопки клавіатури."""
+    if not markup:
+        return None
+    rows = markup.get("inline_keyboard") or markup.get("keyboard") or []
+    buttons = [button.get("callback_data") or button.get("text") for row in rows for button in row]
+    return rng.choice(buttons) if buttons else None
+
+
+class HandlerBenchmark:
+    """Відтворення сценарію для багатьох синтетичних користувачів через Application.process_update."""
+
+    def __init__(self, application, transport: FakeTelegramRequest):
+        self.application = application
+        self.transport = transport
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.allocations: List[Tuple[int, int]] = []
+        self.errors: Counter = Counter()
+        self._update_id = 0
+        self._trace_allocations = False
+
+    async def _send(self, step: str, payload: dict):
+        self._update_id += 1
+        payload["update_id"] = self._update_id
+        update = Update.de_json(payload, self.application.bot)
+        if self._trace_allocations:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+        started = time.perf_counter()
+        await self.application.process_update(update)
+        self.latencies[step].append((time.perf_counter() - started) * 1000)
+        if self._trace_allocations:
+            current, peak = tracemalloc.get_traced_memory()
+            self.allocations.append((peak - before, current - before))
+
+    async def run_user(self, user_id: int):
+        """Проводить одного користувача через повний сценарій.
+
+        Користувач "натискає" випадкову кнопку з останньої клавіатури бота
+        (генератор залежить від user_id, тому запуски відтворювані).
+        """
+        rng = random.Random(user_id)
+        await self._send("start", _message(user_id, "/start"))
+        await self._send("language", _callback(user_id, "uk"))
+        await self._send("faq_menu", _message(user_id, "❓ Поширені питання"))
+        question = _pick_button(self.transport.last_markup.get(user_id), rng)
+        if question:
+            await self._send("faq_answer", _message(user_id, question))
+        await self._send("court_info", _message(user_id, "ℹ️ Інформація про суд"))
+        await self._send("appointment", _message(user_id, "📅 Запис на консультацію"))
+        await self._send("name", _message(user_id, f"Користувач {user_id}"))
+        selected_date = _pick_button(self.transport.last_markup.get(user_id), rng)
+        if not selected_date:
+            self.errors["no_dates"] += 1
+            return
+        await self._send("date", _callback(user_id, selected_date))
+        selected_time = _pick_button(self.transport.last_markup.get(user_id), rng)
+        if not selected_time or selected_time == selected_date:
+            self.errors["no_times"] += 1
+            return
+        await self._send("time", _callback(user_id, selected_time))
+
+    async def run(self, users: int, concurrency: int, first_user_id: int) -> float:
+        """Запускає ``users`` користувачів, не більше ``concurrency`` одночасно; повертає тривалість, с."""
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def guarded(user_id: int):
+            async with semaphore:
+                try:
+                    await self.run_user(user_id)
+                except Exception as e: # pylint: disable=broad-except
+                    self.errors[type(e).__name__] += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(guarded(first_user_id + index) for index in range(users)))
+        return time.perf_counter() - started
+
+    async def run_allocations(self, users: int, first_user_id: int):
+        """Послідовний прохід під tracemalloc для оцінки виділень пам'яті на оновлення."""
+        self._trace_allocations = True
+        gc.collect()
+        tracemalloc.start()
+        try:
+            for index in range(users):
+                await self.run_user(first_user_id + index)
+        finally:
+            tracemalloc.stop()
+            self._trace_allocations = False
+
+
+async def run_benchmark(args) -> dict:
+    """Будує Application з фейковим транспортом і проводить вимірювання."""
+    # Імпортуємо бота лише після переходу в тимчасовий каталог: шляхи до сховищ відносні
+    from for_test.handlers import register_handlers # pylint: disable=import-outside-toplevel
+    from for_test.persistence import SqlitePersistence # pylint: disable=import-outside-toplevel
+    from for_test.storage import flush_all_stores # pylint: disable=import-outside-toplevel
+    from for_test.utils import shutdown_io_executor # pylint: disable=import-outside-toplevel
+
+    transport = FakeTelegramRequest()
+    application = (
+        ApplicationBuilder().token(BENCH_BOT_TOKEN)
+        .persistence(SqlitePersistence())
+        .request(transport).get_updates_request(FakeTelegramRequest()).build()
+    )
+    register_handlers(application)
+    await application.initialize()
+    benchmark = HandlerBenchmark(application, transport)
+    error_log = ErrorLogCounter()
+    logging.getLogger("for_test").addHandler(error_log)
+    try:
+        if args.warmup:
+            await benchmark.run(args.warmup, args.concurrency, FIRST_USER_ID - args.warmup)
+            benchmark.latencies.clear()
+            benchmark.errors.clear()
+        elapsed = await benchmark.run(args.users, args.concurrency, FIRST_USER_ID)
+        latencies = {step: list(values) for step, values in benchmark.latencies.items()}
+        errors = dict(benchmark.errors)
+        if args.alloc_users:
+            await benchmark.run_allocations(args.alloc_users, FIRST_USER_ID + args.users)
+    finally:
+        await application.shutdown()
+        shutdown_io_executor()
+        flush_all_stores()
+        logging.getLogger("for_test").removeHandler(error_log)
+
+    all_latencies = [value for values in latencies.values() for value in values]
+    peaks = [peak for peak, _ in benchmark.allocations]
+    retained = [net for _, net in benchmark.allocations]
+    return {
+        "meta": run_metadata(),
+        "config": {"users": args.users, "concurrency": args.concurrency,
+                   "warmup": args.warmup, "alloc_users": args.alloc_users},
+        "updates": len(all_latencies),
+        "elapsed_s": elapsed,
+        "throughput_updates_per_s": len(all_latencies) / elapsed if elapsed else 0.0,
+        "overall": summarize(all_latencies),
+        "per_step": {step: summarize(values) for step, values in latencies.items()},
+        "allocations": {
+            "updates": len(peaks),
+            "peak_bytes_per_update_avg": sum(peaks) / len(peaks) if peaks else None,
+            "peak_bytes_per_update_p95": summarize(peaks)["p95_ms"],
+            "retained_bytes_per_update_avg": sum(retained) / len(retained) if retained else None,
+        },
+        "bot_api_calls": dict(transport.calls),
+        "errors": errors,
+        "logged_errors": dict(error_log.counts),
+    }
+
+
+def main():
+    """Командний рядок стенду."""
+    parser = argparse.ArgumentParser(description="Навантажувальний стенд обробників Telegram-бота.")
+    parser.add_argument("--users", type=int, default=1000, help="Кількість синтетичних користувачів.")
+    parser.add_argument("--concurrency", type=int, default=100, help="Кількість одночасних користувачів.")
+    parser.add_argument("--warmup", type=int, default=50, help="Користувачі прогріву (не враховуються).")
+    parser.add_argument("--alloc-users", type=int, default=50,
+                        help="Користувачі для вимірювання виділень пам'яті (0 - пропустити).")
+    parser.add_argument("--data-dir", default=os.getcwd(), help="Каталог з JSON-файлами даних бота.")
+    parser.add_argument("--log-level", default="ERROR", help="Рівень логування бота під час стенду.")
+    parser.add_argument("--output", help="Зберегти результати у JSON-файл.")
+    parser.add_argument("--compare", help="JSON-файл результатів іншого запуску для порівняння.")
+    parser.add_argument("--max-regression", type=float, default=20.0,
+                        help="Допустиме погіршення метрик при --compare, %%.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=getattr(logging, args.log_level.upper(), logging.ERROR))
+    output = os.path.abspath(args.output) if args.output else None
+    compare = os.path.abspath(args.compare) if args.compare else None
+    sys.path.insert(0, REPO_ROOT)
+
+    workdir = tempfile.mkdtemp(prefix="bot-bench-")
+    for file_name in DATA_FILES:
+        source = os.path.join(args.data_dir, file_name)
+        if os.path.exists(source):
+            shutil.copy(source, workdir)
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        results = asyncio.run(run_benchmark(args))
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+    if output:
+        with open(output, "w", encoding="utf-8") as file_handle:
+            json.dump(results, file_handle, indent=2, ensure_ascii=False)
+    if results["logged_errors"]:
+        print(f"Bot logged errors during the run: {results['logged_errors']}", file=sys.stderr)
+        sys.exit(1)
+    if compare and not compare_results(compare, results, args.max_regression):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Стенд вартості маршрутизації одного оновлення.
+
+Вимірює, скільки часу python-telegram-bot витрачає на пошук обробника
+для текстового повідомлення: обхід обробників, зареєстрованих
+``register_handlers``, з викликом ``check_update`` до першого збігу
+(так само, як це робить Application.process_update). Для порівняння той самий
+набір повідомлень проганяється через попередній ланцюжок обробників
+``MessageHandler(filters.Regex(...))``.
+
+Колбеки обробників не викликаються, мережа та файли даних не потрібні.
+
+Приклад::
+
+    python benchmarks/bench_routing.py --iterations 20000 --output routing.json
+"""
+import argparse
+import json
+import sys
+import time
+from typing import Dict, List, Tuple
+from telegram import Update
+from telegram.ext import (
+    ApplicationBuilder, CommandHandler, ConversationHandler, MessageHandler, CallbackQueryHandler,
+    filters
+)
+from bench_common import REPO_ROOT, run_metadata
+
+# Типові повідомлення: (назва, текст)
+SAMPLE_MESSAGES: Tuple[Tuple[str, str], ...] = (
+    ("menu_faq", "❓ Поширені питання"),
+    ("menu_court_info", "ℹ️ Court Info"),
+    ("menu_schedule", "🗓 Календар засідань"),
+    ("menu_contacts", "📞 Other Institutions"),
+    ("faq_question", "Як подати заяву до суду?"),
+    ("free_text", "Добрий день, підкажіть, будь ласка"),
+)
+
+
+async def _noop(update, context): # pylint: disable=unused-argument
+    return None
+
+
+def legacy_handlers() -> List:
+    """Ланцюжок обробників до появи MenuRouter, для порівняння (колбеки - заглушки)."""
+    conversation = ConversationHandler(
+        entry_points=[MessageHandler(filters.Regex("^(📝|📅) Запис"), _noop)],
+        states={
+            state: [MessageHandler(filters.TEXT & ~filters.COMMAND, _noop)] for state in range(4)
+        },
+        fallbacks=[MessageHandler(filters.TEXT | filters.COMMAND, _noop)],
+    )
+    return [
+        CommandHandler("start", _noop),
+        CommandHandler("admin", _noop),
+        conversation,
+        CallbackQueryHandler(_noop, pattern="^(uk|en)$"),
+        MessageHandler(filters.Regex("^(❓ FAQ|❓ Поширені питання)$"), _noop),
+        MessageHandler(filters.Regex(r"^(Як|How).*"), _noop),
+        MessageHandler(filters.Regex("^(ℹ️|📍)"), _noop),
+        MessageHandler(filters.Regex("^(🗓 Календар засідань|🗓 Hearing Calendar)$"), _noop),
+        MessageHandler(filters.Regex("^(📞 Контакти інших установ|📞 Other Institutions)$"), _noop),
+        MessageHandler(filters.TEXT & ~filters.COMMAND, _noop),
+    ]
+
+
+def current_handlers() -> List:
+    """Обробники, які реєструє ``register_handlers``, у порядку перевірки."""
+    from for_test.handlers import register_handlers # pylint: disable=import-outside-toplevel
+    application = ApplicationBuilder().token("123456:BENCHMARK").build()
+    register_handlers(application)
+    return [handler for group in sorted(application.handlers) for handler in application.handlers[group]]
+
+
+def _make_update(update_id: int, text: str) -> Update:
+    return Update.de_json({
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id, "date": 1700000000, "text": text,
+            "chat": {"id": 1001, "type": "private"},
+            "from": {"id": 1001, "is_bot": False, "first_name": "Bench"},
+        },
+    }, None)
+
+
+def route(handlers: List, update: Update) -> int:
+    """Повертає позицію першого обробника, що прийняв оновлення (-1, якщо жоден)."""
+    for index, handler in enumerate(handlers):
+        check = handler.check_update(update)
+        if check is not None and check is not False:
+            return index
+    return -1
+
+
+def measure(handlers: List, iterations: int) -> Dict[str, Dict[str, float]]:
+    """Вимірює середню вартість маршрутизації кожного типового повідомлення, мкс."""
+    results = {}
+    for update_id, (name, text) in enumerate(SAMPLE_MESSAGES, start=1):
+        update = _make_update(update_id, text)
+        matched = route(handlers, update)
+        started = time.perf_counter()
+        for _ in range(iterations):
+            route(handlers, update)
+        elapsed = time.perf_counter() - started
+        results[name] = {"matched_handler": matched, "mean_us": elapsed / iterations * 1e6}
+    return results
+
+
+def main():
+    """Командний рядок стенду."""
+    parser = argparse.ArgumentParser(description="Стенд вартості маршрутизації оновлення.")
+    parser.add_argument("--iterations", type=int, default=20000, help="Повторень для кожного повідомлення.")
+    parser.add_argument("--output", help="Зберегти результати у JSON-файл.")
+    args = parser.parse_args()
+    sys.path.insert(0, REPO_ROOT)
+
+    results = {
+        "meta": run_metadata(),
+        "config": {"iterations": args.iterations},
+        "current": measure(current_handlers(), args.iterations),
+        "legacy_regex_chain": measure(legacy_handlers(), args.iterations),
+    }
+    for key in ("current", "legacy_regex_chain"):
+        per_message = results[key]
+        results[key + "_mean_us"] = sum(item["mean_us"] for item in per_message.values()) / len(per_message)
+
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file_handle:
+            json.dump(results, file_handle, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
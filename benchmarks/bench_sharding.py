@@ -0,0 +1,190 @@
+"""
+Стенд пропускної здатності бота з кількома процесами-обробниками.
+
+Для кожної кількості процесів (``--workers 1 2 4``) запускає
+:class:`for_test.sharding.ShardedIngress` зі справжніми обробниками
+``register_handlers`` у процесах-обробниках (з фейковим транспортом Bot API
+з ``bench_handlers.py``, без мережі), передає йому заздалегідь згенеровані
+оновлення синтетичних користувачів (старт → вибір мови → FAQ → питання FAQ →
+інформація про суд → довільний текст) і вимірює час, за який усі оновлення
+оброблено. Звітує пропускну здатність (оновлень/с) і прискорення відносно
+першої кількості процесів.
+
+Прискорення обмежене кількістю ядер процесора (``cpu_count`` у метаданих).
+
+Приклад::
+
+    cd /opt/mytgbot
+    python benchmarks/bench_sharding.py --users 2000 --workers 1 2 4 --output sharding.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+from typing import Dict, List
+from telegram import Update
+from bench_common import REPO_ROOT, run_metadata
+
+BENCH_BOT_TOKEN = "123456:BENCHMARK"
+FIRST_USER_ID = 30_000_000
+# Файли даних, які копіюються в тимчасовий робочий каталог стенду
+DATA_FILES = ("faq.json", "court_info.json", "court_schedule.json", "contacts.json", "admins.json")
+
+
+def bench_worker(shard: int, update_queue, results, log_level: int):
+    """Процес-обробник стенду: Application з фейковим транспортом, оновлення - з черги."""
+    logging.basicConfig(level=log_level)
+    sys.path.insert(0, REPO_ROOT)
+    # pylint: disable=import-outside-toplevel
+    from telegram.ext import ApplicationBuilder
+    from bench_handlers import FakeTelegramRequest
+    from for_test.handlers import register_handlers
+    from for_test.persistence import SqlitePersistence
+    from for_test.sharding import serve_worker
+
+    transport = FakeTelegramRequest()
+    application = (
+        ApplicationBuilder().token(BENCH_BOT_TOKEN)
+        .persistence(SqlitePersistence())
+        .request(transport).updater(None).build()
+    )
+    register_handlers(application)
+    results.put(("ready", shard, None))
+    asyncio.run(serve_worker(application, update_queue))
+    results.put(("done", shard, dict(transport.calls)))
+
+
+def _message(update_id: int, user_id: int, text: str) -> dict:
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id, "date": int(time.time()), "text": text,
+            "chat": {"id": user_id, "type": "private"},
+            "from": {"id": user_id, "is_bot": False, "first_name": "Bench"},
+            **({"entities": [{"type": "bot_command", "offset": 0, "length": len(text)}]}
+               if text.startswith("/") else {}),
+        },
+    }
+
+
+def _callback(update_id: int, user_id: int, data: str) -> dict:
+    return {
+        "update_id": update_id,
+        "callback_query": {
+            "id": str(update_id), "chat_instance": str(user_id), "data": data,
+            "from": {"id": user_id, "is_bot": False, "first_name": "Bench"},
+            "message": {
+                "message_id": update_id, "date": int(time.time()), "text": "-",
+                "chat": {"id": user_id, "type": "private"},
+            },
+        },
+    }
+
+
+def make_updates(users: int) -> List[Update]:
+    """Генерує оновлення синтетичних користувачів, перемежовані між користувачами."""
+    from for_test.keyboards import MAIN_MENU_LAYOUT # pylint: disable=import-outside-toplevel
+    labels = {action: label for row in MAIN_MENU_LAYOUT["uk"] for action, label in row}
+    script = (
+        ("message", "/start"),
+        ("callback", "uk"),
+        ("message", labels["faq"]),
+        ("message", "Як подати апеляцію?"),
+        ("message", labels["court_info"]),
+        ("message", "Добрий день, скільки коштує позов"),
+    )
+    updates = []
+    update_id = 1
+    for kind, payload in script:
+        for user in range(users):
+            user_id = FIRST_USER_ID + user
+            builder = _message if kind == "message" else _callback
+            updates.append(Update.de_json(builder(update_id, user_id, payload), None))
+            update_id += 1
+    return updates
+
+
+def measure(workers: int, updates: List[Update], log_level: int) -> Dict:
+    """Пропускає всі оновлення через ShardedIngress з `workers` процесами."""
+    from for_test.sharding import ShardedIngress # pylint: disable=import-outside-toplevel
+    results = multiprocessing.get_context("spawn").Queue()
+    ingress = ShardedIngress(workers, bench_worker, (results, log_level), queue_size=len(updates) + 1)
+    ingress.start()
+    for _ in range(workers):
+        results.get()
+    started = time.perf_counter()
+    for update in updates:
+        ingress.submit(update)
+    ingress.stop()
+    elapsed = time.perf_counter() - started
+    calls: Dict[str, int] = {}
+    for _ in range(workers):
+        _, _, worker_calls = results.get()
+        for method, count in worker_calls.items():
+            calls[method] = calls.get(method, 0) + count
+    stats = ingress.get_stats()
+    return {
+        "workers": workers,
+        "elapsed_s": elapsed,
+        "throughput_updates_per_s": len(updates) / elapsed,
+        "updates_per_worker": [stats[f"forwarded_{shard}"] for shard in range(workers)],
+        "bot_api_calls": calls,
+    }
+
+
+def main():
+    """Командний рядок стенду."""
+    parser = argparse.ArgumentParser(description="Стенд пропускної здатності з кількома процесами-обробниками.")
+    parser.add_argument("--users", type=int, default=1000, help="Кількість синтетичних користувачів.")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="Кількості процесів.")
+    parser.add_argument("--data-dir", default=os.getcwd(), help="Каталог з JSON-файлами даних бота.")
+    parser.add_argument("--log-level", default="ERROR", help="Рівень логування бота під час стенду.")
+    parser.add_argument("--output", help="Зберегти результати у JSON-файл.")
+    args = parser.parse_args()
+
+    log_level = getattr(logging, args.log_level.upper(), logging.ERROR)
+    logging.basicConfig(level=log_level)
+    output = os.path.abspath(args.output) if args.output else None
+    sys.path.insert(0, REPO_ROOT)
+    # Процеси-обробники мають спільні сховища - лише SQLite
+    os.environ["APPOINTMENTS_BACKEND"] = "sqlite"
+    os.environ["LANGUAGES_BACKEND"] = "sqlite"
+
+    runs = []
+    cwd = os.getcwd()
+    for workers in args.workers:
+        # Кожен прогін - з чистими сховищами
+        workdir = tempfile.mkdtemp(prefix="bot-bench-sharding-")
+        for file_name in DATA_FILES:
+            source = os.path.join(args.data_dir, file_name)
+            if os.path.exists(source):
+                shutil.copy(source, workdir)
+        os.chdir(workdir)
+        try:
+            runs.append(measure(workers, make_updates(args.users), log_level))
+        finally:
+            os.chdir(cwd)
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    baseline = runs[0]["throughput_updates_per_s"]
+    for run in runs:
+        run["speedup"] = run["throughput_updates_per_s"] / baseline
+    results = {
+        "meta": {**run_metadata(), "cpu_count": os.cpu_count()},
+        "config": {"users": args.users, "updates_per_user": 6},
+        "runs": runs,
+    }
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+    if output:
+        with open(output, "w", encoding="utf-8") as file_handle:
+            json.dump(results, file_handle, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
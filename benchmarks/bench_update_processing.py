@@ -0,0 +1,130 @@
+"""
+Стенд паралельної обробки оновлень зі збереженням порядку в чаті.
+
+Подає оновлення через ``Application.update_queue`` (як Updater або вебхук)
+у двох режимах: послідовна обробка python-telegram-bot за замовчуванням і
+:class:`for_test.update_processing.PerChatUpdateProcessor` з
+:class:`for_test.update_processing.AdmissionQueue`. Частина чатів "повільна":
+їхній обробник чекає ``--slow-ms`` (як запис у сховище чи мережевий виклик),
+решта відповідає одразу. Обробники синтетичні, тому вимірюється саме
+планування оновлень.
+
+Звітує затримку від потрапляння оновлення в чергу до завершення обробки
+(окремо для швидких і повільних чатів), загальний час, кількість очікувань
+через заповнену чергу і перевіряє, що оновлення кожного чату оброблено
+в порядку надходження.
+
+Приклад::
+
+    python benchmarks/bench_update_processing.py --chats 200 --updates-per-chat 5 --slow-chats 10
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List
+from telegram import Update
+from telegram.ext import ApplicationBuilder, TypeHandler
+from bench_common import REPO_ROOT, run_metadata, summarize
+from bench_handlers import FakeTelegramRequest
+
+BENCH_BOT_TOKEN = "123456:BENCHMARK"
+FIRST_CHAT_ID = 40_000_000
+
+
+def _make_update(update_id: int, chat_id: int) -> Update:
+    return Update.de_json({
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id, "date": 1700000000, "text": str(update_id),
+            "chat": {"id": chat_id, "type": "private"},
+            "from": {"id": chat_id, "is_bot": False, "first_name": "Bench"},
+        },
+    }, None)
+
+
+async def run_mode(mode: str, args) -> Dict:
+    """Проганяє всі оновлення в режимі 'sequential' або 'per_chat'."""
+    # pylint: disable=import-outside-toplevel
+    from for_test.update_processing import AdmissionQueue, PerChatUpdateProcessor
+
+    enqueued: Dict[int, float] = {}
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    order: Dict[int, List[int]] = defaultdict(list)
+    slow_chats = set(range(FIRST_CHAT_ID, FIRST_CHAT_ID + args.slow_chats))
+    done = asyncio.Event()
+    total = args.chats * args.updates_per_chat
+
+    async def handler(update, context): # pylint: disable=unused-argument
+        chat_id = update.effective_chat.id
+        order[chat_id].append(update.update_id)
+        if chat_id in slow_chats:
+            await asyncio.sleep(args.slow_ms / 1000)
+        latency = (time.perf_counter() - enqueued[update.update_id]) * 1000
+        latencies["slow" if chat_id in slow_chats else "fast"].append(latency)
+        if sum(len(values) for values in latencies.values()) == total:
+            done.set()
+
+    builder = ApplicationBuilder().token(BENCH_BOT_TOKEN).request(FakeTelegramRequest()).updater(None)
+    queue = None
+    if mode == "per_chat":
+        queue = AdmissionQueue(args.queue_limit)
+        builder = builder.concurrent_updates(PerChatUpdateProcessor(args.concurrency, args.queue_limit))
+        builder = builder.update_queue(queue)
+    application = builder.build()
+    application.add_handler(TypeHandler(Update, handler))
+    await application.initialize()
+    await application.start()
+
+    started = time.perf_counter()
+    update_id = 1
+    for _ in range(args.updates_per_chat):
+        for chat in range(args.chats):
+            update = _make_update(update_id, FIRST_CHAT_ID + chat)
+            enqueued[update_id] = time.perf_counter()
+            await application.update_queue.put(update)
+            update_id += 1
+    await done.wait()
+    elapsed = time.perf_counter() - started
+    await application.stop()
+    await application.shutdown()
+
+    return {
+        "elapsed_s": elapsed,
+        "fast_chats": summarize(latencies["fast"]),
+        "slow_chats": summarize(latencies["slow"]),
+        "ordered_chats": sum(1 for ids in order.values() if ids == sorted(ids)),
+        "total_chats": len(order),
+        "queue": queue.get_stats() if queue is not None else None,
+    }
+
+
+def main():
+    """Командний рядок стенду."""
+    parser = argparse.ArgumentParser(description="Стенд паралельної обробки оновлень.")
+    parser.add_argument("--chats", type=int, default=200, help="Кількість чатів.")
+    parser.add_argument("--updates-per-chat", type=int, default=5, help="Оновлень від кожного чату.")
+    parser.add_argument("--slow-chats", type=int, default=10, help="Скільки чатів мають повільний обробник.")
+    parser.add_argument("--slow-ms", type=float, default=50.0, help="Тривалість повільного обробника, мс.")
+    parser.add_argument("--concurrency", type=int, default=16, help="UPDATE_CONCURRENCY.")
+    parser.add_argument("--queue-limit", type=int, default=256, help="UPDATE_QUEUE_LIMIT.")
+    parser.add_argument("--output", help="Зберегти результати у JSON-файл.")
+    args = parser.parse_args()
+    sys.path.insert(0, REPO_ROOT)
+
+    results = {
+        "meta": run_metadata(),
+        "config": vars(args),
+        "sequential": asyncio.run(run_mode("sequential", args)),
+        "per_chat": asyncio.run(run_mode("per_chat", args)),
+    }
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file_handle:
+            json.dump(results, file_handle, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
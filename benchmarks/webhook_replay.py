@@ -0,0 +1,321 @@
+"""
+Стенд для вимірювання затримки бота в режимі вебхука без реального Telegram API.
+
+Скрипт надсилає записані оновлення (JSON у форматі Telegram Update) на
+вебхук-ендпоінт бота від імені багатьох віртуальних користувачів і вимірює:
+
+* затримку підтвердження - час до HTTP-відповіді вебхука;
+* затримку відповіді - час до першого виклику ``sendMessage`` ботом для цього чату.
+
+Для другої метрики скрипт піднімає заглушку Bot API, на яку бот спрямовується
+змінною ``TELEGRAM_API_BASE_URL``. З ``--spawn-bot`` скрипт сам запускає бота
+в режимі вебхука з потрібними змінними середовища, а наприкінці зупиняє його
+сигналом SIGTERM (перевіряючи коректне завершення).
+
+Приклад::
+
+    cd /opt/mytgbot
+    python benchmarks/webhook_replay.py --spawn-bot --users 200 --concurrency 20 --output webhook.json
+"""
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib import error as urlerror
+from urllib import parse as urlparse
+from urllib import request as urlrequest
+from bench_common import summarize
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_UPDATES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "recorded_updates.json")
+BENCH_BOT_TOKEN = "123456:BENCHMARK"
+# Ідентифікатори віртуальних користувачів не перетинаються з реальними адміністраторами
+FIRST_USER_ID = 10_000_000
+
+
+class FakeBotApi:
+    """Заглушка Telegram Bot API, що записує вихідні виклики бота.
+
+    Відповідає на ``getMe``, ``sendMessage`` та інші методи мінімально
+    коректними об'єктами й рахує кількість повідомлень, надісланих у кожен чат.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8081):
+        self.calls: Counter = Counter()
+        self._replies: Counter = Counter()
+        self._condition = threading.Condition()
+        self._message_id = 0
+        self.webhook_set = threading.Event()
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self): # pylint: disable=invalid-name
+                method = self.path.rstrip("/").rsplit("/", 1)[-1]
+                length = int(self.headers.get("Content-Length", 0))
+                params = api.parse_params(self.headers.get("Content-Type", ""), self.rfile.read(length))
+                body = json.dumps({"ok": True, "result": api.handle(method, params)}).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            do_GET = do_POST
+
+            def log_message(self, format, *args): # pylint: disable=redefined-builtin
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.base_url = f"http://{host}:{self.server.server_address[1]}/bot"
+        self._thread = threading.Thread(target=self.server.serve_forever, name="fake-bot-api", daemon=True)
+
+    @staticmethod
+    def parse_params(content_type: str, raw: bytes) -> Dict[str, object]:
+        """Розбирає параметри запиту (JSON або form-urlencoded із JSON-значеннями)."""
+        if not raw:
+            return {}
+        if content_type.startswith("application/json"):
+            return json.loads(raw)
+        params = {}
+        for key, values in urlparse.parse_qs(raw.decode("utf-8")).items():
+            try:
+                params[key] = json.loads(values[0])
+            except json.JSONDecodeError:
+                params[key] = values[0]
+        return params
+
+    def handle(self, method: str, params: Dict[str, object]) -> object:
+        """Повертає результат методу Bot API та реєструє виклик."""
+        self.calls[method] += 1
+        if method == "getMe":
+            return {"id": 123456, "is_bot": True, "first_name": "Bench", "username": "bench_bot"}
+        if method == "setWebhook":
+            self.webhook_set.set()
+            return True
+        if method == "sendMessage":
+            chat_id = int(params.get("chat_id", 0))
+            with self._condition:
+                self._message_id += 1
+                message_id = self._message_id
+                self._replies[chat_id] += 1
+                self._condition.notify_all()
+            return {
+                "message_id": message_id, "date": int(time.time()),
+                "chat": {"id": chat_id, "type": "private"}, "text": params.get("text", "")
+            }
+        return True
+
+    def replies(self, chat_id: int) -> int:
+        """Повертає кількість повідомлень, надісланих ботом у чат."""
+        with self._condition:
+            return self._replies[chat_id]
+
+    def wait_replies(self, chat_id: int, count: int, timeout: float) -> bool:
+        """Чекає, доки бот надішле в чат щонайменше ``count`` повідомлень."""
+        with self._condition:
+            return self._condition.wait_for(lambda: self._replies[chat_id] >= count, timeout)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def personalise(template: dict, user_id: int, update_id: int) -> dict:
+    """Підставляє в записане оновлення ідентифікатори віртуального користувача."""
+    update = json.loads(json.dumps(template))
+    update["update_id"] = update_id
+    for key in ("message", "edited_message"):
+        if key in update:
+            update[key]["chat"]["id"] = user_id
+            update[key]["from"]["id"] = user_id
+            update[key]["date"] = int(time.time())
+    if "callback_query" in update:
+        query = update["callback_query"]
+        query["id"] = str(update_id)
+        query["from"]["id"] = user_id
+        if "message" in query:
+            query["message"]["chat"]["id"] = user_id
+    return update
+
+
+def post_update(url: str, update: dict, secret_token: str, timeout: float = 10.0) -> int:
+    """Надсилає оновлення на вебхук і повертає HTTP-статус відповіді."""
+    headers = {"Content-Type": "application/json"}
+    if secret_token:
+        headers["X-Telegram-Bot-Api-Secret-Token"] = secret_token
+    req = urlrequest.Request(url, data=json.dumps(update).encode("utf-8"), headers=headers, method="POST")
+    try:
+        with urlrequest.urlopen(req, timeout=timeout) as response:
+            return response.status
+    except urlerror.HTTPError as e:
+        return e.code
+
+
+class ReplaySession:
+    """Відтворення записаної сесії від імені багатьох віртуальних користувачів."""
+
+    def __init__(self, url: str, updates: List[dict], secret_token: str,
+                 api: Optional[FakeBotApi], reply_timeout: float):
+        self.url = url
+        self.updates = updates
+        self.secret_token = secret_token
+        self.api = api
+        self.reply_timeout = reply_timeout
+        self.ack_ms: List[float] = []
+        self.reply_ms: List[float] = []
+        self.errors: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def run_user(self, index: int):
+        """Відтворює сесію одного користувача; оновлення йдуть послідовно, як у реальному чаті."""
+        user_id = FIRST_USER_ID + index
+        for position, template in enumerate(self.updates):
+            update = personalise(template, user_id, index * len(self.updates) + position + 1)
+            expected = self.api.replies(user_id) + 1 if self.api else 0
+            started = time.perf_counter()
+            try:
+                status = post_update(self.url, update, self.secret_token)
+            except OSError as e:
+                with self._lock:
+                    self.errors[type(e).__name__] += 1
+                continue
+            acked = time.perf_counter()
+            if status != 200:
+                with self._lock:
+                    self.errors[f"http_{status}"] += 1
+                continue
+            replied = None
+            if self.api:
+                if self.api.wait_replies(user_id, expected, self.reply_timeout):
+                    replied = time.perf_counter()
+                else:
+                    with self._lock:
+                        self.errors["reply_timeout"] += 1
+            with self._lock:
+                self.ack_ms.append((acked - started) * 1000)
+                if replied is not None:
+                    self.reply_ms.append((replied - started) * 1000)
+
+    def run(self, users: int, concurrency: int) -> Dict[str, object]:
+        """Запускає ``users`` сесій у ``concurrency`` паралельних потоках і повертає результати."""
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="replay") as executor:
+            list(executor.map(self.run_user, range(users)))
+        elapsed = time.perf_counter() - started
+        return {
+            "users": users,
+            "concurrency": concurrency,
+            "updates": len(self.ack_ms),
+            "elapsed_s": elapsed,
+            "throughput_updates_per_s": len(self.ack_ms) / elapsed if elapsed else 0.0,
+            "ack_latency": summarize(self.ack_ms),
+            "reply_latency": summarize(self.reply_ms) if self.api else None,
+            "errors": dict(self.errors),
+        }
+
+
+def spawn_bot(args, api: FakeBotApi) -> subprocess.Popen:
+    """Запускає бота в режимі вебхука, спрямованого на заглушку Bot API."""
+    env = dict(os.environ)
+    env.update({
+        "BOT_TOKEN": BENCH_BOT_TOKEN,
+        "BOT_MODE": "webhook",
+        "WEBHOOK_LISTEN": args.host,
+        "WEBHOOK_PORT": str(args.port),
+        "WEBHOOK_PATH": args.path,
+        "WEBHOOK_URL": f"http://{args.host}:{args.port}",
+        "WEBHOOK_SECRET_TOKEN": args.secret,
+        "TELEGRAM_API_BASE_URL": api.base_url,
+        "PYTHONPATH": os.pathsep.join(filter(None, [REPO_ROOT, env.get("PYTHONPATH")])),
+    })
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(REPO_ROOT, "for_test", "bot.py")], cwd=args.workdir, env=env
+    )
+    deadline = time.monotonic() + args.startup_timeout
+    if not api.webhook_set.wait(args.startup_timeout):
+        process.terminate()
+        raise RuntimeError("Bot did not register the webhook in time.")
+    # setWebhook може передувати запуску HTTP-сервера, тому чекаємо, доки порт почне приймати з'єднання
+    url = f"http://{args.host}:{args.port}/{args.path.strip('/')}"
+    while True:
+        try:
+            urlrequest.urlopen(url, timeout=1.0).close()
+            break
+        except urlerror.HTTPError:
+            break
+        except OSError:
+            if time.monotonic() > deadline:
+                process.terminate()
+                raise RuntimeError("Bot webhook server did not start in time.") from None
+            time.sleep(0.05)
+    return process
+
+
+def main():
+    """Командний рядок стенду."""
+    parser = argparse.ArgumentParser(description="Відтворення записаних оновлень через вебхук бота.")
+    parser.add_argument("--updates", default=DEFAULT_UPDATES_FILE, help="JSON-файл зі списком записаних оновлень.")
+    parser.add_argument("--host", default="127.0.0.1", help="Адреса вебхук-сервера бота.")
+    parser.add_argument("--port", type=int, default=8443, help="Порт вебхук-сервера бота.")
+    parser.add_argument("--path", default="telegram", help="Шлях вебхука (WEBHOOK_PATH).")
+    parser.add_argument("--secret", default="", help="Секретний токен вебхука (WEBHOOK_SECRET_TOKEN).")
+    parser.add_argument("--users", type=int, default=50, help="Кількість віртуальних користувачів.")
+    parser.add_argument("--concurrency", type=int, default=10, help="Кількість паралельних користувачів.")
+    parser.add_argument("--api-port", type=int, default=8081, help="Порт заглушки Bot API.")
+    parser.add_argument("--no-api", action="store_true",
+                        help="Не запускати заглушку Bot API (вимірюється лише підтвердження вебхука).")
+    parser.add_argument("--spawn-bot", action="store_true", help="Запустити бота автоматично.")
+    parser.add_argument("--workdir", default=os.getcwd(), help="Робочий каталог бота з файлами даних.")
+    parser.add_argument("--reply-timeout", type=float, default=10.0, help="Час очікування відповіді бота, с.")
+    parser.add_argument("--startup-timeout", type=float, default=30.0, help="Час очікування запуску бота, с.")
+    parser.add_argument("--output", help="Зберегти результати у JSON-файл.")
+    args = parser.parse_args()
+
+    with open(args.updates, "r", encoding="utf-8") as file_handle:
+        updates = json.load(file_handle)
+
+    api = None if args.no_api and not args.spawn_bot else FakeBotApi(port=args.api_port)
+    bot_process = None
+    if api:
+        api.start()
+    try:
+        if args.spawn_bot:
+            bot_process = spawn_bot(args, api)
+        url = f"http://{args.host}:{args.port}/{args.path.strip('/')}"
+        results = ReplaySession(url, updates, args.secret, api, args.reply_timeout).run(
+            args.users, args.concurrency
+        )
+    finally:
+        if bot_process is not None:
+            bot_process.send_signal(signal.SIGTERM)
+            try:
+                results_exit = bot_process.wait(timeout=args.startup_timeout)
+            except subprocess.TimeoutExpired:
+                bot_process.kill()
+                results_exit = None
+            print(f"Bot exit code after SIGTERM: {results_exit}")
+        if api:
+            api.stop()
+
+    if api:
+        results["bot_api_calls"] = dict(api.calls)
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file_handle:
+            json.dump(results, file_handle, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
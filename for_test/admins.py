@@ -0,0 +1,173 @@
+"""
+Модуль реєстру адміністраторів Telegram-бота.
+
+Список ID адміністраторів з ``admins.json`` тримається в пам'яті як
+frozenset, тому перевірка прав і розсилка сповіщень адміністраторам не
+звертаються до диска. Не частіше ніж раз на ``ADMINS_RELOAD_INTERVAL``
+секунд реєстр перевіряє час модифікації та розмір файлу і перечитує його,
+якщо файл змінили вручну або інший процес-обробник. Зміни командами
+/addadmin і /removeadmin записуються у файл атомарно.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, FrozenSet, Optional, Tuple
+from for_test.storage import atomic_write_json
+
+# Створюємо логер для цього модуля
+logger = logging.getLogger(__name__)
+
+ADMINS_FILE = "admins.json"
+# Як часто (секунди) перевіряти, чи змінився admins.json на диску
+ADMINS_RELOAD_INTERVAL = float(os.environ.get("ADMINS_RELOAD_INTERVAL", "5"))
+
+
+class AdminRegistry:
+    """
+    Реєстр ID адміністраторів у пам'яті з перезавантаженням при зміні файлу.
+
+    :param path: Шлях до admins.json (JSON-список ID).
+    :type path: str
+    :param reload_interval: Мінімальний інтервал (секунди) між перевірками файлу.
+    :type reload_interval: float
+    """
+
+    def __init__(self, path: str = ADMINS_FILE, reload_interval: float = ADMINS_RELOAD_INTERVAL):
+        self.path = path
+        self.reload_interval = reload_interval
+        self._lock = threading.Lock()
+        self._ids: FrozenSet[int] = frozenset()
+        # (mtime_ns, size) завантаженого файлу; None - файл відсутній
+        self._signature: Optional[Tuple[int, int]] = None
+        self._loaded = False
+        self._checked_at: Optional[float] = None
+        self._stats: Dict[str, int] = {"reloads": 0, "reload_errors": 0, "writes": 0}
+
+    def _stat_signature(self) -> Optional[Tuple[int, int]]:
+        try:
+            file_stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return file_stat.st_mtime_ns, file_stat.st_size
+
+    def is_fresh(self) -> bool:
+        """Чи перевірявся файл протягом останнього інтервалу (тоді :meth:`ids` не звертається до диска)."""
+        checked_at = self._checked_at
+        return checked_at is not None and time.monotonic() - checked_at < self.reload_interval
+
+    def reload(self, force: bool = False) -> bool:
+        """
+        Перечитує admins.json, якщо він змінився (або завжди, якщо `force`).
+
+        Якщо файл пошкоджений (наприклад, його саме редагують), залишається
+        попередній список. Відсутній файл означає, що адміністраторів немає.
+
+        :param force: Перечитати файл незалежно від часу модифікації.
+        :type force: bool
+        :returns: True, якщо список перечитано.
+        :rtype: bool
+        """
+        with self._lock:
+            self._checked_at = time.monotonic()
+            signature = self._stat_signature()
+            if self._loaded and signature == self._signature and not force:
+                return False
+            if signature is None:
+                logger.warning("WARN_UTIL_004: %s not found. No admins defined.", self.path)
+                self._ids = frozenset()
+                self._signature = None
+                self._loaded = True
+                return True
+            try:
+                with open(self.path, "r", encoding="utf-8") as file_handle:
+                    ids = frozenset(int(admin_id) for admin_id in json.load(file_handle))
+            except (OSError, ValueError, TypeError) as e:
+                # json.JSONDecodeError - підклас ValueError
+                self._stats["reload_errors"] += 1
+                logger.warning(
+                    "WARN_ADMINS_001: %s is corrupted. Keeping the previous admin list (%d admins). Error: %s",
+                    self.path, len(self._ids), e
+                )
+                return False
+            self._ids = ids
+            self._signature = signature
+            self._loaded = True
+            self._stats["reloads"] += 1
+            logger.info("Admin list loaded from %s: %d admins.", self.path, len(ids))
+            return True
+
+    def ids(self) -> FrozenSet[int]:
+        """
+        Повертає поточний набір ID адміністраторів.
+
+        Файл перевіряється, лише якщо з попередньої перевірки минуло більше `reload_interval` секунд.
+
+        :rtype: frozenset[int]
+        """
+        if not self.is_fresh():
+            self.reload()
+        return self._ids
+
+    def __contains__(self, user_id: int) -> bool:
+        return user_id in self.ids()
+
+    def _write(self, ids: FrozenSet[int]):
+        """Атомарно записує список і оновлює реєстр (під блокуванням)."""
+        atomic_write_json(self.path, sorted(ids), indent=2)
+        self._ids = ids
+        self._signature = self._stat_signature()
+        self._checked_at = time.monotonic()
+        self._stats["writes"] += 1
+
+    def add(self, user_id: int) -> bool:
+        """
+        Додає адміністратора і атомарно зберігає admins.json.
+
+        :param user_id: ID користувача Telegram.
+        :type user_id: int
+        :returns: False, якщо користувач уже адміністратор.
+        :rtype: bool
+        :raises OSError: Якщо не вдалося записати файл.
+        """
+        # Спершу підхоплюємо зміни, зроблені в обхід реєстру
+        self.reload()
+        with self._lock:
+            if user_id in self._ids:
+                return False
+            self._write(self._ids | {user_id})
+        logger.info("Admin %s added to %s.", user_id, self.path)
+        return True
+
+    def remove(self, user_id: int) -> bool:
+        """
+        Вилучає адміністратора і атомарно зберігає admins.json.
+
+        :param user_id: ID користувача Telegram.
+        :type user_id: int
+        :returns: False, якщо користувач не адміністратор.
+        :rtype: bool
+        :raises ValueError: Якщо це останній адміністратор.
+        :raises OSError: Якщо не вдалося записати файл.
+        """
+        self.reload()
+        with self._lock:
+            if user_id not in self._ids:
+                return False
+            if len(self._ids) == 1:
+                raise ValueError("Cannot remove the last admin.")
+            self._write(self._ids - {user_id})
+        logger.info("Admin %s removed from %s.", user_id, self.path)
+        return True
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Повертає статистику реєстру.
+
+        :returns: Словник з ключами 'admins', 'reloads', 'reload_errors' та 'writes'.
+        :rtype: dict
+        """
+        stats = dict(self._stats)
+        stats["admins"] = len(self._ids)
+        return stats
@@ -0,0 +1,739 @@
+"""
+Модуль сховищ записів на консультацію Telegram-бота.
+
+Містить інтерфейс :class:`AppointmentRepository` та його реалізації: SQLite
+(за замовчуванням) і JSON з відкладеним записом (знімок і журнал змін, див.
+:mod:`for_test.storage`), а також індекс зайнятості часових слотів у пам'яті
+та імпорт записів зі старого appointments.json.
+"""
+import abc
+import argparse
+import bisect
+import json
+import logging
+import os
+import sqlite3
+import threading
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from for_test.storage import WRITE_BEHIND_DELAY, AppendJournal, WriteBehindStore, atomic_write_json
+
+# Створюємо логер для цього модуля
+logger = logging.getLogger(__name__)
+
+# Сховище записів на консультацію: 'sqlite' (за замовчуванням) або 'json'
+APPOINTMENTS_BACKEND = os.environ.get("APPOINTMENTS_BACKEND", "sqlite").lower()
+APPOINTMENTS_DB_FILE = os.environ.get("APPOINTMENTS_DB", "appointments.db")
+APPOINTMENTS_JSON_FILE = "appointments.json"
+
+# Місткість слотів: кількість записів на одну годину та на один день (0 - без обмеження на день)
+SLOT_CAPACITY_PER_HOUR = int(os.environ.get("SLOT_CAPACITY_PER_HOUR", "1"))
+SLOT_CAPACITY_PER_DATE = int(os.environ.get("SLOT_CAPACITY_PER_DATE", "0"))
+
+
+class AppointmentPage(NamedTuple):
+    """Сторінка записів на консультацію для перегляду адміністратором.
+
+    :ivar records: Записи сторінки, впорядковані за часом слоту; крім 'user_id',
+                   'name' та 'time' містять 'seat' - місце у слоті.
+    :ivar has_prev: Чи є записи перед цією сторінкою.
+    :ivar has_next: Чи є записи після цієї сторінки.
+    """
+    records: List[dict]
+    has_prev: bool
+    has_next: bool
+
+    def first_cursor(self) -> Optional[Tuple[str, int]]:
+        """Повертає курсор (час слоту, місце) першого запису сторінки."""
+        return (self.records[0]["time"], self.records[0]["seat"]) if self.records else None
+
+    def last_cursor(self) -> Optional[Tuple[str, int]]:
+        """Повертає курсор (час слоту, місце) останнього запису сторінки."""
+        return (self.records[-1]["time"], self.records[-1]["seat"]) if self.records else None
+
+
+class AppointmentRepository(abc.ABC):
+    """Базовий інтерфейс сховища записів на консультацію.
+
+    Кожен запис - це словник з ключами 'user_id', 'name' та 'time',
+    де 'time' має формат "YYYY-MM-DD HH:MM". Кількість записів на один
+    часовий слот обмежується місткістю слоту (capacity), а на один день -
+    місткістю дня (date_capacity).
+    """
+
+    @abc.abstractmethod
+    def add(self, user_id: int, name: str, time: str, capacity: int = 1, date_capacity: int = 0) -> bool:
+        """Додає запис на консультацію.
+
+        Обидві місткості перевіряються атомарно разом із вставкою запису.
+
+        :param user_id: Унікальний ідентифікатор користувача Telegram.
+        :type user_id: int
+        :param name: ПІБ користувача.
+        :type name: str
+        :param time: Часовий слот у форматі "YYYY-MM-DD HH:MM".
+        :type time: str
+        :param capacity: Максимальна кількість записів на цей слот.
+        :type capacity: int
+        :param date_capacity: Максимальна кількість записів на день слоту (0 - без обмеження).
+        :type date_capacity: int
+        :returns: True, якщо запис збережено, False - якщо слот або день уже заповнені.
+        :rtype: bool
+        """
+
+    @abc.abstractmethod
+    def list_all(self) -> List[dict]:
+        """Повертає всі записи, впорядковані за часом слоту.
+
+        :rtype: list[dict]
+        """
+
+    @abc.abstractmethod
+    def list_for_user(self, user_id: int) -> List[dict]:
+        """Повертає записи конкретного користувача, впорядковані за часом слоту.
+
+        :param user_id: Унікальний ідентифікатор користувача Telegram.
+        :type user_id: int
+        :rtype: list[dict]
+        """
+
+    @abc.abstractmethod
+    def list_between(self, start: str, end: str) -> List[dict]:
+        """Повертає записи, час слоту яких лежить у діапазоні [start, end].
+
+        :param start: Початок діапазону ("YYYY-MM-DD" або "YYYY-MM-DD HH:MM").
+        :type start: str
+        :param end: Кінець діапазону (включно).
+        :type end: str
+        :rtype: list[dict]
+        """
+
+    @abc.abstractmethod
+    def count_for_slot(self, time: str) -> int:
+        """Повертає кількість записів на часовий слот.
+
+        :param time: Часовий слот у форматі "YYYY-MM-DD HH:MM".
+        :type time: str
+        :rtype: int
+        """
+
+    @abc.abstractmethod
+    def seek(self, start: str, end: str, user_id: Optional[int], cursor: Optional[Tuple[str, int]],
+             descending: bool, limit: int) -> List[dict]:
+        """Повертає до `limit` записів діапазону [start, end], що йдуть після курсора.
+
+        Записи впорядковані за (час слоту, місце у слоті) - за зростанням або,
+        якщо `descending`, за спаданням; курсор до результату не входить.
+
+        :param start: Початок діапазону ("YYYY-MM-DD" або "YYYY-MM-DD HH:MM").
+        :type start: str
+        :param end: Кінець діапазону (включно).
+        :type end: str
+        :param user_id: Лише записи цього користувача (None - усі).
+        :type user_id: int or None
+        :param cursor: (час слоту, місце), після якого починається вибірка (None - з краю діапазону).
+        :type cursor: tuple or None
+        :param descending: Напрямок вибірки.
+        :type descending: bool
+        :param limit: Максимальна кількість записів.
+        :type limit: int
+        :returns: Записи з ключами 'user_id', 'name', 'time' та 'seat'.
+        :rtype: list[dict]
+        """
+
+    def list_page(self, start: str = "", end: str = "", user_id: Optional[int] = None,
+                  after: Optional[Tuple[str, int]] = None, before: Optional[Tuple[str, int]] = None,
+                  limit: int = 10) -> AppointmentPage:
+        """Повертає сторінку записів для перегляду адміністратором.
+
+        Сторінка читається від курсора (пагінація за ключем), тому її вартість
+        залежить лише від розміру сторінки, а не від довжини історії записів.
+
+        :param start: Початок діапазону дат (порожній рядок - з найпершого запису).
+        :type start: str
+        :param end: Кінець діапазону включно (порожній рядок - до найостаннішого запису).
+        :type end: str
+        :param user_id: Лише записи цього користувача (None - усі).
+        :type user_id: int or None
+        :param after: Курсор останнього запису попередньої сторінки (перехід уперед).
+        :type after: tuple or None
+        :param before: Курсор першого запису наступної сторінки (перехід назад).
+        :type before: tuple or None
+        :param limit: Кількість записів на сторінці.
+        :type limit: int
+        :rtype: AppointmentPage
+        """
+        end = end or "9999-12-31"
+        if before is not None:
+            records = self.seek(start, end, user_id, before, True, limit + 1)
+            has_prev = len(records) > limit
+            return AppointmentPage(list(reversed(records[:limit])), has_prev, True)
+        records = self.seek(start, end, user_id, after, False, limit + 1)
+        return AppointmentPage(records[:limit], after is not None, len(records) > limit)
+
+    @abc.abstractmethod
+    def delete_before(self, time: str) -> int:
+        """Видаляє записи, час слоту яких раніший за `time`, і ущільнює сховище.
+
+        :param time: Межа ("YYYY-MM-DD" або "YYYY-MM-DD HH:MM"); записи на цей час залишаються.
+        :type time: str
+        :returns: Кількість видалених записів.
+        :rtype: int
+        """
+
+    def close(self):
+        """Звільняє ресурси сховища."""
+
+
+class JsonAppointmentRepository(AppointmentRepository, WriteBehindStore):
+    """Запасна реалізація сховища записів на основі файлу appointments.json.
+
+    Використовується, якщо `APPOINTMENTS_BACKEND=json`. Записи тримаються
+    в пам'яті; кожен новий запис одразу дописується в журнал
+    `appointments.json.journal`, а сам appointments.json перезаписується
+    атомарно (тимчасовий файл + fsync + перейменування) не частіше ніж
+    раз на вікно відкладеного запису. Під час запуску стан відновлюється
+    зі знімка та журналу.
+
+    Це сховище розраховане на один процес бота; для кількох процесів слід
+    використовувати SQLite.
+
+    :param path: Шлях до файлу appointments.json.
+    :type path: str
+    :param flush_delay: Вікно об'єднання змін перед записом на диск (секунди).
+    :type flush_delay: float
+    """
+
+    def __init__(self, path: str = APPOINTMENTS_JSON_FILE, flush_delay: float = WRITE_BEHIND_DELAY):
+        WriteBehindStore.__init__(self, flush_delay)
+        self.path = path
+        self._lock = threading.Lock()
+        self._journal = AppendJournal(path + ".journal")
+        self._records: List[dict] = []
+        self._slot_counts: Dict[str, int] = {}
+        self._date_counts: Dict[str, int] = {}
+        # Записи, впорядковані за (час слоту, місце у слоті), і їхні ключі - для пагінації
+        self._ordered_keys: List[Tuple[str, int]] = []
+        self._ordered_records: List[dict] = []
+        self._loaded = False
+        self._dirty = False
+
+    def _ensure_loaded(self):
+        """Завантажує знімок та журнал у пам'ять при першому зверненні (під блокуванням)."""
+        if self._loaded:
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as file_handle:
+                records = json.load(file_handle)
+        except FileNotFoundError:
+            records = []
+        except json.JSONDecodeError as e:
+            logger.warning("WARN_STORE_003: %s is corrupted. Resetting data. Error: %s", self.path, e)
+            records = []
+        seen = {(record.get("user_id"), record.get("time")) for record in records}
+        journal_entries = self._journal.replay()
+        for entry in journal_entries:
+            # Знімок міг бути записаний до того, як журнал встиг обнулитися
+            if (entry.get("user_id"), entry.get("time")) not in seen:
+                records.append(entry)
+                seen.add((entry.get("user_id"), entry.get("time")))
+        self._records = records
+        self._slot_counts = {}
+        self._date_counts = {}
+        ordered = []
+        for record in records:
+            # Місце у слоті - порядковий номер запису серед записів на цей час
+            seat = self._slot_counts.get(record["time"], 0)
+            self._slot_counts[record["time"]] = seat + 1
+            date = record["time"][:10]
+            self._date_counts[date] = self._date_counts.get(date, 0) + 1
+            ordered.append(((record["time"], seat), record))
+        ordered.sort(key=lambda item: item[0])
+        self._ordered_keys = [key for key, _ in ordered]
+        self._ordered_records = [record for _, record in ordered]
+        self._journal.entries = len(journal_entries)
+        self._dirty = bool(journal_entries)
+        self._loaded = True
+        if journal_entries:
+            logger.info("Recovered %s appointments from %s.", len(journal_entries), self._journal.path)
+            self._schedule_flush()
+
+    def add(self, user_id: int, name: str, time: str, capacity: int = 1, date_capacity: int = 0) -> bool:
+        date = time[:10]
+        with self._lock:
+            self._ensure_loaded()
+            if self._slot_counts.get(time, 0) >= capacity:
+                return False
+            if 0 < date_capacity <= self._date_counts.get(date, 0):
+                return False
+            record = {"user_id": user_id, "name": name, "time": time}
+            self._journal.append(record)
+            self._records.append(record)
+            seat = self._slot_counts.get(time, 0)
+            self._slot_counts[time] = seat + 1
+            self._date_counts[date] = self._date_counts.get(date, 0) + 1
+            position = bisect.bisect_right(self._ordered_keys, (time, seat))
+            self._ordered_keys.insert(position, (time, seat))
+            self._ordered_records.insert(position, record)
+            self._dirty = True
+        self._schedule_flush()
+        return True
+
+    def flush(self):
+        """Атомарно перезаписує appointments.json і обнуляє журнал."""
+        with self._lock:
+            if not self._dirty:
+                return
+            self._journal.sync()
+            atomic_write_json(self.path, self._records, indent=2)
+            self._journal.close()
+            if os.path.exists(self._journal.path):
+                os.remove(self._journal.path)
+            self._journal.entries = 0
+            self._dirty = False
+
+    def list_all(self) -> List[dict]:
+        with self._lock:
+            self._ensure_loaded()
+            return list(self._ordered_records)
+
+    def list_for_user(self, user_id: int) -> List[dict]:
+        return [record for record in self.list_all() if record["user_id"] == user_id]
+
+    def list_between(self, start: str, end: str) -> List[dict]:
+        # Кінець діапазону доповнюємо, щоб дата "YYYY-MM-DD" включала всі слоти цього дня
+        return [record for record in self.list_all() if start <= record["time"] <= end + "~"]
+
+    def count_for_slot(self, time: str) -> int:
+        with self._lock:
+            self._ensure_loaded()
+            return self._slot_counts.get(time, 0)
+
+    def seek(self, start: str, end: str, user_id: Optional[int], cursor: Optional[Tuple[str, int]],
+             descending: bool, limit: int) -> List[dict]:
+        page = []
+        with self._lock:
+            self._ensure_loaded()
+            keys = self._ordered_keys
+            # Межі діапазону шукаються бінарним пошуком; переглядаються лише записи сторінки
+            # (з фільтром за користувачем - записи між курсором і кінцем сторінки)
+            low = bisect.bisect_left(keys, (start,))
+            high = bisect.bisect_right(keys, (end + "~",))
+            if descending:
+                if cursor is not None:
+                    high = min(high, bisect.bisect_left(keys, cursor))
+                positions = range(high - 1, low - 1, -1)
+            else:
+                if cursor is not None:
+                    low = max(low, bisect.bisect_right(keys, cursor))
+                positions = range(low, high)
+            for position in positions:
+                record = self._ordered_records[position]
+                if user_id is not None and record["user_id"] != user_id:
+                    continue
+                page.append({**record, "seat": keys[position][1]})
+                if len(page) >= limit:
+                    break
+        return page
+
+    def delete_before(self, time: str) -> int:
+        with self._lock:
+            self._ensure_loaded()
+            position = bisect.bisect_left(self._ordered_keys, (time,))
+            if not position:
+                return 0
+            removed = {id(record) for record in self._ordered_records[:position]}
+            self._records = [record for record in self._records if id(record) not in removed]
+            del self._ordered_keys[:position]
+            del self._ordered_records[:position]
+            self._slot_counts = {
+                slot: count for slot, count in self._slot_counts.items() if slot >= time
+            }
+            self._dirty = True
+        # Ущільнення: appointments.json одразу перезаписується без видалених записів
+        self.flush()
+        return len(removed)
+
+    def close(self):
+        WriteBehindStore.close(self)
+
+
+class SqliteAppointmentRepository(AppointmentRepository):
+    """Сховище записів на консультацію на основі SQLite у режимі WAL.
+
+    Таблиця має індекс за user_id та унікальний індекс за (часом слоту, місцем у слоті),
+    тому вибірки не залежать від довжини історії, а два одночасні
+    бронювання одного місця не можуть обидва пройти.
+
+    :param path: Шлях до файлу бази даних.
+    :type path: str
+    """
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS appointments (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            name TEXT NOT NULL,
+            time TEXT NOT NULL,
+            seat INTEGER NOT NULL DEFAULT 0,
+            created_at TEXT NOT NULL DEFAULT (datetime('now'))
+        );
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_appointments_slot ON appointments (time, seat);
+        CREATE INDEX IF NOT EXISTS idx_appointments_user_id ON appointments (user_id, time);
+    """
+    # Версія схеми зберігається у PRAGMA user_version
+    _SCHEMA_VERSION = 1
+
+    def __init__(self, path: str = APPOINTMENTS_DB_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        # Одне з'єднання на процес; доступ з різних потоків серіалізується блокуванням
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.row_factory = sqlite3.Row
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute("PRAGMA busy_timeout=5000")
+        self._connection.executescript(self._SCHEMA)
+        self._connection.execute(f"PRAGMA user_version = {self._SCHEMA_VERSION}")
+
+    def _select(self, query: str, params: tuple = ()) -> List[dict]:
+        with self._lock:
+            rows = self._connection.execute(query, params).fetchall()
+        return [{"user_id": row["user_id"], "name": row["name"], "time": row["time"]} for row in rows]
+
+    def add(self, user_id: int, name: str, time: str, capacity: int = 1, date_capacity: int = 0) -> bool:
+        date = time[:10]
+        with self._lock:
+            # BEGIN IMMEDIATE одразу бере блокування запису: інші процеси-обробники
+            # чекають, тому підрахунки слоту й дня не застаріють до вставки
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                taken = self._connection.execute(
+                    "SELECT COUNT(*) FROM appointments WHERE time = ?", (time,)
+                ).fetchone()[0]
+                booked_on_date = self._connection.execute(
+                    "SELECT COUNT(*) FROM appointments WHERE time >= ? AND time <= ?", (date, date + "~")
+                ).fetchone()[0] if date_capacity > 0 else 0
+                saved = taken < capacity and not 0 < date_capacity <= booked_on_date
+                if saved:
+                    try:
+                        # Унікальний індекс - додатковий захист від повторного бронювання місця
+                        self._connection.execute(
+                            "INSERT INTO appointments (user_id, name, time, seat) VALUES (?, ?, ?, ?)",
+                            (user_id, name, time, taken)
+                        )
+                    except sqlite3.IntegrityError:
+                        saved = False
+                self._connection.execute("COMMIT" if saved else "ROLLBACK")
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+            return saved
+
+    def list_all(self) -> List[dict]:
+        return self._select("SELECT user_id, name, time FROM appointments ORDER BY time")
+
+    def list_for_user(self, user_id: int) -> List[dict]:
+        return self._select(
+            "SELECT user_id, name, time FROM appointments WHERE user_id = ? ORDER BY time",
+            (user_id,)
+        )
+
+    def list_between(self, start: str, end: str) -> List[dict]:
+        return self._select(
+            "SELECT user_id, name, time FROM appointments WHERE time >= ? AND time <= ? ORDER BY time",
+            (start, end + "~")
+        )
+
+    def count_for_slot(self, time: str) -> int:
+        with self._lock:
+            return self._connection.execute(
+                "SELECT COUNT(*) FROM appointments WHERE time = ?", (time,)
+            ).fetchone()[0]
+
+    def seek(self, start: str, end: str, user_id: Optional[int], cursor: Optional[Tuple[str, int]],
+             descending: bool, limit: int) -> List[dict]:
+        # Порядок (time, seat) збігається з унікальним індексом слоту, тому SQLite
+        # читає індекс від курсора і зупиняється після `limit` записів
+        low, high = start, end + "~"
+        if cursor is not None:
+            # Межа за часом звужує діапазон індексу (порівняння пар SQLite для цього не використовує)
+            if descending:
+                high = min(high, cursor[0])
+            else:
+                low = max(low, cursor[0])
+        conditions = ["time >= ?", "time <= ?"]
+        params: list = [low, high]
+        if user_id is not None:
+            conditions.append("user_id = ?")
+            params.append(user_id)
+        if cursor is not None:
+            conditions.append("(time, seat) < (?, ?)" if descending else "(time, seat) > (?, ?)")
+            params.extend(cursor)
+        order = "DESC" if descending else "ASC"
+        query = (
+            "SELECT user_id, name, time, seat FROM appointments "
+            f"WHERE {' AND '.join(conditions)} ORDER BY time {order}, seat {order} LIMIT ?"
+        )
+        params.append(limit)
+        with self._lock:
+            rows = self._connection.execute(query, params).fetchall()
+        return [
+            {"user_id": row["user_id"], "name": row["name"], "time": row["time"], "seat": row["seat"]}
+            for row in rows
+        ]
+
+    def delete_before(self, time: str) -> int:
+        with self._lock:
+            removed = self._connection.execute("DELETE FROM appointments WHERE time < ?", (time,)).rowcount
+            if removed:
+                page_count = self._connection.execute("PRAGMA page_count").fetchone()[0]
+                free_pages = self._connection.execute("PRAGMA freelist_count").fetchone()[0]
+                # VACUUM перезаписує всю базу, тому запускається, лише коли звільнено чверть сторінок
+                if free_pages * 4 >= page_count:
+                    self._connection.execute("VACUUM")
+                self._connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return removed
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+class SlotAvailabilityIndex:
+    """Індекс зайнятості часових слотів у пам'яті, згрупований за датою.
+
+    Будується один раз зі сховища записів і оновлюється при кожному
+    бронюванні, тому перевірка вільного місця у слоті виконується за O(1),
+    а список вільних слотів дати - без звернення до сховища.
+
+    :param capacity_per_hour: Максимальна кількість записів на один часовий слот.
+    :type capacity_per_hour: int
+    :param capacity_per_date: Максимальна кількість записів на один день (0 - без обмеження).
+    :type capacity_per_date: int
+    """
+
+    def __init__(self, capacity_per_hour: int = SLOT_CAPACITY_PER_HOUR,
+                 capacity_per_date: int = SLOT_CAPACITY_PER_DATE):
+        self.capacity_per_hour = capacity_per_hour
+        self.capacity_per_date = capacity_per_date
+        self._lock = threading.Lock()
+        # дата -> {слот: кількість записів}
+        self._slots_by_date: Dict[str, Dict[str, int]] = {}
+        # дата -> загальна кількість записів
+        self._date_totals: Dict[str, int] = {}
+
+    def rebuild(self, appointments: List[dict]):
+        """Перебудовує індекс зі списку записів.
+
+        :param appointments: Записи у форматі сховища (з ключем 'time').
+        :type appointments: list[dict]
+        """
+        slots_by_date: Dict[str, Dict[str, int]] = {}
+        date_totals: Dict[str, int] = {}
+        for record in appointments:
+            time = record["time"]
+            date = time[:10]
+            slots = slots_by_date.setdefault(date, {})
+            slots[time] = slots.get(time, 0) + 1
+            date_totals[date] = date_totals.get(date, 0) + 1
+        with self._lock:
+            self._slots_by_date = slots_by_date
+            self._date_totals = date_totals
+
+    def add(self, time: str):
+        """Враховує нове бронювання слоту.
+
+        :param time: Часовий слот у форматі "YYYY-MM-DD HH:MM".
+        :type time: str
+        """
+        date = time[:10]
+        with self._lock:
+            slots = self._slots_by_date.setdefault(date, {})
+            slots[time] = slots.get(time, 0) + 1
+            self._date_totals[date] = self._date_totals.get(date, 0) + 1
+
+    def refresh_date(self, date: str, appointments: List[dict]):
+        """Замінює зайнятість однієї дати актуальними записами зі сховища.
+
+        Потрібно, коли сховище змінює інший процес (див. :mod:`for_test.sharding`):
+        індекс дізнається про чуже бронювання, коли власне бронювання слоту не вдалося.
+
+        :param date: Дата у форматі "YYYY-MM-DD".
+        :type date: str
+        :param appointments: Усі записи цієї дати.
+        :type appointments: list[dict]
+        """
+        slots: Dict[str, int] = {}
+        for record in appointments:
+            slots[record["time"]] = slots.get(record["time"], 0) + 1
+        with self._lock:
+            self._slots_by_date[date] = slots
+            self._date_totals[date] = sum(slots.values())
+
+    def remove_before(self, date: str) -> int:
+        """Видаляє з індексу дати, раніші за `date` (після архівації минулих записів).
+
+        :param date: Дата у форматі "YYYY-MM-DD"; ця дата залишається.
+        :type date: str
+        :returns: Кількість видалених дат.
+        :rtype: int
+        """
+        with self._lock:
+            past = [day for day in self._slots_by_date if day < date]
+            for day in past:
+                del self._slots_by_date[day]
+                self._date_totals.pop(day, None)
+        return len(past)
+
+    def _date_is_full(self, date: str) -> bool:
+        return 0 < self.capacity_per_date <= self._date_totals.get(date, 0)
+
+    def has_capacity(self, time: str) -> bool:
+        """Перевіряє, чи є вільне місце у слоті (з урахуванням ліміту на день).
+
+        :param time: Часовий слот у форматі "YYYY-MM-DD HH:MM".
+        :type time: str
+        :rtype: bool
+        """
+        date = time[:10]
+        with self._lock:
+            if self._date_is_full(date):
+                return False
+            return self._slots_by_date.get(date, {}).get(time, 0) < self.capacity_per_hour
+
+    def occupancy(self, date: str, slots: List[str]) -> List[int]:
+        """Повертає кількість вільних місць у кожному слоті дати (0 - якщо заповнено весь день).
+
+        Дані беруться лише з індексу, без звернення до сховища та без імен користувачів.
+
+        :param date: Дата у форматі "YYYY-MM-DD".
+        :type date: str
+        :param slots: Усі робочі слоти цієї дати.
+        :type slots: list[str]
+        :rtype: list[int]
+        """
+        with self._lock:
+            if self._date_is_full(date):
+                return [0] * len(slots)
+            booked = self._slots_by_date.get(date, {})
+            return [max(self.capacity_per_hour - booked.get(slot, 0), 0) for slot in slots]
+
+    def free_slots(self, date: str, slots: List[str]) -> List[str]:
+        """Повертає слоти дати, у яких є вільні місця.
+
+        :param date: Дата у форматі "YYYY-MM-DD".
+        :type date: str
+        :param slots: Усі робочі слоти цієї дати.
+        :type slots: list[str]
+        :rtype: list[str]
+        """
+        with self._lock:
+            if self._date_is_full(date):
+                return []
+            booked = self._slots_by_date.get(date, {})
+            return [slot for slot in slots if booked.get(slot, 0) < self.capacity_per_hour]
+
+
+def import_appointments_from_json(json_path: str, repository: AppointmentRepository,
+                                  capacity: int = 1) -> Tuple[int, int]:
+    """Імпортує записи зі старого файлу appointments.json у сховище.
+
+    Записи на вже заповнені слоти (дублікати) пропускаються.
+
+    :param json_path: Шлях до файлу appointments.json.
+    :type json_path: str
+    :param repository: Сховище, у яке імпортуються записи.
+    :type repository: AppointmentRepository
+    :param capacity: Місткість одного часового слоту.
+    :type capacity: int
+    :returns: Кортеж (кількість імпортованих, кількість пропущених записів).
+    :rtype: tuple[int, int]
+    :raises FileNotFoundError: Якщо файл не існує.
+    :raises json.JSONDecodeError: Якщо файл пошкоджений.
+    """
+    with open(json_path, "r", encoding="utf-8") as file_handle:
+        records = json.load(file_handle)
+    imported = skipped = 0
+    for record in records:
+        try:
+            saved = repository.add(
+                int(record["user_id"]), record.get("name", ""), record["time"], capacity
+            )
+        except (KeyError, TypeError, ValueError):
+            logger.warning("WARN_STORE_004: Skipping malformed appointment record: %r", record)
+            saved = False
+        if saved:
+            imported += 1
+        else:
+            skipped += 1
+    logger.info("Imported %s appointments from %s, skipped %s.", imported, json_path, skipped)
+    return imported, skipped
+
+
+def create_appointment_repository(backend: str = APPOINTMENTS_BACKEND,
+                                  capacity: int = 1) -> AppointmentRepository:
+    """Створює сховище записів на консультацію відповідно до налаштувань.
+
+    Для SQLite, якщо база даних створюється вперше, а поруч лежить старий
+    appointments.json, записи з нього імпортуються автоматично.
+
+    :param backend: 'sqlite' або 'json'.
+    :type backend: str
+    :param capacity: Місткість одного часового слоту (для автоматичного імпорту).
+    :type capacity: int
+    :returns: Сховище записів.
+    :rtype: AppointmentRepository
+    """
+    if backend == "json":
+        logger.info("Using JSON appointment storage: %s.", APPOINTMENTS_JSON_FILE)
+        return JsonAppointmentRepository(APPOINTMENTS_JSON_FILE)
+    if backend != "sqlite":
+        logger.warning("WARN_STORE_005: Unknown APPOINTMENTS_BACKEND '%s'. Using sqlite.", backend)
+
+    is_new_database = not os.path.exists(APPOINTMENTS_DB_FILE)
+    repository = SqliteAppointmentRepository(APPOINTMENTS_DB_FILE)
+    logger.info("Using SQLite appointment storage: %s.", APPOINTMENTS_DB_FILE)
+    if is_new_database and os.path.exists(APPOINTMENTS_JSON_FILE):
+        try:
+            import_appointments_from_json(APPOINTMENTS_JSON_FILE, repository, capacity)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.error(
+                "ERR_STORE_003: Failed to import %s into %s. "
+                "Error: %s", APPOINTMENTS_JSON_FILE, APPOINTMENTS_DB_FILE, e, exc_info=True
+            )
+    return repository
+
+
+def main():
+    """Командний рядок для обслуговування сховищ.
+
+    Приклад імпорту записів::
+
+        python -m for_test.appointments import-appointments appointments.json --db appointments.db
+    """
+    parser = argparse.ArgumentParser(description="Обслуговування сховищ даних Telegram-бота.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    import_parser = subparsers.add_parser(
+        "import-appointments", help="Імпортувати appointments.json у базу даних SQLite."
+    )
+    import_parser.add_argument("json_path", help="Шлях до appointments.json.")
+    import_parser.add_argument("--db", default=APPOINTMENTS_DB_FILE, help="Шлях до бази даних SQLite.")
+    import_parser.add_argument(
+        "--capacity", type=int, default=SLOT_CAPACITY_PER_HOUR, help="Місткість одного часового слоту."
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if args.command == "import-appointments":
+        repository = SqliteAppointmentRepository(args.db)
+        try:
+            imported, skipped = import_appointments_from_json(
+                args.json_path, repository, args.capacity
+            )
+        finally:
+            repository.close()
+        print(f"Imported: {imported}, skipped (duplicate or malformed): {skipped}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""
+Модуль архівації минулих записів на консультацію.
+
+Щоденне завдання (див. :mod:`for_test.bot`) переносить записи, дата яких
+минула (з урахуванням ``APPOINTMENTS_RETENTION_DAYS``), у стиснуті архівні
+файли, розбиті за місяцями (``archive/appointments-2025-06.jsonl.gz``), а потім
+видаляє їх зі сховища записів і ущільнює його. Тому розмір сховища
+обмежується вікном бронювання, а не віком розгортання.
+
+Архів переглядається з командного рядка::
+
+    python -m for_test.archive query --from 2025-06-01 --to 2025-06-30 --user 123456789
+    python -m for_test.archive run
+"""
+import argparse
+import gzip
+import json
+import logging
+import os
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Створюємо логер для цього модуля
+logger = logging.getLogger(__name__)
+
+# Каталог архівних файлів
+ARCHIVE_DIR = os.environ.get("ARCHIVE_DIR", "archive")
+# Скільки днів минулі записи залишаються у сховищі перед архівацією (0 - архівуються всі дні до сьогоднішнього)
+APPOINTMENTS_RETENTION_DAYS = int(os.environ.get("APPOINTMENTS_RETENTION_DAYS", "0"))
+# Час щоденного запуску архівації (за часовим поясом сервера), "HH:MM"
+ARCHIVE_JOB_TIME = os.environ.get("ARCHIVE_JOB_TIME", "03:00")
+
+_PARTITION_PREFIX = "appointments-"
+_PARTITION_SUFFIX = ".jsonl.gz"
+
+
+def partition_path(archive_dir: str, month: str) -> str:
+    """Повертає шлях до архівного файлу місяця ("YYYY-MM")."""
+    return os.path.join(archive_dir, f"{_PARTITION_PREFIX}{month}{_PARTITION_SUFFIX}")
+
+
+def archive_cutoff(today: Optional[date] = None, retention_days: int = APPOINTMENTS_RETENTION_DAYS) -> str:
+    """
+    Повертає першу дату, записи на яку ще залишаються у сховищі.
+
+    :param today: Поточна дата (за замовчуванням - сьогодні).
+    :type today: datetime.date or None
+    :param retention_days: Скільки минулих днів залишати у сховищі.
+    :type retention_days: int
+    :returns: Дата у форматі "YYYY-MM-DD".
+    :rtype: str
+    """
+    today = today or datetime.now().date()
+    return str(today - timedelta(days=max(retention_days, 0)))
+
+
+def _read_partition(path: str) -> List[dict]:
+    """Читає всі записи архівного файлу (порожній список, якщо файлу немає)."""
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as file_handle:
+            return [json.loads(line) for line in file_handle if line.strip()]
+    except FileNotFoundError:
+        return []
+
+
+def _write_partition(path: str, records: List[dict]):
+    """Атомарно перезаписує архівний файл (тимчасовий файл + fsync + перейменування)."""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as raw_handle:
+        with gzip.GzipFile(fileobj=raw_handle, mode="wb") as gzip_handle:
+            for record in records:
+                gzip_handle.write((json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8"))
+        raw_handle.flush()
+        os.fsync(raw_handle.fileno())
+    os.replace(tmp_path, path)
+
+
+def archive_appointments(repository, cutoff: str, archive_dir: str = ARCHIVE_DIR) -> Tuple[int, int]:
+    """
+    Переносить записи, раніші за `cutoff`, з репозиторію в архів і ущільнює репозиторій.
+
+    Спершу записи дописуються в архівні файли своїх місяців (записи, що вже є
+    в архіві, не дублюються - наприклад, після збою між архівацією та видаленням),
+    і лише після успішного запису на диск видаляються зі сховища.
+
+    :param repository: Сховище записів.
+    :type repository: appointments.AppointmentRepository
+    :param cutoff: Перша дата "YYYY-MM-DD", записи на яку залишаються у сховищі.
+    :type cutoff: str
+    :param archive_dir: Каталог архіву.
+    :type archive_dir: str
+    :returns: Кортеж (заархівовано нових записів, видалено зі сховища).
+    :rtype: tuple[int, int]
+    :raises OSError: Якщо не вдалося записати архів (тоді сховище не змінюється).
+    :raises sqlite3.Error: Якщо не вдалося видалити записи з бази даних.
+    """
+    last_archived_day = str(datetime.strptime(cutoff, "%Y-%m-%d").date() - timedelta(days=1))
+    by_month: Dict[str, List[dict]] = {}
+    for record in repository.list_between("", last_archived_day):
+        by_month.setdefault(record["time"][:7], []).append(
+            {"user_id": record["user_id"], "name": record["name"], "time": record["time"]}
+        )
+    if not by_month:
+        return 0, 0
+
+    os.makedirs(archive_dir, exist_ok=True)
+    archived = 0
+    for month, records in sorted(by_month.items()):
+        path = partition_path(archive_dir, month)
+        existing = _read_partition(path)
+        known = {(record["user_id"], record["time"], record["name"]) for record in existing}
+        new_records = [
+            record for record in records if (record["user_id"], record["time"], record["name"]) not in known
+        ]
+        if new_records:
+            merged = sorted(existing + new_records, key=lambda record: record["time"])
+            _write_partition(path, merged)
+            archived += len(new_records)
+    removed = repository.delete_before(cutoff)
+    logger.info(
+        "Archived %s appointments before %s into %s (%s partitions). Removed from store: %s.",
+        archived, cutoff, archive_dir, len(by_month), removed
+    )
+    return archived, removed
+
+
+def iter_archive(start: str = "", end: str = "", user_id: Optional[int] = None,
+                 archive_dir: str = ARCHIVE_DIR) -> Iterator[dict]:
+    """
+    Послідовно читає архівні записи діапазону дат, впорядковані за часом.
+
+    Відкриваються лише файли місяців, що перетинаються з діапазоном; записи
+    читаються по рядку, тому пам'ять не залежить від розміру архіву.
+
+    :param start: Початок діапазону "YYYY-MM-DD" (порожній рядок - з найпершого запису).
+    :type start: str
+    :param end: Кінець діапазону включно (порожній рядок - до найостаннішого запису).
+    :type end: str
+    :param user_id: Лише записи цього користувача (None - усі).
+    :type user_id: int or None
+    :param archive_dir: Каталог архіву.
+    :type archive_dir: str
+    :rtype: Iterator[dict]
+    """
+    try:
+        months = sorted(
+            name[len(_PARTITION_PREFIX):-len(_PARTITION_SUFFIX)] for name in os.listdir(archive_dir)
+            if name.startswith(_PARTITION_PREFIX) and name.endswith(_PARTITION_SUFFIX)
+        )
+    except FileNotFoundError:
+        return
+    # Файли місяців поза діапазоном не відкриваються
+    months = [month for month in months if start[:7] <= month and (not end or month <= end[:7])]
+    upper = (end or "9999-12-31") + "~"
+    for month in months:
+        path = partition_path(archive_dir, month)
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as file_handle:
+                for line in file_handle:
+                    if not line.strip():
+                        continue
+                    record = json.loads(line)
+                    if not start <= record["time"] <= upper:
+                        continue
+                    if user_id is not None and record["user_id"] != user_id:
+                        continue
+                    yield record
+        except (OSError, EOFError, ValueError) as e:
+            logger.error("ERR_ARCHIVE_001: Archive file %s is unreadable. Skipping it. Error: %s", path, e)
+
+
+def main():
+    """Командний рядок архіву записів."""
+    parser = argparse.ArgumentParser(description="Архів минулих записів на консультацію.")
+    parser.add_argument("--dir", default=ARCHIVE_DIR, help="Каталог архіву.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    query_parser = subparsers.add_parser("query", help="Показати архівні записи.")
+    query_parser.add_argument("--from", dest="start", default="", help="Дата від (YYYY-MM-DD).")
+    query_parser.add_argument("--to", dest="end", default="", help="Дата до включно (YYYY-MM-DD).")
+    query_parser.add_argument("--user", type=int, help="ID користувача.")
+    query_parser.add_argument("--json", action="store_true", help="Виводити записи як JSON, по одному на рядок.")
+    run_parser = subparsers.add_parser(
+        "run", help="Заархівувати минулі записи зараз (з APPOINTMENTS_BACKEND=json - лише при зупиненому боті)."
+    )
+    run_parser.add_argument(
+        "--retention-days", type=int, default=APPOINTMENTS_RETENTION_DAYS,
+        help="Скільки минулих днів залишити у сховищі."
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if args.command == "query":
+        found = 0
+        for record in iter_archive(args.start, args.end, args.user, args.dir):
+            found += 1
+            if args.json:
+                print(json.dumps(record, ensure_ascii=False))
+            else:
+                print(f"— {record['time']}, {record['name']} (ID {record['user_id']})")
+        if not args.json:
+            print(f"Found: {found}")
+    elif args.command == "run":
+        # pylint: disable=import-outside-toplevel
+        from for_test.appointments import create_appointment_repository
+        repository = create_appointment_repository()
+        try:
+            archived, removed = archive_appointments(
+                repository, archive_cutoff(retention_days=args.retention_days), args.dir
+            )
+        finally:
+            repository.close()
+        print(f"Archived: {archived}, removed from store: {removed}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""
+Модуль перегляду та обслуговування записів на консультацію.
+
+Містить посторінковий перегляд записів адміністратором (/appointments),
+календар зайнятості слотів для користувачів і перенесення минулих записів
+в архів. Дані беруться зі сховища записів та індексу вільних слотів
+(:mod:`for_test.utils`); для обробників бота функції мають асинхронні
+відповідники з суфіксом `_async`.
+"""
+import logging
+import os
+import sqlite3
+from datetime import datetime
+from typing import Optional, Tuple
+from for_test.appointments import AppointmentPage
+from for_test.archive import ARCHIVE_DIR, archive_appointments, archive_cutoff
+from for_test.metrics import timed_storage_call
+from for_test.utils import (
+    APPOINTMENT_HOURS, booking_window_dates, format_message, get_appointment_repository, get_availability_index,
+    is_availability_index_loaded, load_language_message, run_blocking, working_slots_for_date
+)
+
+# Створюємо логер для цього модуля
+logger = logging.getLogger(__name__)
+
+# Кількість записів на одній сторінці перегляду записів адміністратором
+ADMIN_PAGE_SIZE = int(os.environ.get("ADMIN_PAGE_SIZE", "10"))
+
+
+@timed_storage_call("list_appointments_page")
+def get_appointments_page(start: str = "", end: str = "", user_id: Optional[int] = None,
+                          after: Optional[Tuple[str, int]] = None,
+                          before: Optional[Tuple[str, int]] = None) -> Optional[AppointmentPage]:
+    """
+    Читає одну сторінку записів для адміністратора.
+
+    Сторінка читається від курсора (див. :meth:`appointments.AppointmentRepository.list_page`),
+    тому її вартість не залежить від кількості записів в історії.
+    Розмір сторінки задається змінною середовища `ADMIN_PAGE_SIZE`.
+
+    :param start: Початок діапазону дат "YYYY-MM-DD" (порожній рядок - без обмеження).
+    :type start: str
+    :param end: Кінець діапазону дат включно (порожній рядок - без обмеження).
+    :type end: str
+    :param user_id: Лише записи цього користувача (None - усі).
+    :type user_id: int or None
+    :param after: Курсор останнього запису попередньої сторінки.
+    :type after: tuple or None
+    :param before: Курсор першого запису наступної сторінки.
+    :type before: tuple or None
+    :returns: Сторінка записів або None, якщо сховище недоступне.
+    :rtype: appointments.AppointmentPage or None
+    """
+    try:
+        return get_appointment_repository().list_page(
+            start, end, user_id, after=after, before=before, limit=ADMIN_PAGE_SIZE
+        )
+    except (OSError, ValueError, sqlite3.Error) as e:
+        logger.error(
+            "ERR_UTIL_010: Failed to load appointments for admin. "
+            "Error: %s", e, exc_info=True
+        )
+        return None
+
+
+def format_appointments_page(lang: str, page: Optional[AppointmentPage], start: str = "",
+                             end: str = "", user_id: Optional[int] = None) -> str:
+    """
+    Форматує сторінку записів для адміністратора: заголовок, фільтри та записи.
+
+    :param lang: Код мови адміністратора.
+    :type lang: str
+    :param page: Сторінка записів (None - помилка завантаження).
+    :type page: appointments.AppointmentPage or None
+    :rtype: str
+    """
+    if page is None:
+        return load_language_message(lang, 'data_load_error')
+    lines = [load_language_message(lang, 'admin_appointments_title')]
+    if start or end:
+        lines.append(format_message(lang, 'admin_appointments_period', start=start or "…", end=end or "…"))
+    if user_id is not None:
+        lines.append(format_message(lang, 'admin_appointments_user', user_id=user_id))
+    if not page.records:
+        lines.append(load_language_message(lang, 'no_appointments_admin'))
+    lines.extend(
+        f"— {record['time']}, {record['name']} (ID {record['user_id']})" for record in page.records
+    )
+    return "\n".join(lines)
+
+
+def get_appointments_for_admin(lang: str = 'uk') -> str:
+    """
+    Отримує відформатовану першу сторінку записів для адміністратора.
+
+    Наступні сторінки переглядаються кнопками під повідомленням
+    (див. :func:`get_appointments_page`).
+
+    :param lang: Код мови адміністратора.
+    :type lang: str
+    :returns: Текст сторінки або повідомлення про відсутність записів чи помилку.
+    :rtype: str
+    """
+    return format_appointments_page(lang, get_appointments_page())
+
+
+@timed_storage_call("archive_appointments")
+def archive_past_appointments() -> Tuple[int, int]:
+    """
+    Переносить минулі записи зі сховища записів в архів (див. :mod:`for_test.archive`).
+
+    Після архівації минулі дати видаляються і з індексу вільних слотів.
+
+    :returns: Кортеж (заархівовано записів, видалено зі сховища).
+    :rtype: tuple[int, int]
+    :raises OSError: Якщо не вдалося записати архів.
+    :raises sqlite3.Error: Якщо не вдалося видалити записи з бази даних.
+    """
+    cutoff = archive_cutoff()
+    result = archive_appointments(get_appointment_repository(), cutoff, ARCHIVE_DIR)
+    if is_availability_index_loaded():
+        get_availability_index().remove_before(cutoff)
+    return result
+
+
+# Позначки слотів у календарі зайнятості
+OCCUPANCY_FREE_MARK = "🟩"
+OCCUPANCY_FULL_MARK = "🟥"
+
+
+@timed_storage_call("list_appointments_for_user")
+def get_appointments_for_user(lang: str = 'uk') -> str:
+    """
+    Повертає календар зайнятості слотів на вікно бронювання для користувачів.
+
+    Кожен робочий день вікна (ті самі дати, що й у :func:`for_test.utils.get_available_dates`) -
+    окремий рядок, кожен слот - позначка "вільно" або "зайнято". Дані беруться
+    з індексу вільних слотів, який оновлюється при кожному бронюванні, тож історія
+    записів не перечитується; імена та ID користувачів не показуються.
+
+    :param lang: Код мови користувача.
+    :type lang: str
+    :returns: Календар зайнятості або повідомлення про помилку.
+    :rtype: str
+    """
+    try:
+        index = get_availability_index()
+    except (OSError, ValueError, sqlite3.Error) as e:
+        logger.error(
+            "ERR_UTIL_011: Failed to load appointments for user. "
+            "Error: %s", e, exc_info=True
+        )
+        return load_language_message(lang, 'data_load_error')
+    weekdays = load_language_message(lang, 'weekdays_short').split(",")
+    lines = [
+        load_language_message(lang, 'occupancy_title'),
+        format_message(lang, 'occupancy_legend', free=OCCUPANCY_FREE_MARK, full=OCCUPANCY_FULL_MARK,
+                       hours=" ".join(f"{hour:02d}" for hour in APPOINTMENT_HOURS)),
+    ]
+    for date_str in booking_window_dates():
+        day = datetime.strptime(date_str, "%Y-%m-%d")
+        weekday = weekdays[day.weekday()] if len(weekdays) == 7 else ""
+        marks = "".join(
+            OCCUPANCY_FREE_MARK if free else OCCUPANCY_FULL_MARK
+            for free in index.occupancy(date_str, working_slots_for_date(date_str))
+        )
+        lines.append(f"{weekday} {day:%d.%m} {marks}".lstrip())
+    return "\n".join(lines)
+
+
+# --- Асинхронний доступ до даних ---
+
+async def get_appointments_for_admin_async(lang: str = 'uk') -> str:
+    """Асинхронний відповідник :func:`get_appointments_for_admin`."""
+    return await run_blocking(get_appointments_for_admin, lang)
+
+
+async def get_appointments_page_async(start: str = "", end: str = "", user_id: Optional[int] = None,
+                                      after: Optional[Tuple[str, int]] = None,
+                                      before: Optional[Tuple[str, int]] = None) -> Optional[AppointmentPage]:
+    """Асинхронний відповідник :func:`get_appointments_page`."""
+    return await run_blocking(get_appointments_page, start, end, user_id, after, before)
+
+
+async def get_appointments_for_user_async(lang: str = 'uk') -> str:
+    """
+    Асинхронний відповідник :func:`get_appointments_for_user`.
+
+    Коли індекс вільних слотів уже побудований, календар будується одразу в пам'яті.
+    """
+    if is_availability_index_loaded():
+        return get_appointments_for_user(lang)
+    return await run_blocking(get_appointments_for_user, lang)
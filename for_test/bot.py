@@ -5,92 +5,362 @@
 реєстрацію всіх обробників повідомлень та запуск
 процесу прослуховування вхідних оновлень від Telegram API.
 """
+import asyncio
 import logging
 import os
-from logging.handlers import RotatingFileHandler # Для ротації логів
-from telegram.ext import ApplicationBuilder
+import sqlite3
+from datetime import datetime
+from telegram import Update
+from telegram.ext import ApplicationBuilder, TypeHandler
 from handlers import register_handlers
-from for_test.utils import load_language_message, send_admin_notification # Для локалізованих повідомлень
+from for_test.storage import flush_all_stores, LANGUAGES_BACKEND
+from for_test.appointments import APPOINTMENTS_BACKEND
+from for_test.persistence import SqlitePersistence
+from for_test.update_processing import AdmissionQueue, PerChatUpdateProcessor
+from for_test.sharding import BOT_WORKERS, ShardedIngress, current_shard, serve_worker, shard_log_file, shard_port
+from for_test.archive import ARCHIVE_JOB_TIME
+from for_test.logging_config import configure_logging, get_logging_stats
+from for_test.responses import get_render_stats
+from for_test.content import CONTENT_RELOAD_INTERVAL, content_reloader, watch_content
+from for_test.keyboards import get_keyboard_stats
+from for_test.metrics import registry, start_metrics_server, stop_metrics_server, METRICS_PORT
+from for_test.notifications import dispatcher, get_notification_stats
+from for_test.utils import (
+    load_language_message, get_availability_index,
+    run_blocking, monitor_event_loop_lag, shutdown_io_executor,
+    get_event_loop_lag_stats, get_admin_registry
+) # Для локалізованих повідомлень
+from for_test.bookings import archive_past_appointments
+from for_test.reference_cache import get_reference_cache_stats
 
 # --- Налаштування логування ---
-# Визначаємо шлях до лог-файлу. Рекомендується використовувати абсолютний шлях
-LOG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'bot.log')
+# Визначаємо шлях до лог-файлу. Рекомендується використовувати абсолютний шлях.
+# Процеси-обробники (BOT_WORKERS > 1) пишуть кожен у власний файл
+LOG_FILE = shard_log_file(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'bot.log'))
 
 # Отримуємо рівень логування зі змінної середовища, за замовчуванням INFO
 LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO').upper()
 # Перетворюємо рядок на рівень логування
 NUMERIC_LOG_LEVEL = getattr(logging, LOG_LEVEL, logging.INFO)
 
+# Консольний і файловий обробники працюють у фоновому потоці через чергу
+# (див. for_test.logging_config), тому логування не блокує цикл подій.
+configure_logging(NUMERIC_LOG_LEVEL, LOG_FILE)
+
 # Створюємо логер
 logger = logging.getLogger(__name__)
-logger.setLevel(NUMERIC_LOG_LEVEL)
-
-# Створюємо форматувальник для логів: час, ім'я логера, рівень, повідомлення
-formatter = logging.Formatter(
-    '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
-
-# Створюємо консольний обробник (для виводу в термінал)
-console_handler = logging.StreamHandler()
-console_handler.setLevel(NUMERIC_LOG_LEVEL)
-console_handler.setFormatter(formatter)
-logger.addHandler(console_handler)
-
-# Створюємо файловий обробник з ротацією (за розміром)
-# Максимальний розмір файлу 5 MB, зберігаємо 5 останніх файлів
-file_handler = RotatingFileHandler(
-    LOG_FILE, maxBytes=5 * 1024 * 1024, backupCount=5, encoding='utf-8'
-)
-file_handler.setLevel(NUMERIC_LOG_LEVEL)
-file_handler.setFormatter(formatter)
-logger.addHandler(file_handler)
-
-# Додатково, для логування винятків
-logging.basicConfig(level=logging.INFO, handlers=[console_handler, file_handler])
 
 # --- Кінець налаштування логування ---
 
+# --- Режим отримання оновлень ---
+# 'polling' (за замовчуванням) або 'webhook'
+BOT_MODE = os.environ.get("BOT_MODE", "polling").lower()
+WEBHOOK_LISTEN = os.environ.get("WEBHOOK_LISTEN", "127.0.0.1")
+WEBHOOK_PORT = int(os.environ.get("WEBHOOK_PORT", "8443"))
+WEBHOOK_PATH = os.environ.get("WEBHOOK_PATH", "telegram")
+# Публічна адреса (наприклад, https://bot.example.com), на яку Telegram надсилатиме оновлення
+WEBHOOK_URL = os.environ.get("WEBHOOK_URL", "")
+WEBHOOK_SECRET_TOKEN = os.environ.get("WEBHOOK_SECRET_TOKEN", "")
+# Адреса Bot API (порожньо - https://api.telegram.org/bot)
+TELEGRAM_API_BASE_URL = os.environ.get("TELEGRAM_API_BASE_URL", "")
+
+
+async def archive_job(context): # pylint: disable=unused-argument
+    """
+    Щоденне завдання JobQueue: переносить минулі записи в архів і ущільнює сховище записів.
+
+    :param context: Контекст завдання.
+    :type context: telegram.ext.CallbackContext
+    """
+    try:
+        await run_blocking(archive_past_appointments)
+    except (OSError, EOFError, ValueError, sqlite3.Error) as e:
+        logger.error("ERR_APP_006: Appointment archival failed. Store is left unchanged: %s", e, exc_info=True)
+
+def schedule_archive_job(app):
+    """
+    Планує щоденну архівацію минулих записів на ``ARCHIVE_JOB_TIME`` (час сервера).
+
+    З кількома процесами-обробниками архівацію виконує лише перший з них.
+    JobQueue потребує залежності ``python-telegram-bot[job-queue]``.
+
+    :param app: Об'єкт Application.
+    :type app: telegram.ext.Application
+    """
+    if current_shard() not in (None, 0):
+        return
+    if app.job_queue is None:
+        logger.warning(
+            "WARN_APP_002: JobQueue is not available (python-telegram-bot[job-queue] is not installed). "
+            "Appointment archival is not scheduled."
+        )
+        return
+    run_time = datetime.strptime(ARCHIVE_JOB_TIME, "%H:%M").time().replace(
+        tzinfo=datetime.now().astimezone().tzinfo
+    )
+    app.job_queue.run_daily(archive_job, run_time, name="archive_appointments")
+    logger.info("Appointment archival scheduled daily at %s.", ARCHIVE_JOB_TIME)
 
 async def on_start(app):
     """
     Асинхронна функція, яка виконується при успішному запуску бота.
 
-    Виводить повідомлення про те, що бот успішно запущений.
+    Будує індекс вільних слотів для запису (щоб перше бронювання не чекало
+    на читання сховища), завантажує і перевіряє файли вмісту (з пошуковим індексом FAQ,
+    готовими розкладом і контактами) та запускає стеження за їхніми змінами,
+    завантажує список адміністраторів, запускає диспетчер сповіщень адміністраторам,
+    ендпоінт метрик (якщо задано `METRICS_PORT`),
+    моніторинг затримки циклу подій, планує щоденну архівацію минулих записів
+    та виводить повідомлення про те, що бот успішно запущений.
 
     :param app: Об'єкт Application, що представляє екземпляр бота.
     :type app: telegram.ext.Application
     """
+    await run_blocking(get_availability_index)
+    # Файл, що відсутній чи не пройшов перевірку, завантажиться при першому зверненні або після виправлення
+    await run_blocking(content_reloader.check)
+    await run_blocking(get_admin_registry().reload)
+    registry.register_collector("event_loop_lag", get_event_loop_lag_stats)
+    registry.register_collector("reference_cache", get_reference_cache_stats)
+    registry.register_collector("keyboard_cache", get_keyboard_stats)
+    registry.register_collector("response_cache", get_render_stats)
+    registry.register_collector("logging_queue", get_logging_stats)
+    registry.register_collector("admin_notifications", get_notification_stats)
+    registry.register_collector("admins", get_admin_registry().get_stats)
+    registry.register_collector("content", content_reloader.get_stats)
+    if isinstance(app.update_processor, PerChatUpdateProcessor):
+        registry.register_collector("update_processing", app.update_processor.get_stats)
+    if isinstance(app.update_queue, AdmissionQueue):
+        registry.register_collector("update_queue", app.update_queue.get_stats)
+    if isinstance(app.persistence, SqlitePersistence):
+        registry.register_collector("conversation_persistence", app.persistence.store.get_stats)
+    dispatcher.start(app.bot)
+    start_metrics_server(port=shard_port(METRICS_PORT))
+    app.bot_data["event_loop_lag_task"] = asyncio.get_running_loop().create_task(
+        monitor_event_loop_lag()
+    )
+    if CONTENT_RELOAD_INTERVAL > 0:
+        app.bot_data["content_watch_task"] = asyncio.get_running_loop().create_task(
+            watch_content(app.bot)
+        )
+    schedule_archive_job(app)
     logger.info("✅ Бот запущено!")
 
+async def on_stop(app): # pylint: disable=unused-argument
+    """
+    Асинхронна функція, яка виконується після зупинки отримання оновлень.
+
+    Надсилає адміністраторам сповіщення та зведення, що ще залишилися в черзі
+    диспетчера (поки з'єднання бота з Bot API ще відкрите).
+
+    :param app: Об'єкт Application, що представляє екземпляр бота.
+    :type app: telegram.ext.Application
+    """
+    await dispatcher.stop()
+
+async def on_shutdown(app):
+    """
+    Асинхронна функція, яка виконується під час зупинки бота.
+
+    Зупиняє моніторинг затримки циклу подій і стеження за файлами вмісту, дочікується завершення
+    операцій введення-виведення, що ще виконуються у пулі потоків,
+    і записує на диск усі відкладені зміни сховищ даних.
+
+    :param app: Об'єкт Application, що представляє екземпляр бота.
+    :type app: telegram.ext.Application
+    """
+    for task_name in ("event_loop_lag_task", "content_watch_task"):
+        task = app.bot_data.pop(task_name, None)
+        if task is not None:
+            task.cancel()
+    stop_metrics_server()
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(None, shutdown_io_executor)
+    await loop.run_in_executor(None, flush_all_stores)
+    logger.info("Бот зупинено.")
+
+def run_webhook(application):
+    """
+    Запускає бота в режимі вебхука.
+
+    Піднімає локальний HTTP-сервер (``WEBHOOK_LISTEN``:``WEBHOOK_PORT``), який
+    приймає оновлення від Telegram за шляхом ``WEBHOOK_PATH``, та реєструє
+    публічну адресу ``WEBHOOK_URL`` через setWebhook. Якщо задано
+    ``WEBHOOK_SECRET_TOKEN``, запити без відповідного заголовка
+    ``X-Telegram-Bot-Api-Secret-Token`` відхиляються. Зупинка за SIGINT/SIGTERM
+    коректна: сервер перестає приймати запити, оновлення в черзі обробляються,
+    після чого виконується on_shutdown.
+
+    :param application: Об'єкт Application з уже зареєстрованими обробниками.
+    :type application: telegram.ext.Application
+    """
+    if not WEBHOOK_URL:
+        logger.critical("ERR_APP_003: WEBHOOK_URL environment variable is not set. Webhook mode cannot start.")
+        return
+    url_path = WEBHOOK_PATH.strip("/")
+    webhook_url = f"{WEBHOOK_URL.rstrip('/')}/{url_path}"
+    logger.info(
+        "Запуск webhook на %s:%s/%s (публічна адреса %s)...",
+        WEBHOOK_LISTEN, WEBHOOK_PORT, url_path, webhook_url
+    )
+    application.run_webhook(
+        listen=WEBHOOK_LISTEN,
+        port=WEBHOOK_PORT,
+        url_path=url_path,
+        webhook_url=webhook_url,
+        secret_token=WEBHOOK_SECRET_TOKEN or None,
+    )
+
+def build_application(bot_token: str, updater: bool = True):
+    """
+    Створює Application з усіма обробниками, збереженням станів діалогів,
+    паралельною обробкою оновлень (див. :mod:`for_test.update_processing`) і хуками запуску/зупинки.
+
+    :param bot_token: Токен бота.
+    :type bot_token: str
+    :param updater: False - без Updater (оновлення передає вхідний процес, див. :func:`run_worker`).
+    :type updater: bool
+    :returns: Об'єкт Application.
+    :rtype: telegram.ext.Application
+    """
+    builder = (
+        ApplicationBuilder().token(bot_token)
+        # Стани діалогів і user_data переживають перезапуск бота
+        .persistence(SqlitePersistence())
+        # Оновлення різних чатів обробляються паралельно, одного чату - по черзі
+        .concurrent_updates(PerChatUpdateProcessor())
+        .update_queue(AdmissionQueue())
+        .post_init(on_start).post_stop(on_stop).post_shutdown(on_shutdown)
+    )
+    if TELEGRAM_API_BASE_URL:
+        # Локальний Bot API сервер або заглушка для навантажувальних тестів
+        builder = builder.base_url(TELEGRAM_API_BASE_URL)
+    if not updater:
+        builder = builder.updater(None)
+    application = builder.build()
+    register_handlers(application)
+    return application
+
+def run_worker(shard: int, update_queue, bot_token: str):
+    """
+    Точка входу процесу-обробника в режимі ``BOT_WORKERS`` > 1.
+
+    Обробляє оновлення своїх користувачів, які передає вхідний процес
+    (див. :class:`for_test.sharding.ShardedIngress`).
+
+    :param shard: Номер процесу-обробника.
+    :type shard: int
+    :param update_queue: Черга оновлень цього процесу.
+    :type update_queue: multiprocessing.Queue
+    :param bot_token: Токен бота.
+    :type bot_token: str
+    """
+    logger.info("Bot worker %d started (pid %d).", shard, os.getpid())
+    asyncio.run(serve_worker(build_application(bot_token, updater=False), update_queue))
+
+async def on_ingress_start(app):
+    """
+    Хук запуску вхідного процесу в режимі ``BOT_WORKERS`` > 1.
+
+    :param app: Вхідний Application.
+    :type app: telegram.ext.Application
+    """
+    ingress = app.bot_data["ingress"]
+    registry.register_collector("sharding", ingress.get_stats)
+    registry.register_collector("logging_queue", get_logging_stats)
+    start_metrics_server()
+    logger.info("✅ Бот запущено: %d процесів-обробників.", ingress.workers)
+
+async def on_ingress_shutdown(app):
+    """
+    Хук зупинки вхідного процесу: чекає, доки процеси-обробники оброблять свої черги.
+
+    :param app: Вхідний Application.
+    :type app: telegram.ext.Application
+    """
+    stop_metrics_server()
+    await asyncio.get_running_loop().run_in_executor(None, app.bot_data["ingress"].stop)
+    logger.info("Бот зупинено.")
+
+def build_ingress_application(bot_token: str, ingress: ShardedIngress):
+    """
+    Створює вхідний Application, який лише передає кожне оновлення процесу-обробнику.
+
+    Оновлення обробляються по одному, тому порядок оновлень кожного користувача
+    в черзі процесу-обробника збігається з порядком отримання.
+
+    :param bot_token: Токен бота.
+    :type bot_token: str
+    :param ingress: Розподільник оновлень між процесами-обробниками.
+    :type ingress: sharding.ShardedIngress
+    :returns: Об'єкт Application.
+    :rtype: telegram.ext.Application
+    """
+    builder = (
+        ApplicationBuilder().token(bot_token)
+        .post_init(on_ingress_start).post_shutdown(on_ingress_shutdown)
+    )
+    if TELEGRAM_API_BASE_URL:
+        builder = builder.base_url(TELEGRAM_API_BASE_URL)
+    application = builder.build()
+    application.bot_data["ingress"] = ingress
+    application.add_handler(TypeHandler(Update, ingress.forward))
+    return application
+
 def main():
     """
     Головна функція для ініціалізації та запуску Telegram-бота.
 
     Створює екземпляр Application, реєструє в ньому всі обробники
-    та запускає бота в режимі довгого опитування (polling),
-    що дозволяє йому постійно слухати нові повідомлення.
+    та запускає бота в режимі довгого опитування (polling) або,
+    якщо ``BOT_MODE=webhook``, у режимі вебхука (див. :func:`run_webhook`).
+    Якщо ``BOT_WORKERS`` > 1, цей процес лише отримує оновлення й розподіляє
+    їх між процесами-обробниками (див. :mod:`for_test.sharding`).
     """
     bot_token = os.environ.get("BOT_TOKEN")
     if not bot_token:
         logger.critical("ERR_APP_001: BOT_TOKEN environment variable is not set. Bot cannot start.")
         # Тут неможливо відправити адмін-сповіщення, бо бот ще не ініціалізовано
         return
+    if BOT_MODE not in ("polling", "webhook"):
+        logger.critical("ERR_APP_004: Unknown BOT_MODE '%s'. Expected 'polling' or 'webhook'.", BOT_MODE)
+        return
 
-    application = ApplicationBuilder().token(bot_token).post_init(on_start).build()
-
-    register_handlers(application)
+    if BOT_WORKERS > 1:
+        if APPOINTMENTS_BACKEND != "sqlite" or LANGUAGES_BACKEND != "sqlite":
+            logger.critical(
+                "ERR_APP_005: BOT_WORKERS > 1 requires APPOINTMENTS_BACKEND=sqlite and LANGUAGES_BACKEND=sqlite "
+                "(JSON files are not safe for several processes)."
+            )
+            return
+        ingress = ShardedIngress(BOT_WORKERS, run_worker, (bot_token,))
+        ingress.start()
+        application = build_ingress_application(bot_token, ingress)
+    else:
+        application = build_application(bot_token)
 
     try:
-        logger.info("Запуск polling...")
-        application.run_polling()
+        if BOT_MODE == "webhook":
+            run_webhook(application)
+        else:
+            logger.info("Запуск polling...")
+            application.run_polling()
     except Exception as e:
-        logger.critical(f"ERR_APP_002: Бот завершив роботу через критичну помилку: {e}", exc_info=True)
+        logger.critical("ERR_APP_002: Бот завершив роботу через критичну помилку: %s", e, exc_info=True)
         # Намагаємося надіслати сповіщення адміністратору, якщо бот хоч якось функціонував
         # (хоча при критичній помилці запуску це може не спрацювати)
         admin_message = load_language_message('uk', 'admin_critical_error_notification')
-        # Так як context.bot недоступний тут напряму, передаємо application.bot
-        send_admin_notification(application.bot, f"{admin_message}\nПомилка: {e}")
 
+        async def _notify():
+            # Цикл подій застосунку вже зупинено, тому бот ініціалізуємо окремо
+            # і надсилаємо напряму, оминаючи чергу диспетчера.
+            async with application.bot:
+                await dispatcher.send_now(application.bot, f"{admin_message}\nПомилка: {e}")
+
+        try:
+            asyncio.run(_notify())
+        except Exception as notify_error:
+            logger.error("ERR_APP_007: Не вдалося сповістити адміністраторів про збій: %s", notify_error)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,320 @@
+"""
+Модуль перезавантаження вмісту Telegram-бота без перезапуску.
+
+Редактори змінюють ``faq.json``, ``court_info.json``, ``court_schedule.json``,
+``contacts.json`` і ``messages.json``. :class:`ContentReloader` не частіше ніж
+раз на ``CONTENT_RELOAD_INTERVAL`` секунд перевіряє час модифікації та розмір
+цих файлів у пулі потоків, а змінений файл читає, перевіряє за схемою і лише
+тоді встановлює разом із похідними даними (пошуковий індекс FAQ,
+скомпільований каталог повідомлень). Готові тексти прив'язані до версії
+даних і каталогу повідомлень, тому перебудовуються в тому самому проході
+одразу після заміни; кешовані клавіатури мають ті самі ключі й
+перебудовуються при першому зверненні після заміни. Файл, що не пройшов
+перевірку, не замінює попередню версію.
+
+Між перевірками обробники отримують дані з пам'яті, не звертаючись до диска.
+Команда /reload запускає перевірку негайно і показує, що перезавантажено.
+"""
+import asyncio
+import json
+import logging
+import os
+import string
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+from for_test.faq_search import FaqIndex
+from for_test.keyboards import get_faq_keyboard
+from for_test.notifications import send_admin_notification
+from for_test.reference_cache import install_reference_data
+from for_test.responses import prerender_responses
+from for_test.utils import (
+    FALLBACK_MESSAGE_LANGUAGE, MESSAGES_FILE, REQUIRED_MESSAGE_KEYS, compile_message_catalog, format_message,
+    install_faq_data, install_message_catalog, load_language_message, run_blocking
+)
+
+# Створюємо логер для цього модуля
+logger = logging.getLogger(__name__)
+
+# Як часто (секунди) перевіряти файли вмісту на диску (0 - лише командою /reload)
+CONTENT_RELOAD_INTERVAL = float(os.environ.get("CONTENT_RELOAD_INTERVAL", "5"))
+
+
+class ContentValidationError(ValueError):
+    """Вміст файлу не відповідає очікуваній структурі."""
+
+
+def _expect(condition: bool, where: str, expected: str):
+    if not condition:
+        raise ContentValidationError(f"{where}: expected {expected}")
+
+
+def _expect_text(value: Any, where: str):
+    _expect(isinstance(value, str) and bool(value.strip()), where, "non-empty string")
+
+
+def _expect_languages(data: Any) -> Dict[str, Any]:
+    _expect(isinstance(data, dict) and bool(data), "root", "object with language codes as keys")
+    return data
+
+
+def validate_faq(data: Any):
+    """Перевіряє faq.json: {мова: {питання: відповідь}}."""
+    for lang, questions in _expect_languages(data).items():
+        _expect(isinstance(questions, dict) and bool(questions), lang, "object {question: answer}")
+        for question, answer in questions.items():
+            _expect_text(question, f"{lang}")
+            _expect_text(answer, f"{lang}.{question}")
+
+
+def validate_court_info(data: Any):
+    """Перевіряє court_info.json: {мова: {address, work_time, phone, email}}."""
+    for lang, info in _expect_languages(data).items():
+        _expect(isinstance(info, dict), lang, "object")
+        for field in ("address", "work_time", "phone", "email"):
+            _expect_text(info.get(field), f"{lang}.{field}")
+
+
+def validate_court_schedule(data: Any):
+    """Перевіряє court_schedule.json: [{date, case, time, judge}] (список може бути порожнім)."""
+    _expect(isinstance(data, list), "root", "list of hearings")
+    for position, item in enumerate(data):
+        _expect(isinstance(item, dict), f"[{position}]", "object")
+        for field in ("date", "case", "time", "judge"):
+            _expect_text(item.get(field), f"[{position}].{field}")
+
+
+def validate_contacts(data: Any):
+    """Перевіряє contacts.json: {мова: [{org, phone}]}."""
+    for lang, entries in _expect_languages(data).items():
+        _expect(isinstance(entries, list), lang, "list of contacts")
+        for position, entry in enumerate(entries):
+            _expect(isinstance(entry, dict), f"{lang}[{position}]", "object")
+            _expect_text(entry.get("org"), f"{lang}[{position}].org")
+            _expect_text(entry.get("phone"), f"{lang}[{position}].phone")
+
+
+def validate_messages(data: Any):
+    """Перевіряє messages.json: {мова: {ключ: шаблон}} з коректними ``{name}`` і обов'язковими ключами."""
+    formatter = string.Formatter()
+    for lang, messages in _expect_languages(data).items():
+        _expect(isinstance(messages, dict) and bool(messages), lang, "object {key: message}")
+        for key, message in messages.items():
+            _expect(isinstance(message, str), f"{lang}.{key}", "string")
+            try:
+                names = [name for _, name, _, _ in formatter.parse(message) if name is not None]
+            except ValueError as e:
+                raise ContentValidationError(f"{lang}.{key}: invalid template: {e}") from e
+            _expect(all(name.isidentifier() for name in names), f"{lang}.{key}", "named parameters like {name}")
+    fallback = data.get(FALLBACK_MESSAGE_LANGUAGE)
+    _expect(isinstance(fallback, dict), FALLBACK_MESSAGE_LANGUAGE, "fallback language messages")
+    for key in REQUIRED_MESSAGE_KEYS:
+        _expect_text(fallback.get(key), f"{FALLBACK_MESSAGE_LANGUAGE}.{key}")
+
+
+def _install_faq(signature: Tuple[int, int], data: Any):
+    # Індекс будується до заміни й встановлюється разом з даними
+    install_faq_data(signature, data, FaqIndex(data))
+    for lang in data:
+        get_faq_keyboard(lang)
+
+
+def _install_reference(file_name: str) -> Callable[[Tuple[int, int], Any], None]:
+    def install(signature: Tuple[int, int], data: Any):
+        install_reference_data(file_name, signature, data)
+    return install
+
+
+def _install_messages(signature: Tuple[int, int], data: Any): # pylint: disable=unused-argument
+    install_message_catalog(compile_message_catalog(data))
+
+
+class ContentFile(NamedTuple):
+    """Файл вмісту: назва у звітах, шлях, перевірка схеми, встановлення в пам'ять."""
+    name: str
+    path: str
+    validate: Callable[[Any], None]
+    install: Callable[[Tuple[int, int], Any], None]
+    # Чи залежать від файлу готові тексти (for_test.responses)
+    rendered: bool
+
+
+CONTENT_FILES: Tuple[ContentFile, ...] = (
+    ContentFile("messages.json", MESSAGES_FILE, validate_messages, _install_messages, True),
+    ContentFile("faq.json", "faq.json", validate_faq, _install_faq, False),
+    ContentFile("court_info.json", "court_info.json", validate_court_info,
+                _install_reference("court_info.json"), False),
+    ContentFile("court_schedule.json", "court_schedule.json", validate_court_schedule,
+                _install_reference("court_schedule.json"), True),
+    ContentFile("contacts.json", "contacts.json", validate_contacts, _install_reference("contacts.json"), True),
+)
+
+
+class ReloadResult(NamedTuple):
+    """
+    Результат перевірки одного файлу вмісту.
+
+    :ivar file: Назва файлу.
+    :ivar status: 'reloaded', 'unchanged', 'failed' або 'missing'.
+    :ivar duration_ms: Тривалість останнього завантаження (читання, перевірка, встановлення), мс.
+    :ivar loaded_at: Час (Unix) останнього успішного завантаження або None.
+    :ivar error: Опис помилки для 'failed'.
+    """
+    file: str
+    status: str
+    duration_ms: float
+    loaded_at: Optional[float]
+    error: str = ""
+
+
+class ContentReloader:
+    """
+    Перевіряє файли вмісту і встановлює змінені після перевірки за схемою.
+
+    :param files: Файли вмісту.
+    :type files: tuple[ContentFile, ...]
+    """
+
+    def __init__(self, files: Tuple[ContentFile, ...] = CONTENT_FILES):
+        self.files = files
+        # Одна перевірка одночасно (фонове завдання і команда /reload)
+        self._lock = threading.Lock()
+        # Назва файлу -> (mtime_ns, size) встановленої версії
+        self._signatures: Dict[str, Tuple[int, int]] = {}
+        # Назва файлу -> (mtime_ns, size) версії, що не пройшла перевірку (не перечитується, поки не зміниться)
+        self._rejected: Dict[str, Tuple[int, int]] = {}
+        self._results: Dict[str, ReloadResult] = {}
+        self._stats: Dict[str, int] = {"checks": 0, "reloads": 0, "reload_errors": 0}
+
+    @staticmethod
+    def _stat_signature(path: str) -> Optional[Tuple[int, int]]:
+        try:
+            file_stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return file_stat.st_mtime_ns, file_stat.st_size
+
+    def _load(self, content_file: ContentFile, signature: Tuple[int, int]) -> ReloadResult:
+        previous = self._results.get(content_file.name)
+        started = time.perf_counter()
+        try:
+            with open(content_file.path, "r", encoding="utf-8") as file_handle:
+                data = json.load(file_handle)
+            content_file.validate(data)
+            content_file.install(signature, data)
+        except (OSError, ValueError) as e:
+            # json.JSONDecodeError і ContentValidationError - підкласи ValueError
+            self._rejected[content_file.name] = signature
+            self._stats["reload_errors"] += 1
+            logger.warning(
+                "WARN_CONTENT_001: %s failed validation. Keeping the previous version. Error: %s",
+                content_file.name, e
+            )
+            return ReloadResult(
+                content_file.name, "failed", previous.duration_ms if previous else 0.0,
+                previous.loaded_at if previous else None, str(e)
+            )
+        duration_ms = (time.perf_counter() - started) * 1000
+        self._signatures[content_file.name] = signature
+        self._rejected.pop(content_file.name, None)
+        self._stats["reloads"] += 1
+        logger.info("Content file %s reloaded in %.1f ms.", content_file.name, duration_ms)
+        return ReloadResult(content_file.name, "reloaded", duration_ms, time.time())
+
+    def check(self) -> List[ReloadResult]:
+        """
+        Перевіряє всі файли вмісту і перезавантажує змінені (блокуючий виклик).
+
+        :returns: Результати для кожного файлу. Для незмінених файлів - дані останнього завантаження.
+        :rtype: list[ReloadResult]
+        """
+        with self._lock:
+            self._stats["checks"] += 1
+            render = False
+            results = []
+            for content_file in self.files:
+                signature = self._stat_signature(content_file.path)
+                previous = self._results.get(content_file.name)
+                if signature is None:
+                    if previous is None or previous.status != "missing":
+                        logger.warning(
+                            "WARN_CONTENT_002: %s not found. Keeping the previous version, if any.",
+                            content_file.name
+                        )
+                    result = ReloadResult(
+                        content_file.name, "missing", previous.duration_ms if previous else 0.0,
+                        previous.loaded_at if previous else None
+                    )
+                elif signature in (self._signatures.get(content_file.name), self._rejected.get(content_file.name)):
+                    result = previous if previous.status == "failed" else previous._replace(status="unchanged")
+                else:
+                    result = self._load(content_file, signature)
+                    render = render or (result.status == "reloaded" and content_file.rendered)
+                self._results[content_file.name] = result
+                results.append(result)
+            if render:
+                prerender_responses()
+            return results
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Повертає статистику перезавантаження вмісту.
+
+        :returns: Словник з ключами 'checks', 'reloads' та 'reload_errors'.
+        :rtype: dict
+        """
+        return dict(self._stats)
+
+
+# Перезавантаження вмісту процесу
+content_reloader = ContentReloader()
+
+
+async def watch_content(bot, interval: float = CONTENT_RELOAD_INTERVAL):
+    """
+    Фонове завдання: кожні `interval` секунд перевіряє файли вмісту у пулі потоків.
+
+    Про файл, що не пройшов перевірку, повідомляє адміністраторів (один раз для кожної його версії).
+
+    :param bot: Екземпляр бота для сповіщень адміністраторам.
+    :param interval: Інтервал між перевірками (секунди).
+    :type interval: float
+    """
+    reported: Dict[str, str] = {}
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            results = await run_blocking(content_reloader.check)
+        except Exception as e: # pylint: disable=broad-except
+            logger.error("ERR_CONTENT_001: Content reload check failed: %s", e, exc_info=True)
+            continue
+        for result in results:
+            if result.status == "failed" and reported.get(result.file) != result.error:
+                await send_admin_notification(
+                    bot, f"Помилка WARN_CONTENT_001: {result.file} не пройшов перевірку, діє попередня версія.\n"
+                         f"Помилка: {result.error}"
+                )
+            reported[result.file] = result.error
+
+
+def format_reload_report(lang: str, results: List[ReloadResult]) -> str:
+    """
+    Форматує звіт про перезавантаження вмісту для команди /reload.
+
+    :param lang: Код мови.
+    :type lang: str
+    :param results: Результати :meth:`ContentReloader.check`.
+    :type results: list[ReloadResult]
+    :rtype: str
+    """
+    lines = [load_language_message(lang, 'content_reload_title')]
+    for result in results:
+        loaded_at = (
+            datetime.fromtimestamp(result.loaded_at).strftime("%Y-%m-%d %H:%M:%S") if result.loaded_at else "—"
+        )
+        lines.append(format_message(
+            lang, f"content_reload_{result.status}", file=result.file,
+            duration=f"{result.duration_ms:.1f}", loaded_at=loaded_at, error=result.error
+        ))
+    return "\n".join(lines)
@@ -0,0 +1,232 @@
+"""
+Модуль пошуку відповідей у базі поширених питань (FAQ).
+
+Індекс будується один раз під час (пере)завантаження ``faq.json``:
+для кожної мови - інвертований індекс нормалізованих слів з уже обчисленими
+BM25-вагами та індекс триграм символів по словнику. Пошук складає ваги лише
+тих питань, що мають спільні з запитом слова, тому час відповіді майже не
+залежить від розміру бази. Слова запиту, яких немає в індексі (інше
+закінчення, друкарська помилка), замінюються найсхожішими за триграмами
+словами словника.
+"""
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Dict, FrozenSet, List, Mapping, NamedTuple, Optional, Tuple
+
+# Параметри BM25
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Мінімальна схожість (коефіцієнт Дайса за триграмами) невідомого слова запиту зі словом індексу
+FUZZY_MIN_SIMILARITY = 0.5
+# Скільки найсхожіших слів індексу враховувати для одного невідомого слова запиту
+FUZZY_MAX_EXPANSIONS = 3
+# Мінімальна частка "інформативності" (суми IDF) слів запиту, знайдених у питанні
+MIN_QUERY_COVERAGE = 0.4
+# Мінімальна сума IDF знайдених слів: збіг лише за частими словами ("як", "how") не рахується
+MIN_MATCHED_IDF = 1.0
+# Невідомі індексу слова, коротші за це, (прийменники, артиклі) не враховуються
+MIN_UNKNOWN_TOKEN_LENGTH = 4
+# Списки питань для слів, що трапляються частіше, не обходяться під час пошуку
+_MAX_SCAN_DOC_FRACTION = 0.05
+_MIN_SCAN_DOCS = 64
+# Скільки результатів пошуку схожих слів зберігати для повторних запитів
+_SIMILAR_CACHE_SIZE = 4096
+
+_TOKEN_RE = re.compile(r"\w+")
+_APOSTROPHES = str.maketrans("", "", "'’ʼ`")
+
+
+class FaqMatch(NamedTuple):
+    """Знайдене питання FAQ."""
+    lang: str
+    question: str
+    answer: str
+    score: float
+
+
+def normalize_tokens(text: str) -> List[str]:
+    """
+    Повертає нормалізовані слова тексту: нижній регістр, без апострофів і розділових знаків.
+
+    :param text: Довільний текст.
+    :type text: str
+    :rtype: list[str]
+    """
+    return _TOKEN_RE.findall(text.casefold().translate(_APOSTROPHES))
+
+
+def _trigrams(token: str) -> FrozenSet[str]:
+    padded = f" {token} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+class _LanguageIndex:
+    """
+    Індекс питань однієї мови.
+
+    ``postings`` - інвертований індекс слово -> ((номер питання, BM25-вага), ...),
+    ваги обчислені під час побудови. ``gram_terms`` - індекс триграм по словнику
+    (а не по питаннях): він потрібен лише для пошуку слів, схожих на невідоме
+    слово запиту, тому його розмір не залежить від кількості питань.
+    """
+    __slots__ = ("questions", "answers", "exact", "postings", "doc_weights", "idf", "max_idf",
+                 "terms", "term_grams", "gram_terms", "max_scan_df", "_similar_cache")
+
+    def __init__(self, entries: Mapping[str, str]):
+        self.questions: List[str] = list(entries)
+        self.answers: List[str] = [entries[question] for question in self.questions]
+        documents = [normalize_tokens(question) for question in self.questions]
+        self.exact: Dict[Tuple[str, ...], int] = {}
+        for doc_id, tokens in enumerate(documents):
+            self.exact.setdefault(tuple(tokens), doc_id)
+
+        count = len(documents)
+        avg_length = (sum(len(tokens) for tokens in documents) / count) if count else 0.0
+        raw: Dict[str, List[Tuple[int, float]]] = defaultdict(list)
+        for doc_id, tokens in enumerate(documents):
+            length_norm = BM25_K1 * (1 - BM25_B + BM25_B * len(tokens) / avg_length) if avg_length else BM25_K1
+            for term, tf in Counter(tokens).items():
+                raw[term].append((doc_id, tf * (BM25_K1 + 1) / (tf + length_norm)))
+        self.idf: Dict[str, float] = {}
+        self.postings: Dict[str, Tuple[Tuple[int, float], ...]] = {}
+        # Для кожного питання: слово -> BM25-вага (для дорахування частих слів)
+        self.doc_weights: List[Dict[str, float]] = [{} for _ in documents]
+        for term, entries_ in raw.items():
+            idf = math.log(1 + (count - len(entries_) + 0.5) / (len(entries_) + 0.5))
+            self.idf[term] = idf
+            self.postings[term] = tuple((doc_id, weight * idf) for doc_id, weight in entries_)
+            for doc_id, weight in self.postings[term]:
+                self.doc_weights[doc_id][term] = weight
+        # IDF слова, якого немає в жодному питанні
+        self.max_idf = math.log(1 + (count + 0.5) / 0.5)
+        self.max_scan_df = max(_MIN_SCAN_DOCS, int(count * _MAX_SCAN_DOC_FRACTION))
+        self._similar_cache: Dict[str, List[Tuple[str, float]]] = {}
+
+        self.terms: List[str] = sorted(self.postings)
+        self.term_grams: List[FrozenSet[str]] = [_trigrams(term) for term in self.terms]
+        gram_terms: Dict[str, List[int]] = defaultdict(list)
+        for term_id, grams in enumerate(self.term_grams):
+            for gram in grams:
+                gram_terms[gram].append(term_id)
+        self.gram_terms: Dict[str, Tuple[int, ...]] = {gram: tuple(ids) for gram, ids in gram_terms.items()}
+
+    def _similar_terms(self, token: str) -> List[Tuple[str, float]]:
+        cached = self._similar_cache.get(token)
+        if cached is not None:
+            return cached
+        grams = _trigrams(token)
+        overlaps: Dict[int, int] = defaultdict(int)
+        for gram in grams:
+            for term_id in self.gram_terms.get(gram, ()):
+                overlaps[term_id] += 1
+        similar = []
+        for term_id, overlap in overlaps.items():
+            similarity = 2 * overlap / (len(grams) + len(self.term_grams[term_id]))
+            if similarity >= FUZZY_MIN_SIMILARITY:
+                similar.append((self.terms[term_id], similarity))
+        similar.sort(key=lambda item: -item[1])
+        similar = similar[:FUZZY_MAX_EXPANSIONS]
+        if len(self._similar_cache) >= _SIMILAR_CACHE_SIZE:
+            self._similar_cache.clear()
+        self._similar_cache[token] = similar
+        return similar
+
+    def search(self, tokens: List[str]) -> Optional[Tuple[int, float]]:
+        doc_id = self.exact.get(tuple(tokens))
+        if doc_id is not None:
+            return doc_id, math.inf
+
+        # (слово індексу, частка збігу, IDF слова запиту) для кожного слова запиту
+        matches: List[Tuple[str, float, float]] = []
+        total_idf = 0.0
+        for token in set(tokens):
+            if token in self.postings:
+                token_idf = self.idf[token]
+                matches.append((token, 1.0, token_idf))
+            elif len(token) < MIN_UNKNOWN_TOKEN_LENGTH:
+                continue
+            else:
+                # Невідоме слово: інше закінчення або друкарська помилка
+                expansions = self._similar_terms(token)
+                token_idf = max((self.idf[term] for term, _ in expansions), default=self.max_idf)
+                matches.extend((term, similarity, token_idf) for term, similarity in expansions)
+            total_idf += token_idf
+        if not matches:
+            return None
+
+        # Кандидатів дають лише рідкісні слова; часті слова (на кшталт "як", "how")
+        # лише дораховуються кандидатам, без обходу їхніх довгих списків
+        rare = [match for match in matches if len(self.postings[match[0]]) <= self.max_scan_df]
+        frequent = [match for match in matches if len(self.postings[match[0]]) > self.max_scan_df]
+        if not rare:
+            rare, frequent = frequent, []
+
+        scores: Dict[int, float] = {}
+        # Сума IDF слів запиту, знайдених у кожному питанні
+        covered: Dict[int, float] = {}
+        for term, similarity, token_idf in rare:
+            gain = token_idf * similarity
+            for doc_id, weight in self.postings[term]:
+                scores[doc_id] = scores.get(doc_id, 0.0) + weight * similarity
+                covered[doc_id] = covered.get(doc_id, 0.0) + gain
+        for term, similarity, token_idf in frequent:
+            gain = token_idf * similarity
+            for doc_id in scores:
+                weight = self.doc_weights[doc_id].get(term)
+                if weight is not None:
+                    scores[doc_id] += weight * similarity
+                    covered[doc_id] += gain
+
+        min_covered = max(MIN_QUERY_COVERAGE * total_idf, MIN_MATCHED_IDF)
+        best = None
+        for doc_id, score in scores.items():
+            if covered[doc_id] >= min_covered and (best is None or score > best[1]):
+                best = (doc_id, score)
+        return best
+
+
+class FaqIndex:
+    """
+    Пошуковий індекс FAQ для всіх мов.
+
+    :param data: Вміст faq.json: {мова: {питання: відповідь}}.
+    :type data: dict
+    """
+
+    def __init__(self, data: Mapping[str, Mapping[str, str]]):
+        self._languages: Dict[str, _LanguageIndex] = {
+            lang: _LanguageIndex(entries) for lang, entries in data.items()
+        }
+
+    @property
+    def languages(self) -> Tuple[str, ...]:
+        """Мови, для яких побудовано індекс."""
+        return tuple(self._languages)
+
+    def search(self, question: str, lang: str) -> Optional[FaqMatch]:
+        """
+        Знаходить найкраще питання FAQ для довільного тексту.
+
+        Спершу шукає серед питань мови користувача, потім - серед питань
+        інших мов (наприклад, англійське питання при українському інтерфейсі).
+
+        :param question: Текст користувача.
+        :type question: str
+        :param lang: Мова користувача.
+        :type lang: str
+        :returns: Знайдене питання або None, якщо жодне не схоже на запит.
+        :rtype: FaqMatch | None
+        """
+        tokens = normalize_tokens(question)
+        if not tokens:
+            return None
+        order = [lang] if lang in self._languages else []
+        order.extend(other for other in self._languages if other != lang)
+        for candidate in order:
+            index = self._languages[candidate]
+            found = index.search(tokens)
+            if found is not None:
+                doc_id, score = found
+                return FaqMatch(candidate, index.questions[doc_id], index.answers[doc_id], score)
+        return None
@@ -7,33 +7,45 @@
 """
 import json
 import logging
-import uuid # Для генерації унікальних ID
+from datetime import datetime
+from typing import Awaitable, Callable, List, Optional
 from telegram import Update
 from telegram.ext import (
     CommandHandler, MessageHandler, CallbackQueryHandler,
     ContextTypes, ConversationHandler, filters
 )
 from for_test.utils import (
-    load_language, set_language, get_faq_answer, get_court_info,
-    get_available_dates, get_available_times_for_date,
-    save_appointment, send_admin_notification, load_language_message, is_admin
+    load_language_async, set_language_async, find_faq_answer_async, get_court_info_async,
+    get_available_dates_async, get_available_times_for_date_async,
+    save_appointment_async, load_language_message, format_message, is_admin_async,
+    is_slot_available_async, run_blocking, add_admin_async, remove_admin_async
 )
+from for_test.bookings import get_appointments_page_async, format_appointments_page, get_appointments_for_user_async
 from for_test.keyboards import (
-    get_main_menu, get_language_keyboard, get_faq_keyboard, get_inline_keyboard
+    get_main_menu, get_language_keyboard, get_faq_keyboard, get_inline_keyboard,
+    get_admin_panel_keyboard, get_appointments_page_keyboard, AppointmentsPageRequest,
+    APPOINTMENTS_PAGE_PREFIX, parse_appointments_request
 )
+from for_test.responses import render_court_schedule, render_contacts
+from for_test.router import MenuRouter, MenuButtonFilter
+from for_test.metrics import instrument_application
+from for_test.notifications import send_admin_notification
+from for_test.content import content_reloader, format_reload_report
+from for_test.logging_config import get_correlation_id
 
 # Створюємо логер для цього модуля
 logger = logging.getLogger(__name__)
 
 # Визначення станів для ConversationHandler
 LANG_SELECT, ASK_NAME, ASK_DATE, ASK_TIME = range(4)
+# Назви станів для міток метрик
+STATE_NAMES = {LANG_SELECT: "LANG_SELECT", ASK_NAME: "ASK_NAME", ASK_DATE: "ASK_DATE", ASK_TIME: "ASK_TIME"}
 
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Обробник команди /start.
 
     Надсилає вітальне повідомлення та пропонує користувачеві обрати мову інтерфейсу
     за допомогою інлайн-клавіатури. Це початкова точка входу в бота.
-    Генерує унікальний ідентифікатор кореляції для відстеження запиту.
 
     :param update: Об'єкт, що містить інформацію про вхідне оновлення (повідомлення).
     :type update: telegram.Update
@@ -44,13 +56,10 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """
     user_id = update.effective_user.id
     username = update.effective_user.username or update.effective_user.first_name
-    # Генеруємо унікальний ID для трасування запиту
-    correlation_id = str(uuid.uuid4())
-    context.user_data['correlation_id'] = correlation_id
 
     logger.info(
-        f"[REQ_ID:{correlation_id}] User {username} ({user_id}) started the dialog. "
-        f"Context: {context.user_data}"
+        "User %s (%s) started the dialog. "
+        "Context: %s", username, user_id, context.user_data
     )
     try:
         await update.message.reply_text(
@@ -58,7 +67,8 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
         )
     except Exception as e:
         logger.error(
-            f"ERR_HANDLER_001 [REQ_ID:{correlation_id}]: Failed to send start message to user {user_id}: {e}",
+            "ERR_HANDLER_001: Failed to send start message to user %s: %s",
+            user_id, e,
             exc_info=True
         )
         await update.message.reply_text(
@@ -66,7 +76,7 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
         )
         await send_admin_notification(
             context.bot,
-            f"Критична помилка ERR_HANDLER_001 [REQ_ID:{correlation_id}] при запуску діалогу.\n"
+            f"Критична помилка ERR_HANDLER_001 [REQ_ID:{get_correlation_id()}] при запуску діалогу.\n"
             f"Користувач: {username} ({user_id})\nПомилка: {e}"
         )
     return LANG_SELECT
@@ -87,11 +97,11 @@ async def language_selected(update: Update, context: ContextTypes.DEFAULT_TYPE)
     lang = update.callback_query.data
     user_id = update.effective_user.id
     username = update.effective_user.username or update.effective_user.first_name
-    correlation_id = context.user_data.get('correlation_id', 'N/A')
     try:
-        set_language(user_id, lang, correlation_id) # Передаємо correlation_id
+        await set_language_async(user_id, lang)
         logger.info(
-            f"[REQ_ID:{correlation_id}] User {username} ({user_id}) set language to '{lang}'."
+            "User %s (%s) set language to '%s'.",
+            username, user_id, lang
         )
         await update.callback_query.answer()
         await update.callback_query.message.reply_text(
@@ -99,7 +109,8 @@ async def language_selected(update: Update, context: ContextTypes.DEFAULT_TYPE)
         )
     except Exception as e:
         logger.error(
-            f"ERR_HANDLER_002 [REQ_ID:{correlation_id}]: Error setting language for user {user_id}: {e}",
+            "ERR_HANDLER_002: Error setting language for user %s: %s",
+            user_id, e,
             exc_info=True
         )
         await update.callback_query.message.reply_text(
@@ -107,7 +118,7 @@ async def language_selected(update: Update, context: ContextTypes.DEFAULT_TYPE)
         )
         await send_admin_notification(
             context.bot,
-            f"Критична помилка ERR_HANDLER_002 [REQ_ID:{correlation_id}] при встановленні мови.\n"
+            f"Критична помилка ERR_HANDLER_002 [REQ_ID:{get_correlation_id()}] при встановленні мови.\n"
             f"Користувач: {username} ({user_id})\nМова: {lang}\nПомилка: {e}"
         )
     return ConversationHandler.END
@@ -124,31 +135,33 @@ async def show_faq(update: Update, context: ContextTypes.DEFAULT_TYPE):
     :type context: telegram.ext.ContextTypes.DEFAULT_TYPE
     """
     user_id = update.effective_user.id
-    lang = load_language(user_id)
-    correlation_id = context.user_data.get('correlation_id', 'N/A')
-    logger.debug(f"[REQ_ID:{correlation_id}] User {user_id} requested FAQ. Lang: {lang}")
+    lang = await load_language_async(user_id)
+    logger.debug("User %s requested FAQ. Lang: %s", user_id, lang)
     try:
         await update.message.reply_text(
             load_language_message(lang, 'choose_faq_question'),
-            reply_markup=get_faq_keyboard(lang, correlation_id) # Передаємо correlation_id
+            reply_markup=await run_blocking(get_faq_keyboard, lang)
         )
     except Exception as e:
         logger.error(
-            f"ERR_HANDLER_003 [REQ_ID:{correlation_id}]: Error showing FAQ for user {user_id}: {e}",
+            "ERR_HANDLER_003: Error showing FAQ for user %s: %s",
+            user_id, e,
             exc_info=True
         )
         await update.message.reply_text(load_language_message(lang, 'generic_user_error_with_contact'))
         await send_admin_notification(
             context.bot,
-            f"Критична помилка ERR_HANDLER_003 [REQ_ID:{correlation_id}] при відображенні FAQ.\n"
+            f"Критична помилка ERR_HANDLER_003 [REQ_ID:{get_correlation_id()}] при відображенні FAQ.\n"
             f"Користувач: {user_id}\nПомилка: {e}"
         )
 
 async def answer_faq(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Обробник для надання відповіді на вибране питання з FAQ.
+    """Обробник для надання відповіді на питання з FAQ.
 
-    Отримує текст питання, знаходить відповідь у базі знань
-    (faq.json) та відправляє її користувачеві.
+    Отримує текст питання (вибране з клавіатури FAQ або набране довільно),
+    шукає найближче питання в базі знань (faq.json) та відправляє відповідь
+    користувачеві. Якщо схожого питання немає, повідомлення обробляється
+    як нерозпізнане (:func:`fallback_message_handler`).
 
     :param update: Об'єкт, що містить інформацію про вхідне оновлення (повідомлення).
     :type update: telegram.Update
@@ -156,28 +169,29 @@ async def answer_faq(update: Update, context: ContextTypes.DEFAULT_TYPE):
     :type context: telegram.ext.ContextTypes.DEFAULT_TYPE
     """
     user_id = update.effective_user.id
-    lang = load_language(user_id)
+    lang = await load_language_async(user_id)
     question = update.message.text
-    correlation_id = context.user_data.get('correlation_id', 'N/A')
-    logger.debug(f"[REQ_ID:{correlation_id}] User {user_id} asked: '{question}'. Lang: {lang}")
+    logger.debug("User %s asked: '%s'. Lang: %s", user_id, question, lang)
     try:
-        answer = get_faq_answer(lang, question, correlation_id) # Передаємо correlation_id
-        if "⚠️" in answer: # Простий спосіб виявити, що відповіді не знайдено
+        match = await find_faq_answer_async(lang, question)
+        if match is None:
             logger.warning(
-                f"WARN_HANDLER_001 [REQ_ID:{correlation_id}]: No FAQ answer found for user {user_id} "
-                f"for question: '{question}'."
+                "WARN_HANDLER_001: No FAQ answer found for user %s "
+                "for question: '%s'.", user_id, question
             )
-        await update.message.reply_text(answer, reply_markup=get_main_menu(lang))
+            await fallback_message_handler(update, context)
+            return
+        await update.message.reply_text(match.answer, reply_markup=get_main_menu(lang))
     except Exception as e:
         logger.error(
-            f"ERR_HANDLER_004 [REQ_ID:{correlation_id}]: Error answering FAQ for user {user_id} "
-            f"for question '{question}': {e}",
+            "ERR_HANDLER_004: Error answering FAQ for user %s "
+            "for question '%s': %s", user_id, question, e,
             exc_info=True
         )
         await update.message.reply_text(load_language_message(lang, 'generic_user_error_with_contact'))
         await send_admin_notification(
             context.bot,
-            f"Критична помилка ERR_HANDLER_004 [REQ_ID:{correlation_id}] при відповіді на FAQ.\n"
+            f"Критична помилка ERR_HANDLER_004 [REQ_ID:{get_correlation_id()}] при відповіді на FAQ.\n"
             f"Користувач: {user_id}\nПитання: '{question}'\nПомилка: {e}"
         )
 
@@ -193,11 +207,10 @@ async def show_court_info(update: Update, context: ContextTypes.DEFAULT_TYPE):
     :type context: telegram.ext.ContextTypes.DEFAULT_TYPE
     """
     user_id = update.effective_user.id
-    lang = load_language(user_id)
-    correlation_id = context.user_data.get('correlation_id', 'N/A')
-    logger.debug(f"[REQ_ID:{correlation_id}] User {user_id} requested court info. Lang: {lang}")
+    lang = await load_language_async(user_id)
+    logger.debug("User %s requested court info. Lang: %s", user_id, lang)
     try:
-        info = get_court_info(lang, correlation_id) # Передаємо correlation_id
+        info = await get_court_info_async(lang)
         text = (
             f"📍 {load_language_message(lang, 'address')}: {info['address']}\n"
             f"🕒 {load_language_message(lang, 'schedule')}: {info['work_time']}\n"
@@ -207,21 +220,22 @@ async def show_court_info(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.message.reply_text(text)
     except Exception as e:
         logger.error(
-            f"ERR_HANDLER_005 [REQ_ID:{correlation_id}]: Error showing court info for user {user_id}: {e}",
+            "ERR_HANDLER_005: Error showing court info for user %s: %s",
+            user_id, e,
             exc_info=True
         )
         await update.message.reply_text(load_language_message(lang, 'generic_user_error_with_contact'))
         await send_admin_notification(
             context.bot,
-            f"Критична помилка ERR_HANDLER_005 [REQ_ID:{correlation_id}] при відображенні інфо про суд.\n"
+            f"Критична помилка ERR_HANDLER_005 [REQ_ID:{get_correlation_id()}] при відображенні інфо про суд.\n"
             f"Користувач: {user_id}\nПомилка: {e}"
         )
 
 async def show_court_schedule(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Обробник для відображення розкладу судових засідань.
 
-    Завантажує інформацію про розклад з court_schedule.json
-    та відправляє її користувачеві у структурованому вигляді.
+    Надсилає заздалегідь відрендерений розклад з court_schedule.json
+    у структурованому вигляді (кількома повідомленнями, якщо він довгий).
 
     :param update: Об'єкт, що містить інформацію про вхідне оновлення.
     :type update: telegram.Update
@@ -229,53 +243,44 @@ async def show_court_schedule(update: Update, context: ContextTypes.DEFAULT_TYPE
     :type context: telegram.ext.ContextTypes.DEFAULT_TYPE
     """
     user_id = update.effective_user.id
-    lang = load_language(user_id)
-    correlation_id = context.user_data.get('correlation_id', 'N/A')
-    logger.debug(f"[REQ_ID:{correlation_id}] User {user_id} requested court schedule. Lang: {lang}")
+    lang = await load_language_async(user_id)
+    logger.debug("User %s requested court schedule. Lang: %s", user_id, lang)
     try:
-        # Припускаємо, що court_schedule.json знаходиться у корені проєкту або поруч
-        with open("court_schedule.json", "r", encoding="utf-8") as file_handle:
-            data = json.load(file_handle)
-        if not data:
-            msg = load_language_message(lang, 'no_schedule_available')
-            logger.info(f"[REQ_ID:{correlation_id}] User {user_id}: No schedule data found.")
-        else:
-            msg = load_language_message(lang, 'court_schedule_title') + "\n"
-            for item in data:
-                msg += (
-                    f"{item['date']} – {load_language_message(lang, 'case')}"
-                    f" {item['case']}: {item['time']},"
-                    f" {load_language_message(lang, 'judge')} {item['judge']}\n"
-                )
-        await update.message.reply_text(msg)
+        # Розклад рендериться заздалегідь при завантаженні court_schedule.json;
+        # довгий розклад уже розбито на сторінки в межах ліміту Telegram
+        pages = await run_blocking(render_court_schedule, lang)
+        for page in pages:
+            await update.message.reply_text(page)
     except (FileNotFoundError, json.JSONDecodeError) as e:
         logger.error(
-            f"ERR_HANDLER_006 [REQ_ID:{correlation_id}]: Error loading court schedule for user {user_id}: {e}",
+            "ERR_HANDLER_006: Error loading court schedule for user %s: %s",
+            user_id, e,
             exc_info=True
         )
         await update.message.reply_text(load_language_message(lang, 'data_load_error'))
         await send_admin_notification(
             context.bot,
-            f"Критична помилка ERR_HANDLER_006 [REQ_ID:{correlation_id}] при завантаженні розкладу суду.\n"
+            f"Критична помилка ERR_HANDLER_006 [REQ_ID:{get_correlation_id()}] при завантаженні розкладу суду.\n"
             f"Користувач: {user_id}\nПомилка: {e}"
         )
     except Exception as e:
         logger.error(
-            f"ERR_HANDLER_007 [REQ_ID:{correlation_id}]: Unexpected error in show_court_schedule for user {user_id}: {e}",
+            "ERR_HANDLER_007: Unexpected error in show_court_schedule for user %s: %s",
+            user_id, e,
             exc_info=True
         )
         await update.message.reply_text(load_language_message(lang, 'generic_user_error_with_contact'))
         await send_admin_notification(
             context.bot,
-            f"Критична помимилка ERR_HANDLER_007 [REQ_ID:{correlation_id}] при відображенні розкладу суду.\n"
+            f"Критична помимилка ERR_HANDLER_007 [REQ_ID:{get_correlation_id()}] при відображенні розкладу суду.\n"
             f"Користувач: {user_id}\nПомилка: {e}"
         )
 
 async def show_contacts(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Обробник для надання контактної інформації інших установ.
 
-    Завантажує контактну інформацію з contacts.json
-    та відправляє її користувачеві відповідно до обраної мови.
+    Надсилає заздалегідь відрендерену контактну інформацію з contacts.json
+    відповідно до обраної мови.
 
     :param update: Об'єкт, що містить інформацію про вхідне оновлення.
     :type update: telegram.Update
@@ -283,42 +288,35 @@ async def show_contacts(update: Update, context: ContextTypes.DEFAULT_TYPE):
     :type context: telegram.ext.ContextTypes.DEFAULT_TYPE
     """
     user_id = update.effective_user.id
-    lang = load_language(user_id)
-    correlation_id = context.user_data.get('correlation_id', 'N/A')
-    logger.debug(f"[REQ_ID:{correlation_id}] User {user_id} requested other contacts. Lang: {lang}")
+    lang = await load_language_async(user_id)
+    logger.debug("User %s requested other contacts. Lang: %s", user_id, lang)
     try:
-        # Припускаємо, що contacts.json знаходиться у корені проєкту або поруч
-        with open("contacts.json", "r", encoding="utf-8") as file_handle:
-            data = json.load(file_handle)
-        entries = data.get(lang, [])
-        if not entries:
-            msg = load_language_message(lang, 'no_contacts_available')
-            logger.info(f"[REQ_ID:{correlation_id}] User {user_id}: No contacts data found for lang {lang}.")
-        else:
-            msg = load_language_message(lang, 'other_contacts_title') + "\n"
-            for contact in entries:
-                msg += f"📌 {contact['org']} — {contact['phone']}\n"
-        await update.message.reply_text(msg)
+        # Контакти рендеряться заздалегідь при завантаженні contacts.json
+        pages = await run_blocking(render_contacts, lang)
+        for page in pages:
+            await update.message.reply_text(page)
     except (FileNotFoundError, json.JSONDecodeError) as e:
         logger.error(
-            f"ERR_HANDLER_008 [REQ_ID:{correlation_id}]: Error loading other contacts for user {user_id}: {e}",
+            "ERR_HANDLER_008: Error loading other contacts for user %s: %s",
+            user_id, e,
             exc_info=True
         )
         await update.message.reply_text(load_language_message(lang, 'data_load_error'))
         await send_admin_notification(
             context.bot,
-            f"Критична помилка ERR_HANDLER_008 [REQ_ID:{correlation_id}] при завантаженні контактів.\n"
+            f"Критична помилка ERR_HANDLER_008 [REQ_ID:{get_correlation_id()}] при завантаженні контактів.\n"
             f"Користувач: {user_id}\nПомилка: {e}"
         )
     except Exception as e:
         logger.error(
-            f"ERR_HANDLER_009 [REQ_ID:{correlation_id}]: Unexpected error in show_contacts for user {user_id}: {e}",
+            "ERR_HANDLER_009: Unexpected error in show_contacts for user %s: %s",
+            user_id, e,
             exc_info=True
         )
         await update.message.reply_text(load_language_message(lang, 'generic_user_error_with_contact'))
         await send_admin_notification(
             context.bot,
-            f"Критична помилка ERR_HANDLER_009 [REQ_ID:{correlation_id}] при відображенні контактів.\n"
+            f"Критична помилка ERR_HANDLER_009 [REQ_ID:{get_correlation_id()}] при відображенні контактів.\n"
             f"Користувач: {user_id}\nПомилка: {e}"
         )
 
@@ -336,20 +334,20 @@ async def ask_name(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     :rtype: int
     """
     user_id = update.effective_user.id
-    lang = load_language(user_id)
-    correlation_id = context.user_data.get('correlation_id', 'N/A')
-    logger.info(f"[REQ_ID:{correlation_id}] User {user_id} started appointment booking.")
+    lang = await load_language_async(user_id)
+    logger.info("User %s started appointment booking.", user_id)
     try:
         await update.message.reply_text(load_language_message(lang, 'enter_full_name'))
     except Exception as e:
         logger.error(
-            f"ERR_HANDLER_010 [REQ_ID:{correlation_id}]: Error asking name for user {user_id}: {e}",
+            "ERR_HANDLER_010: Error asking name for user %s: %s",
+            user_id, e,
             exc_info=True
         )
         await update.message.reply_text(load_language_message(lang, 'generic_user_error_with_contact'))
         await send_admin_notification(
             context.bot,
-            f"Критична помилка ERR_HANDLER_010 [REQ_ID:{correlation_id}] при запиті ПІБ.\n"
+            f"Критична помилка ERR_HANDLER_010 [REQ_ID:{get_correlation_id()}] при запиті ПІБ.\n"
             f"Користувач: {user_id}\nПомилка: {e}"
         )
     return ASK_NAME
@@ -358,7 +356,8 @@ async def ask_date(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Продовження діалогу запису на консультацію.
 
     Зберігає введене користувачем ПІБ та пропонує доступні дати
-    для запису за допомогою інлайн-клавіатури. Переводить діалог у стан ASK_DATE.
+    для запису за допомогою інлайн-клавіатури разом з календарем зайнятості
+    слотів на вікно бронювання. Переводить діалог у стан ASK_DATE.
 
     :param update: Об'єкт, що містить інформацію про вхідне оновлення (повідомлення з ПІБ).
     :type update: telegram.Update
@@ -368,33 +367,36 @@ async def ask_date(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     :rtype: int
     """
     user_id = update.effective_user.id
-    lang = load_language(user_id)
-    correlation_id = context.user_data.get('correlation_id', 'N/A')
+    lang = await load_language_async(user_id)
     try:
         context.user_data["name"] = update.message.text
         logger.debug(
-            f"[REQ_ID:{correlation_id}] User {user_id} entered name: {context.user_data['name']}"
+            "User %s entered name: %s",
+            user_id, context.user_data['name']
         )
-        dates = get_available_dates(correlation_id) # Передаємо correlation_id
+        dates = await get_available_dates_async()
         if not dates:
             logger.warning(
-                f"WARN_HANDLER_002 [REQ_ID:{correlation_id}]: No available dates generated for user {user_id}."
+                "WARN_HANDLER_002: No available dates generated for user %s.",
+                user_id
             )
             await update.message.reply_text(load_language_message(lang, 'no_dates_available'))
             return ConversationHandler.END # Завершуємо діалог, бо немає дат
+        occupancy = await get_appointments_for_user_async(lang)
         await update.message.reply_text(
-            load_language_message(lang, 'choose_date'), reply_markup=get_inline_keyboard(dates)
+            f"{occupancy}\n\n{load_language_message(lang, 'choose_date')}",
+            reply_markup=get_inline_keyboard(dates)
         )
     except Exception as e:
         logger.error(
-            f"ERR_HANDLER_011 [REQ_ID:{correlation_id}]: Error asking date for user {user_id} "
-            f"after name input: {e}",
+            "ERR_HANDLER_011: Error asking date for user %s "
+            "after name input: %s", user_id, e,
             exc_info=True
         )
         await update.message.reply_text(load_language_message(lang, 'generic_user_error_with_contact'))
         await send_admin_notification(
             context.bot,
-            f"Критична помилка ERR_HANDLER_011 [REQ_ID:{correlation_id}] при запиті дати.\n"
+            f"Критична помилка ERR_HANDLER_011 [REQ_ID:{get_correlation_id()}] при запиті дати.\n"
             f"Користувач: {user_id}\nПомилка: {e}"
         )
     return ASK_DATE
@@ -413,19 +415,18 @@ async def ask_time(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     :rtype: int
     """
     user_id = update.effective_user.id
-    lang = load_language(user_id)
-    correlation_id = context.user_data.get('correlation_id', 'N/A')
+    lang = await load_language_async(user_id)
     try:
         selected_date = update.callback_query.data
         context.user_data["selected_date"] = selected_date
         logger.debug(
-            f"[REQ_ID:{correlation_id}] User {user_id} selected date: {selected_date}"
+            "User %s selected date: %s", user_id, selected_date
         )
-        times = get_available_times_for_date(selected_date, correlation_id) # Передаємо correlation_id
+        times = await get_available_times_for_date_async(selected_date)
         if not times:
             logger.warning(
-                f"WARN_HANDLER_003 [REQ_ID:{correlation_id}]: No available times generated for user {user_id} "
-                f"on {selected_date}."
+                "WARN_HANDLER_003: No available times generated for user %s "
+                "on %s.", user_id, selected_date
             )
             await update.callback_query.answer()
             await update.callback_query.message.reply_text(load_language_message(lang, 'no_times_available'))
@@ -436,15 +437,15 @@ async def ask_time(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
         )
     except Exception as e:
         logger.error(
-            f"ERR_HANDLER_012 [REQ_ID:{correlation_id}]: Error asking time for user {user_id} "
-            f"after date input: {e}",
+            "ERR_HANDLER_012: Error asking time for user %s "
+            "after date input: %s", user_id, e,
             exc_info=True
         )
         await update.callback_query.answer()
         await update.callback_query.message.reply_text(load_language_message(lang, 'generic_user_error_with_contact'))
         await send_admin_notification(
             context.bot,
-            f"Критична помилка ERR_HANDLER_012 [REQ_ID:{correlation_id}] при запиті часу.\n"
+            f"Критична помилка ERR_HANDLER_012 [REQ_ID:{get_correlation_id()}] при запиті часу.\n"
             f"Користувач: {user_id}\nПомилка: {e}"
         )
     return ASK_TIME
@@ -452,8 +453,9 @@ async def ask_time(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
 async def confirm_time(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Завершення діалогу запису на консультацію.
 
-    Зберігає повну інформацію про запис (ПІБ, дату, час) у appointments.json
-    та надсилає користувачеві підтвердження успішного запису. Завершує діалог.
+    Зберігає повну інформацію про запис (ПІБ, дату, час) у сховищі записів
+    та надсилає користувачеві підтвердження успішного запису. Якщо слот
+    уже зайнятий, повідомляє про це користувача. Завершує діалог.
 
     :param update: Об'єкт, що містить інформацію про вхідне оновлення (callback_query з часом).
     :type update: telegram.Update
@@ -463,24 +465,28 @@ async def confirm_time(update: Update, context: ContextTypes.DEFAULT_TYPE) -> in
     :rtype: int
     """
     user_id = update.effective_user.id
-    lang = load_language(user_id)
-    correlation_id = context.user_data.get('correlation_id', 'N/A')
+    lang = await load_language_async(user_id)
     try:
         time = update.callback_query.data
         name = context.user_data.get("name", load_language_message(lang, 'no_name_provided'))
 
-        # Перевірка на вже існуючий запис (базова)
-        # У продакшені варто додати більш надійну перевірку у utils
-        # appointments_exist = False # Заглушка, для реальної перевірки потрібен доступ до appointments.json
-        # if appointments_exist:
-        #    logger.warning(f"WARN_HANDLER_004 [REQ_ID:{correlation_id}]: User {user_id} attempted to book already taken slot: {time}")
-        #    await update.callback_query.message.reply_text(load_language_message(lang, 'slot_already_taken'))
-        #    return ConversationHandler.END
+        # Спершу швидка перевірка за індексом вільних слотів, потім сховище записів
+        # гарантує, що місткість слоту не буде перевищена навіть при одночасних бронюваннях
+        if (not await is_slot_available_async(time)
+                or not await save_appointment_async(user_id, name, time)):
+            logger.warning(
+                "WARN_HANDLER_004: User %s attempted to book "
+                "already taken slot: %s", user_id, time
+            )
+            await update.callback_query.answer()
+            await update.callback_query.message.reply_text(
+                load_language_message(lang, 'slot_already_taken'), reply_markup=get_main_menu(lang)
+            )
+            return ConversationHandler.END
 
-        save_appointment(user_id, name, time, correlation_id) # Передаємо correlation_id
         logger.info(
-            f"[REQ_ID:{correlation_id}] User {user_id} successfully booked appointment: "
-            f"{name} on {time}."
+            "User %s successfully booked appointment: "
+            "%s on %s.", user_id, name, time
         )
         await update.callback_query.answer()
         await update.callback_query.message.reply_text(
@@ -488,14 +494,15 @@ async def confirm_time(update: Update, context: ContextTypes.DEFAULT_TYPE) -> in
         )
     except Exception as e:
         logger.error(
-            f"ERR_HANDLER_013 [REQ_ID:{correlation_id}]: Error confirming appointment for user {user_id}: {e}",
+            "ERR_HANDLER_013: Error confirming appointment for user %s: %s",
+            user_id, e,
             exc_info=True
         )
         await update.callback_query.answer()
         await update.callback_query.message.reply_text(load_language_message(lang, 'generic_user_error_with_contact'))
         await send_admin_notification(
             context.bot,
-            f"Критична помилка ERR_HANDLER_013 [REQ_ID:{correlation_id}] при підтвердженні запису.\n"
+            f"Критична помилка ERR_HANDLER_013 [REQ_ID:{get_correlation_id()}] при підтвердженні запису.\n"
             f"Користувач: {user_id}\nПомилка: {e}"
         )
     return ConversationHandler.END
@@ -505,35 +512,173 @@ async def fallback_message_handler(update: Update, context: ContextTypes.DEFAULT
     """Обробник для повідомлень, що не були розпізнані.
 
     Надсилає користувачеві повідомлення про те, що команда не розпізнана.
-    Включає correlation_id у лог.
     """
     user_id = update.effective_user.id
-    lang = load_language(user_id)
-    correlation_id = context.user_data.get('correlation_id', 'N/A')
+    lang = await load_language_async(user_id)
     logger.info(
-        f"[REQ_ID:{correlation_id}] User {user_id} sent unrecognized message: '{update.message.text}'"
+        "User %s sent unrecognized message: '%s'",
+        user_id, update.message.text
     )
     await update.message.reply_text(load_language_message(lang, 'unrecognized_command'), reply_markup=get_main_menu(lang))
 
 
+async def _require_admin(update: Update, lang: str, reply: Callable[..., Awaitable]) -> bool:
+    """Перевіряє, чи є користувач адміністратором; якщо ні - логує спробу доступу і відповідає `reply`."""
+    user_id = update.effective_user.id
+    if await is_admin_async(user_id):
+        return True
+    logger.warning(
+        "WARN_HANDLER_005: Unauthorized access attempt to admin command by user %s.",
+        user_id
+    )
+    await reply(load_language_message(lang, 'unauthorized_access'))
+    return False
+
+
 # Обробник для адмінських команд (лише для прикладу, не повний функціонал)
 async def admin_command_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Обробник для адмінських команд.
 
     Тільки адміни можуть використовувати цю команду.
-    Включає correlation_id у лог.
     """
     user_id = update.effective_user.id
-    lang = load_language(user_id)
-    correlation_id = context.user_data.get('correlation_id', 'N/A')
-    if is_admin(user_id):
-        logger.info(f"[REQ_ID:{correlation_id}] Admin {user_id} used admin command.")
-        await update.message.reply_text(load_language_message(lang, 'admin_panel_greeting'))
-    else:
-        logger.warning(
-            f"WARN_HANDLER_005 [REQ_ID:{correlation_id}]: Unauthorized access attempt to admin command by user {user_id}."
+    lang = await load_language_async(user_id)
+    if not await _require_admin(update, lang, update.message.reply_text):
+        return
+    logger.info("Admin %s used admin command.", user_id)
+    await update.message.reply_text(
+        load_language_message(lang, 'admin_panel_greeting'), reply_markup=get_admin_panel_keyboard(lang)
+    )
+
+
+async def _manage_admin(update: Update, context: ContextTypes.DEFAULT_TYPE, action: str):
+    """Спільна частина /addadmin і /removeadmin: перевірка прав, розбір ID і збереження admins.json."""
+    user_id = update.effective_user.id
+    lang = await load_language_async(user_id)
+    if not await _require_admin(update, lang, update.message.reply_text):
+        return
+    args = context.args or []
+    if len(args) != 1 or not args[0].isdigit():
+        await update.message.reply_text(load_language_message(lang, 'admin_manage_usage'))
+        return
+    target_id = int(args[0])
+    try:
+        if action == "add":
+            changed = await add_admin_async(target_id)
+            message_key = 'admin_added' if changed else 'admin_already'
+        else:
+            changed = await remove_admin_async(target_id)
+            message_key = 'admin_removed' if changed else 'admin_not_found'
+    except ValueError:
+        await update.message.reply_text(load_language_message(lang, 'admin_last_cannot_remove'))
+        return
+    except OSError as e:
+        logger.error(
+            "ERR_HANDLER_014: Error saving admins.json (%s %s) for admin %s: %s",
+            action, target_id, user_id, e,
+            exc_info=True
         )
-        await update.message.reply_text(load_language_message(lang, 'unauthorized_access'))
+        await update.message.reply_text(load_language_message(lang, 'data_load_error'))
+        await send_admin_notification(
+            context.bot,
+            f"Критична помилка ERR_HANDLER_014 [REQ_ID:{get_correlation_id()}] при збереженні admins.json.\n"
+            f"Адміністратор: {user_id}\nПомилка: {e}"
+        )
+        return
+    if changed:
+        logger.info("Admin %s: %s admin %s.", user_id, action, target_id)
+    await update.message.reply_text(format_message(lang, message_key, user_id=target_id))
+
+
+async def add_admin_command_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Обробник команди /addadmin <ID> для адміністраторів."""
+    await _manage_admin(update, context, "add")
+
+
+async def remove_admin_command_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Обробник команди /removeadmin <ID> для адміністраторів. Останнього адміністратора вилучити не можна."""
+    await _manage_admin(update, context, "remove")
+
+
+async def reload_content_command_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Обробник команди /reload для адміністраторів.
+
+    Негайно перевіряє файли вмісту (FAQ, інформація про суд, розклад, контакти, повідомлення),
+    перезавантажує змінені і показує, що перезавантажено і скільки це тривало.
+    """
+    user_id = update.effective_user.id
+    lang = await load_language_async(user_id)
+    if not await _require_admin(update, lang, update.message.reply_text):
+        return
+    logger.info("Admin %s requested content reload.", user_id)
+    results = await run_blocking(content_reloader.check)
+    await update.message.reply_text(format_reload_report(lang, results))
+
+
+def _parse_appointments_args(args: List[str]) -> Optional[AppointmentsPageRequest]:
+    """Розбирає аргументи /appointments: до двох дат "YYYY-MM-DD" (від, до) та ID користувача."""
+    dates = []
+    user_id = None
+    for arg in args:
+        if arg.isdigit() and user_id is None:
+            user_id = int(arg)
+            continue
+        try:
+            dates.append(str(datetime.strptime(arg, "%Y-%m-%d").date()))
+        except ValueError:
+            return None
+    if len(dates) > 2:
+        return None
+    start = dates[0] if dates else ""
+    end = dates[1] if len(dates) > 1 else ""
+    return AppointmentsPageRequest(start=start, end=end, user_id=user_id)
+
+
+async def _send_appointments_page(update: Update, lang: str, request: AppointmentsPageRequest):
+    """Читає сторінку записів за запитом і надсилає її (перша сторінка) або оновлює нею повідомлення."""
+    after = request.cursor if request.direction == "next" else None
+    before = request.cursor if request.direction == "prev" else None
+    page = await get_appointments_page_async(request.start, request.end, request.user_id, after, before)
+    text = format_appointments_page(lang, page, request.start, request.end, request.user_id)
+    markup = get_appointments_page_keyboard(lang, page, request) if page is not None else None
+    query = update.callback_query
+    if query is not None and request.cursor is not None:
+        await query.edit_message_text(text, reply_markup=markup)
+    else:
+        await update.effective_message.reply_text(text, reply_markup=markup)
+
+
+async def appointments_command_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Обробник команди /appointments для адміністраторів.
+
+    Показує першу сторінку записів з кнопками переходу між сторінками.
+    Необов'язкові аргументи: дата від, дата до (РРРР-ММ-ДД) та ID користувача.
+    """
+    user_id = update.effective_user.id
+    lang = await load_language_async(user_id)
+    if not await _require_admin(update, lang, update.message.reply_text):
+        return
+    request = _parse_appointments_args(context.args or [])
+    if request is None:
+        await update.message.reply_text(load_language_message(lang, 'admin_appointments_usage'))
+        return
+    logger.info("Admin %s requested appointments: %s.", user_id, request)
+    await _send_appointments_page(update, lang, request)
+
+
+async def appointments_page_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Обробник кнопок сторінок записів (і кнопки записів в адмін-панелі)."""
+    query = update.callback_query
+    await query.answer()
+    user_id = update.effective_user.id
+    lang = await load_language_async(user_id)
+    if not await _require_admin(update, lang, query.message.reply_text):
+        return
+    request = parse_appointments_request(query.data)
+    if request is None:
+        logger.warning("WARN_HANDLER_006: Invalid appointments page data from admin %s: '%s'", user_id, query.data)
+        return
+    await _send_appointments_page(update, lang, request)
 
 
 def register_handlers(app):
@@ -542,12 +687,17 @@ def register_handlers(app):
     Ця функція додає CommandHandler для команди /start, ConversationHandler
     для багатоетапного діалогу запису на консультацію, а також MessageHandler
     та CallbackQueryHandler для обробки інших типів повідомлень та натискань кнопок.
+    Кнопки головного меню маршрутизуються через :class:`for_test.router.MenuRouter`.
+    Якщо в Application задано persistence, стани діалогу запису зберігаються
+    між перезапусками (див. :mod:`for_test.persistence`).
+    Усі обробники обгортаються збиранням метрик (кількість викликів, помилки,
+    затримка за обробником і станом діалогу).
 
     :param app: Об'єкт Application, до якого реєструються обробники.
     :type app: telegram.ext.Application
     """
     conv_handler = ConversationHandler(
-        entry_points=[MessageHandler(filters.Regex("^(📝|📅) Запис"), ask_name)],
+        entry_points=[MessageHandler(MenuButtonFilter({"appointment"}), ask_name)],
         states={
             LANG_SELECT: [CallbackQueryHandler(language_selected)],
             ASK_NAME: [MessageHandler(filters.TEXT & ~filters.COMMAND, ask_date)],
@@ -559,25 +709,31 @@ def register_handlers(app):
             # в середині діалогу або для завершення діалогу
             MessageHandler(filters.TEXT | filters.COMMAND, fallback_message_handler),
             CallbackQueryHandler(fallback_message_handler) # Для невідомих callback_query
-        ]
+        ],
+        name="appointment",
+        persistent=app.persistence is not None,
     )
 
     app.add_handler(CommandHandler("start", start))
     app.add_handler(CommandHandler("admin", admin_command_handler)) # Додаємо адмінську команду
+    app.add_handler(CommandHandler("appointments", appointments_command_handler))
+    app.add_handler(CommandHandler("addadmin", add_admin_command_handler))
+    app.add_handler(CommandHandler("removeadmin", remove_admin_command_handler))
+    app.add_handler(CommandHandler("reload", reload_content_command_handler))
+    # Кнопки сторінок записів реєструються до діалогу запису, щоб його fallback їх не перехоплював
+    app.add_handler(CallbackQueryHandler(appointments_page_handler, pattern=f"^{APPOINTMENTS_PAGE_PREFIX}\\|"))
     app.add_handler(conv_handler)
     app.add_handler(CallbackQueryHandler(language_selected, pattern="^(uk|en)$"))
-    app.add_handler(MessageHandler(filters.Regex("^(❓ FAQ|❓ Поширені питання)$"), show_faq))
-    app.add_handler(MessageHandler(filters.Regex(r"^(Як|How).*"), answer_faq))
-    app.add_handler(MessageHandler(filters.Regex("^(ℹ️|📍)"), show_court_info))
-    app.add_handler(MessageHandler(
-        filters.Regex("^(🗓 Календар засідань|🗓 Hearing Calendar)$"),
-        show_court_schedule
-    ))
-    app.add_handler(MessageHandler(
-        filters.Regex("^(📞 Контакти інших установ|📞 Other Institutions)$"),
-        show_contacts
-    ))
-    # Обробник для будь-яких інших текстових повідомлень, що не були оброблені
-    # Розміщується останнім, щоб не перехоплювати інші команди
-    app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, fallback_message_handler))
+    # Кнопки головного меню - один пошук у словнику за точним текстом кнопки
+    app.add_handler(MenuRouter({
+        "faq": show_faq,
+        "court_info": show_court_info,
+        "court_schedule": show_court_schedule,
+        "contacts": show_contacts,
+    }))
+    # Будь-який інший текст шукається серед питань FAQ; нерозпізнаний - передається
+    # fallback_message_handler. Розміщується останнім, щоб не перехоплювати інші команди
+    app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, answer_faq))
+
+    instrument_application(app, STATE_NAMES)
 
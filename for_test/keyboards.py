@@ -2,24 +2,112 @@
 Модуль для генерації кастомних клавіатур для Telegram-бота.
 
 Містить функції для створення інлайн-клавіатур та клавіатур головного меню,
-що використовуються для взаємодії з користувачем.
+що використовуються для взаємодії з користувачем. Статичні клавіатури
+будуються один раз для кожної пари (мова, версія вихідних даних)
+і далі повертаються з кешу.
 """
 import json
 import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Hashable, NamedTuple, Optional, Tuple
 from telegram import ReplyKeyboardMarkup, InlineKeyboardMarkup, InlineKeyboardButton
+from for_test.appointments import AppointmentPage
+from for_test.reference_cache import load_reference_entry
+from for_test.utils import get_message_catalog, load_language_message
 
 # Створюємо логер для цього модуля
 logger = logging.getLogger(__name__)
 
+# --- Кеш клавіатур ---
+# Ключ - (тип клавіатури, мова), значення - (версія вихідних даних, об'єкт клавіатури).
+# Версією є номер версії файлу даних або, для клавіатур з текстами з messages.json,
+# сам об'єкт каталогу повідомлень (він замінюється цілком при перезавантаженні).
+# Об'єкти клавіатур python-telegram-bot незмінні, тому їх безпечно повертати повторно.
+_keyboard_cache: Dict[Hashable, Tuple[Any, Any]] = {}
+_keyboard_cache_lock = threading.Lock()
+_keyboard_stats: Dict[str, int] = {"hits": 0, "builds": 0}
+# Моменти побудови клавіатур (monotonic) за останнє вікно для метрики "побудов за хвилину"
+_recent_builds: Deque[float] = deque()
+_BUILD_RATE_WINDOW = 60.0
+# Версія для клавіатур, що не залежать від файлів даних
+_STATIC_VERSION = 0
+
+
+def _prune_recent_builds(now: float):
+    """Відкидає моменти побудов, старіші за вікно метрики (викликається під `_keyboard_cache_lock`)."""
+    while _recent_builds and now - _recent_builds[0] > _BUILD_RATE_WINDOW:
+        _recent_builds.popleft()
+
+
+def _cached_markup(key: Hashable, version: Any, builder: Callable[[], Any]) -> Any:
+    """Повертає клавіатуру з кешу або будує її, якщо змінилася версія вихідних даних."""
+    with _keyboard_cache_lock:
+        cached = _keyboard_cache.get(key)
+        if cached is not None and (cached[0] is version or cached[0] == version):
+            _keyboard_stats["hits"] += 1
+            return cached[1]
+    markup = builder()
+    with _keyboard_cache_lock:
+        _keyboard_cache[key] = (version, markup)
+        _keyboard_stats["builds"] += 1
+        now = time.monotonic()
+        _prune_recent_builds(now)
+        _recent_builds.append(now)
+    return markup
+
+
+def get_keyboard_stats() -> Dict[str, int]:
+    """Повертає статистику кешу клавіатур.
+
+    :returns: Словник з ключами 'hits', 'builds' (усього побудовано об'єктів клавіатур),
+              'builds_last_minute' (побудовано за останню хвилину) та 'cached'.
+    :rtype: dict
+    """
+    now = time.monotonic()
+    with _keyboard_cache_lock:
+        _prune_recent_builds(now)
+        stats = dict(_keyboard_stats)
+        stats["builds_last_minute"] = len(_recent_builds)
+        stats["cached"] = len(_keyboard_cache)
+    return stats
+
+
+def clear_keyboard_cache():
+    """Очищує кеш клавіатур; наступне звернення побудує їх заново."""
+    with _keyboard_cache_lock:
+        _keyboard_cache.clear()
+
+
+# Головне меню: мова -> ряди кнопок (дія, текст кнопки).
+# Єдине джерело і для клавіатури, і для маршрутизації натискань (див. for_test.router).
+MAIN_MENU_LAYOUT: Dict[str, Tuple[Tuple[Tuple[str, str], ...], ...]] = {
+    "uk": (
+        (("faq", "❓ Поширені питання"), ("appointment", "📅 Запис на консультацію")),
+        (("court_info", "ℹ️ Інформація про суд"), ("court_schedule", "🗓 Календар засідань")),
+        (("contacts", "📞 Контакти інших установ"),),
+    ),
+    "en": (
+        (("faq", "❓ FAQ"), ("appointment", "📅 Appointment")),
+        (("court_info", "ℹ️ Court Info"), ("court_schedule", "🗓 Hearing Calendar")),
+        (("contacts", "📞 Other Institutions"),),
+    ),
+}
+
+
 def get_language_keyboard() -> InlineKeyboardMarkup:
     """Генерує інлайн-клавіатуру для вибору мови.
 
     Клавіатура містить дві кнопки: "Українська" та "English",
-    кожна з відповідним callback_data.
+    кожна з відповідним callback_data. Будується один раз і кешується.
 
     :returns: Об'єкт InlineKeyboardMarkup для вибору мови.
     :rtype: telegram.InlineKeyboardMarkup
     """
+    return _cached_markup(("language", None), _STATIC_VERSION, _build_language_keyboard)
+
+def _build_language_keyboard() -> InlineKeyboardMarkup:
     logger.debug("Generating language selection keyboard.")
     return InlineKeyboardMarkup([
         [InlineKeyboardButton("Українська", callback_data="uk"),
@@ -32,50 +120,67 @@ def get_main_menu(lang: str) -> ReplyKeyboardMarkup:
     Повертає ReplyKeyboardMarkup з основними опціями меню
     (FAQ, Запис на консультацію, Інформація про суд, Календар засідань, Контакти)
     українською або англійською мовами. Клавіатура автоматично змінює розмір.
+    Для кожної мови клавіатура будується один раз і кешується.
 
     :param lang: Код мови ('uk' або 'en').
     :type lang: str
     :returns: Об'єкт ReplyKeyboardMarkup для головного меню.
     :rtype: telegram.ReplyKeyboardMarkup
     """
-    logger.debug(f"Generating main menu keyboard for language '{lang}'.")
-    if lang == "en":
-        return ReplyKeyboardMarkup(
-            [["❓ FAQ", "📅 Appointment"],
-             ["ℹ️ Court Info", "🗓 Hearing Calendar"],
-             ["📞 Other Institutions"]],
-            resize_keyboard=True
-        )
+    return _cached_markup(("main_menu", lang), _STATIC_VERSION, lambda: _build_main_menu(lang))
+
+def _build_main_menu(lang: str) -> ReplyKeyboardMarkup:
+    logger.debug("Generating main menu keyboard for language '%s'.", lang)
+    layout = MAIN_MENU_LAYOUT.get(lang, MAIN_MENU_LAYOUT["uk"])
     return ReplyKeyboardMarkup(
-        [["❓ Поширені питання", "📅 Запис на консультацію"],
-         ["ℹ️ Інформація про суд", "🗓 Календар засідань"],
-         ["📞 Контакти інших установ"]],
+        [[label for _, label in row] for row in layout],
         resize_keyboard=True
     )
 
-def get_faq_keyboard(lang: str, correlation_id: str = "N/A") -> ReplyKeyboardMarkup:
+def get_main_menu_actions() -> Dict[str, Tuple[str, str]]:
+    """Повертає відповідність тексту кнопок головного меню діям.
+
+    Будується з того самого :data:`MAIN_MENU_LAYOUT`, що й клавіатура
+    :func:`get_main_menu`, тому текст кнопки завжди збігається з ключем.
+
+    :returns: Словник {точний текст кнопки: (дія, код мови)}.
+    :rtype: dict
+    """
+    return {
+        label: (action, lang)
+        for lang, layout in MAIN_MENU_LAYOUT.items()
+        for row in layout
+        for action, label in row
+    }
+
+def get_faq_keyboard(lang: str) -> ReplyKeyboardMarkup:
     """Генерує клавіатуру з поширеними питаннями для обраної мови.
 
-    Читає питання з файлу `faq.json` та створює ReplyKeyboardMarkup,
-    де кожне питання є окремою кнопкою.
+    Бере питання з файлу `faq.json` (через кеш довідкових даних) та створює ReplyKeyboardMarkup,
+    де кожне питання є окремою кнопкою. Клавіатура перебудовується лише тоді,
+    коли `faq.json` перезавантажується з диска.
 
     :param lang: Код мови ('uk' або 'en').
     :type lang: str
-    :param correlation_id: Унікальний ідентифікатор запиту для трасування.
-    :type correlation_id: str
     :returns: Об'єкт ReplyKeyboardMarkup зі списком питань FAQ.
     :rtype: telegram.ReplyKeyboardMarkup
     """
-    logger.debug(f"[REQ_ID:{correlation_id}] Generating FAQ keyboard for language '{lang}'.")
     try:
-        with open("faq.json", "r", encoding="utf-8") as file_handle:
-            data = json.load(file_handle)
-        return ReplyKeyboardMarkup([[q] for q in data[lang].keys()], resize_keyboard=True)
+        version, data = load_reference_entry("faq.json")
     except (FileNotFoundError, json.JSONDecodeError) as e:
-        logger.error(f"ERR_KB_001 [REQ_ID:{correlation_id}]: Failed to load faq.json for language '{lang}': {e}", exc_info=True)
+        logger.error(
+            "ERR_KB_001: Failed to load faq.json for language '%s': %s",
+            lang, e, exc_info=True
+        )
         # У випадку помилки, повертаємо порожню клавіатуру або меню за замовчуванням
         return ReplyKeyboardMarkup([["Помилка завантаження FAQ"]], resize_keyboard=True)
 
+    def build() -> ReplyKeyboardMarkup:
+        logger.debug("Generating FAQ keyboard for language '%s'.", lang)
+        return ReplyKeyboardMarkup([[q] for q in data[lang].keys()], resize_keyboard=True)
+
+    return _cached_markup(("faq", lang), version, build)
+
 def get_inline_keyboard(options: list) -> InlineKeyboardMarkup:
     """Генерує інлайн-клавіатуру з динамічним списком опцій.
 
@@ -87,6 +192,117 @@ def get_inline_keyboard(options: list) -> InlineKeyboardMarkup:
     :returns: Об'єкт InlineKeyboardMarkup з динамічними опціями.
     :rtype: telegram.InlineKeyboardMarkup
     """
-    logger.debug(f"Generating inline keyboard with {len(options)} options.")
+    logger.debug("Generating inline keyboard with %s options.", len(options))
     return InlineKeyboardMarkup([[InlineKeyboardButton(opt, callback_data=opt)] for opt in options])
 
+
+# --- Перегляд записів адміністратором ---
+
+# Префікс callback_data кнопок сторінок записів
+APPOINTMENTS_PAGE_PREFIX = "appts"
+
+
+class AppointmentsPageRequest(NamedTuple):
+    """Запит сторінки записів, закодований у callback_data кнопки.
+
+    :ivar direction: 'next' - сторінка після курсора, 'prev' - перед ним.
+    :ivar cursor: (час слоту, місце) - межа сусідньої сторінки; None - перша сторінка.
+    :ivar start: Початок діапазону дат "YYYY-MM-DD" або порожній рядок.
+    :ivar end: Кінець діапазону дат або порожній рядок.
+    :ivar user_id: Фільтр за користувачем або None.
+    """
+    direction: str = "next"
+    cursor: Optional[Tuple[str, int]] = None
+    start: str = ""
+    end: str = ""
+    user_id: Optional[int] = None
+
+
+def _compact(value: str) -> str:
+    """"2026-10-20 12:00" -> "202610201200" (callback_data обмежене 64 байтами)."""
+    return value.replace("-", "").replace(" ", "").replace(":", "")
+
+
+def _expand_date(value: str) -> str:
+    return f"{value[:4]}-{value[4:6]}-{value[6:8]}" if value else ""
+
+
+def encode_appointments_request(request: AppointmentsPageRequest) -> str:
+    """Кодує запит сторінки записів у callback_data ("appts|n|202610201200.0|20261001|20261031|42")."""
+    cursor = f"{_compact(request.cursor[0])}.{request.cursor[1]}" if request.cursor else ""
+    return "|".join((
+        APPOINTMENTS_PAGE_PREFIX, request.direction[0], cursor,
+        _compact(request.start), _compact(request.end),
+        "" if request.user_id is None else str(request.user_id),
+    ))
+
+
+def parse_appointments_request(data: str) -> Optional[AppointmentsPageRequest]:
+    """
+    Розбирає callback_data кнопки сторінки записів.
+
+    :param data: callback_data, створене :func:`encode_appointments_request`.
+    :type data: str
+    :returns: Запит сторінки або None, якщо дані пошкоджені.
+    :rtype: AppointmentsPageRequest or None
+    """
+    parts = data.split("|")
+    if len(parts) != 6 or parts[0] != APPOINTMENTS_PAGE_PREFIX or parts[1] not in ("n", "p"):
+        return None
+    _, direction, cursor, start, end, user_id = parts
+    try:
+        parsed_cursor = None
+        if cursor:
+            slot, seat = cursor.split(".")
+            time_slot = f"{_expand_date(slot[:8])} {slot[8:10]}:{slot[10:12]}"
+            parsed_cursor = (time_slot, int(seat))
+        return AppointmentsPageRequest(
+            "next" if direction == "n" else "prev", parsed_cursor,
+            _expand_date(start), _expand_date(end), int(user_id) if user_id else None,
+        )
+    except ValueError:
+        return None
+
+
+def get_admin_panel_keyboard(lang: str) -> InlineKeyboardMarkup:
+    """Генерує клавіатуру адмін-панелі з кнопкою перегляду записів.
+
+    Текст кнопки береться з каталогу повідомлень, тому клавіатура кешується
+    до заміни каталогу (перезавантаження messages.json).
+    """
+    catalog = get_message_catalog()
+
+    def build():
+        return InlineKeyboardMarkup([[InlineKeyboardButton(
+            load_language_message(lang, 'admin_appointments_button'),
+            callback_data=encode_appointments_request(AppointmentsPageRequest()),
+        )]])
+    return _cached_markup(("admin_panel", lang), catalog, build)
+
+
+def get_appointments_page_keyboard(lang: str, page: AppointmentPage,
+                                   request: AppointmentsPageRequest) -> Optional[InlineKeyboardMarkup]:
+    """
+    Генерує кнопки переходу між сторінками записів зі збереженням фільтрів запиту.
+
+    :param lang: Код мови адміністратора.
+    :type lang: str
+    :param page: Показана сторінка записів.
+    :type page: appointments.AppointmentPage
+    :param request: Запит, за яким отримано сторінку (з нього беруться фільтри).
+    :type request: AppointmentsPageRequest
+    :returns: Клавіатура або None, якщо інших сторінок немає.
+    :rtype: telegram.InlineKeyboardMarkup or None
+    """
+    buttons = []
+    if page.has_prev:
+        buttons.append(InlineKeyboardButton(
+            load_language_message(lang, 'page_prev'),
+            callback_data=encode_appointments_request(request._replace(direction="prev", cursor=page.first_cursor())),
+        ))
+    if page.has_next:
+        buttons.append(InlineKeyboardButton(
+            load_language_message(lang, 'page_next'),
+            callback_data=encode_appointments_request(request._replace(direction="next", cursor=page.last_cursor())),
+        ))
+    return InlineKeyboardMarkup([buttons]) if buttons else None
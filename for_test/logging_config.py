@@ -0,0 +1,221 @@
+"""
+Модуль налаштування логування Telegram-бота.
+
+Обробники, що виконують введення-виведення (консоль і файл з ротацією),
+працюють в окремому фоновому потоці :class:`logging.handlers.QueueListener`.
+Виклики ``logger.*`` в обробниках бота лише кладуть запис у чергу,
+тому запис у файл ніколи не відбувається в циклі подій. Черга обмежена:
+якщо фоновий потік не встигає, нові записи відкидаються (з підрахунком),
+а не блокують обробники.
+
+Ідентифікатор кореляції, користувач і обробник поточного оновлення
+зберігаються в :mod:`contextvars` (див. :func:`bind_log_context`) і
+автоматично додаються до кожного запису логу - передавати їх у виклики
+``logger.*`` вручну не потрібно. У файл записи пишуться як JSON, по одному
+об'єкту в рядку.
+"""
+import atexit
+import contextlib
+import json
+import logging
+import os
+import queue
+import threading
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Dict, Iterator, Optional
+
+# Формат рядка логу: час, ім'я логера, рівень, ідентифікатор кореляції, повідомлення
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - [REQ_ID:%(correlation_id)s] %(message)s'
+# Формат файлу логу: 'json' (по одному JSON-об'єкту в рядку) або 'text'
+LOG_FILE_FORMAT = os.environ.get("LOG_FILE_FORMAT", "json").lower()
+# Максимальна кількість записів у черзі логування
+LOG_QUEUE_SIZE = int(os.environ.get("LOG_QUEUE_SIZE", "10000"))
+# Максимальний розмір файлу 5 MB, зберігаємо 5 останніх файлів
+LOG_MAX_BYTES = 5 * 1024 * 1024
+LOG_BACKUP_COUNT = 5
+
+
+# --- Контекст поточного оновлення ---
+_correlation_id: ContextVar[str] = ContextVar("correlation_id", default="N/A")
+_log_user_id: ContextVar[Optional[int]] = ContextVar("log_user_id", default=None)
+_log_handler: ContextVar[str] = ContextVar("log_handler", default="")
+
+
+def get_correlation_id() -> str:
+    """Повертає ідентифікатор кореляції поточного оновлення ('N/A' поза обробкою оновлення)."""
+    return _correlation_id.get()
+
+
+@contextlib.contextmanager
+def bind_log_context(handler: str, user_id: Optional[int] = None,
+                     correlation_id: Optional[str] = None) -> Iterator[str]:
+    """
+    Встановлює контекст логування на час обробки одного оновлення.
+
+    Усі записи логу, створені всередині блоку (зокрема у функціях, що
+    виконуються через :func:`for_test.utils.run_blocking`), отримують поля
+    ``correlation_id``, ``user_id`` та ``handler``.
+
+    :param handler: Ім'я обробника.
+    :type handler: str
+    :param user_id: ID користувача Telegram.
+    :type user_id: int
+    :param correlation_id: Ідентифікатор кореляції (None - згенерувати новий).
+    :type correlation_id: str
+    :returns: Ідентифікатор кореляції блоку.
+    """
+    correlation_id = correlation_id or str(uuid.uuid4())
+    tokens = (
+        _correlation_id.set(correlation_id),
+        _log_user_id.set(user_id),
+        _log_handler.set(handler),
+    )
+    try:
+        yield correlation_id
+    finally:
+        _log_handler.reset(tokens[2])
+        _log_user_id.reset(tokens[1])
+        _correlation_id.reset(tokens[0])
+
+
+class _ContextFilter(logging.Filter):
+    """Додає до запису поля контексту поточного оновлення (у потоці, що викликав логер)."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not hasattr(record, "correlation_id"):
+            record.correlation_id = _correlation_id.get()
+        if not hasattr(record, "user_id"):
+            record.user_id = _log_user_id.get()
+        if not hasattr(record, "handler"):
+            record.handler = _log_handler.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """Форматує запис логу як один рядок JSON зі структурованими полями контексту."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "correlation_id": getattr(record, "correlation_id", "N/A"),
+            "user_id": getattr(record, "user_id", None),
+            "handler": getattr(record, "handler", ""),
+        }
+        duration_ms = getattr(record, "duration_ms", None)
+        if duration_ms is not None:
+            entry["duration_ms"] = duration_ms
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc_info"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _NonBlockingQueueHandler(QueueHandler):
+    """QueueHandler, який не блокує виклик логера і не форматує запис у потоці виклику."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Підставляємо аргументи (%-стиль) зараз, поки об'єкти ще не змінилися,
+        # а форматування рядка (час, рівень, трасування) лишаємо фоновому потоку.
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._dropped_lock:
+                self.dropped += 1
+
+
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional[_NonBlockingQueueHandler] = None
+
+
+def configure_logging(level: int = logging.INFO, log_file: Optional[str] = None,
+                      queue_size: int = LOG_QUEUE_SIZE) -> QueueListener:
+    """
+    Налаштовує кореневий логер: усі записи йдуть через обмежену чергу до фонового потоку.
+
+    Попередні обробники кореневого логера видаляються, тому повторний виклик
+    не дублює рядки в лозі.
+
+    :param level: Рівень логування.
+    :type level: int
+    :param log_file: Шлях до файлу логу (None - лише консоль).
+    :type log_file: str
+    :param queue_size: Максимальна кількість записів у черзі.
+    :type queue_size: int
+    :returns: Запущений QueueListener.
+    :rtype: logging.handlers.QueueListener
+    """
+    global _listener, _queue_handler # pylint: disable=global-statement
+    stop_logging()
+
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    handlers = [console_handler]
+    if log_file:
+        file_handler = RotatingFileHandler(
+            log_file, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, encoding='utf-8'
+        )
+        file_handler.setFormatter(
+            JsonFormatter() if LOG_FILE_FORMAT == "json" else logging.Formatter(LOG_FORMAT)
+        )
+        handlers.append(file_handler)
+    for handler in handlers:
+        handler.setLevel(level)
+
+    log_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+    _queue_handler = _NonBlockingQueueHandler(log_queue)
+    _queue_handler.addFilter(_ContextFilter())
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        handler.close()
+    root.addHandler(_queue_handler)
+    root.setLevel(level)
+
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def stop_logging():
+    """Дописує записи, що лишилися в черзі, і зупиняє фоновий потік логування."""
+    global _listener # pylint: disable=global-statement
+    listener, _listener = _listener, None
+    if listener is not None:
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+
+
+def get_logging_stats() -> Dict[str, int]:
+    """
+    Повертає статистику черги логування.
+
+    :returns: Словник з ключами 'queued' (записів очікує запису) та 'dropped' (відкинуто через переповнення).
+    :rtype: dict
+    """
+    if _queue_handler is None:
+        return {"queued": 0, "dropped": 0}
+    return {"queued": _queue_handler.queue.qsize(), "dropped": _queue_handler.dropped}
+
+
+atexit.register(stop_logging)
@@ -0,0 +1,327 @@
+"""
+Модуль метрик продуктивності Telegram-бота.
+
+Збирає лічильники викликів, помилок і гістограми затримок для кожного
+обробника (з урахуванням стану діалогу ConversationHandler) та для кожної
+операції зі сховищами в :mod:`for_test.utils`. Метрики віддаються у
+текстовому форматі Prometheus локальним HTTP-ендпоінтом.
+
+Запис одного спостереження - це кілька арифметичних операцій під блокуванням,
+тому збирання метрик можна тримати увімкненим у продакшені.
+"""
+import bisect
+import functools
+import logging
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from for_test.logging_config import bind_log_context
+
+# Створюємо логер для цього модуля
+logger = logging.getLogger(__name__)
+# Логер завершених обробок оновлень (обробник, користувач, тривалість)
+access_logger = logging.getLogger("for_test.access")
+
+# Межі кошиків гістограми затримок, секунди
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Локальний ендпоінт метрик (0 - вимкнено)
+METRICS_LISTEN = os.environ.get("METRICS_LISTEN", "127.0.0.1")
+METRICS_PORT = int(os.environ.get("METRICS_PORT", "0"))
+METRICS_PATH = "/metrics"
+
+
+class _Series:
+    """Лічильники та гістограма затримок для одного набору міток."""
+    __slots__ = ("calls", "errors", "buckets", "total")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.total = 0.0
+
+
+class MetricsRegistry:
+    """Реєстр метрик: серії за групами (обробники, сховища) та зовнішні збирачі статистики."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # група -> (імена міток, {значення міток: серія})
+        self._groups: Dict[str, Tuple[Tuple[str, ...], Dict[Tuple[str, ...], _Series]]] = {}
+        # префікс -> функція, що повертає словник числових значень
+        self._collectors: Dict[str, Callable[[], Dict[str, Any]]] = {}
+
+    def observe(self, group: str, label_names: Tuple[str, ...], labels: Tuple[str, ...],
+                duration: float, error: bool = False):
+        """Реєструє один виклик тривалістю ``duration`` секунд."""
+        index = bisect.bisect_left(LATENCY_BUCKETS, duration)
+        with self._lock:
+            entry = self._groups.get(group)
+            if entry is None:
+                entry = self._groups[group] = (label_names, {})
+            series = entry[1].get(labels)
+            if series is None:
+                series = entry[1][labels] = _Series()
+            series.calls += 1
+            series.buckets[index] += 1
+            series.total += duration
+            if error:
+                series.errors += 1
+
+    def register_collector(self, prefix: str, collector: Callable[[], Dict[str, Any]]):
+        """Додає функцію статистики, числові значення якої віддаються як gauge ``<prefix>_<ключ>``."""
+        with self._lock:
+            self._collectors[prefix] = collector
+
+    def snapshot(self, group: str) -> Dict[Tuple[str, ...], Dict[str, float]]:
+        """Повертає копію лічильників групи: {мітки: {'calls', 'errors', 'total_seconds'}}."""
+        with self._lock:
+            entry = self._groups.get(group)
+            if entry is None:
+                return {}
+            return {
+                labels: {"calls": series.calls, "errors": series.errors, "total_seconds": series.total}
+                for labels, series in entry[1].items()
+            }
+
+    def render(self) -> str:
+        """Повертає всі метрики в текстовому форматі Prometheus (версія 0.0.4)."""
+        with self._lock:
+            groups = {
+                group: (names, {labels: (s.calls, s.errors, list(s.buckets), s.total)
+                                for labels, s in series.items()})
+                for group, (names, series) in self._groups.items()
+            }
+            collectors = list(self._collectors.items())
+
+        lines: List[str] = []
+        for group, (names, series) in sorted(groups.items()):
+            base = f"bot_{group}"
+            lines.append(f"# HELP {base}_calls_total Number of {group} calls.")
+            lines.append(f"# TYPE {base}_calls_total counter")
+            for labels, (calls, _, _, _) in sorted(series.items()):
+                lines.append(f"{base}_calls_total{_format_labels(names, labels)} {calls}")
+            lines.append(f"# HELP {base}_errors_total Number of {group} calls that raised an exception.")
+            lines.append(f"# TYPE {base}_errors_total counter")
+            for labels, (_, errors, _, _) in sorted(series.items()):
+                lines.append(f"{base}_errors_total{_format_labels(names, labels)} {errors}")
+            lines.append(f"# HELP {base}_duration_seconds Latency of {group} calls.")
+            lines.append(f"# TYPE {base}_duration_seconds histogram")
+            for labels, (calls, _, buckets, total) in sorted(series.items()):
+                cumulative = 0
+                for bound, count in zip(LATENCY_BUCKETS, buckets):
+                    cumulative += count
+                    le_labels = _format_labels(names + ("le",), labels + (repr(bound),))
+                    lines.append(f"{base}_duration_seconds_bucket{le_labels} {cumulative}")
+                inf_labels = _format_labels(names + ("le",), labels + ("+Inf",))
+                lines.append(f"{base}_duration_seconds_bucket{inf_labels} {calls}")
+                lines.append(f"{base}_duration_seconds_sum{_format_labels(names, labels)} {total:.6f}")
+                lines.append(f"{base}_duration_seconds_count{_format_labels(names, labels)} {calls}")
+
+        for prefix, collector in collectors:
+            try:
+                stats = collector()
+            except Exception as e: # pylint: disable=broad-except
+                logger.error("ERR_METRICS_001: Stats collector '%s' failed: %s", prefix, e, exc_info=True)
+                continue
+            for key, value in sorted(stats.items()):
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    lines.append(f"# TYPE bot_{prefix}_{key} gauge")
+                    lines.append(f"bot_{prefix}_{key} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(
+        f'{name}="{_escape_label(value)}"' for name, value in zip(names, values)
+    )
+    return "{" + pairs + "}"
+
+
+def _escape_label(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# Глобальний реєстр метрик процесу
+registry = MetricsRegistry()
+
+_HANDLER_LABELS = ("handler", "state")
+_STORAGE_LABELS = ("operation",)
+# Людські назви станів діалогу: значення стану -> назва (наприклад, 1 -> 'ASK_NAME')
+_state_names: Dict[Any, str] = {}
+
+
+def instrument_callback(callback: Callable, handler_name: str, state: str = "") -> Callable:
+    """
+    Обгортає асинхронний колбек обробника вимірюванням кількості викликів, помилок і затримки.
+
+    На час виклику встановлює контекст логування (новий ідентифікатор кореляції,
+    користувач, обробник), а після завершення пише в лог ``for_test.access``
+    запис із тривалістю обробки (поле ``duration_ms``).
+
+    :param callback: Колбек обробника python-telegram-bot.
+    :type callback: Callable
+    :param handler_name: Ім'я обробника для мітки ``handler``.
+    :type handler_name: str
+    :param state: Стан діалогу для мітки ``state`` (порожньо - поза діалогом).
+    :type state: str
+    :returns: Обгорнутий колбек.
+    :rtype: Callable
+    """
+    if getattr(callback, "__metrics_instrumented__", False):
+        return callback
+    labels = (handler_name, state)
+
+    @functools.wraps(callback)
+    async def wrapper(update, context):
+        user = getattr(update, "effective_user", None)
+        with bind_log_context(handler_name, user.id if user is not None else None):
+            started = time.perf_counter()
+            try:
+                result = await callback(update, context)
+            except Exception:
+                duration = time.perf_counter() - started
+                registry.observe("handler", _HANDLER_LABELS, labels, duration, error=True)
+                access_logger.info(
+                    "Handler %s failed after %.1f ms.", handler_name, duration * 1000,
+                    extra={"duration_ms": round(duration * 1000, 3)}
+                )
+                raise
+            duration = time.perf_counter() - started
+            registry.observe("handler", _HANDLER_LABELS, labels, duration)
+            access_logger.info(
+                "Handler %s completed in %.1f ms.", handler_name, duration * 1000,
+                extra={"duration_ms": round(duration * 1000, 3)}
+            )
+            return result
+
+    wrapper.__metrics_instrumented__ = True
+    return wrapper
+
+
+def _instrument_handler(handler, state: str):
+    # ConversationHandler не має власного колбека - інструментуємо вкладені обробники
+    entry_points = getattr(handler, "entry_points", None)
+    if entry_points is not None and hasattr(handler, "states"):
+        for nested in entry_points:
+            _instrument_handler(nested, "entry")
+        for state_key, nested_handlers in handler.states.items():
+            state_name = _state_names.get(state_key, str(state_key))
+            for nested in nested_handlers:
+                _instrument_handler(nested, state_name)
+        for nested in handler.fallbacks:
+            _instrument_handler(nested, "fallback")
+        return
+    # MenuRouter передає оновлення одному з кількох колбеків за дією
+    callbacks = getattr(handler, "callbacks", None)
+    if isinstance(callbacks, dict):
+        for action, nested_callback in callbacks.items():
+            callbacks[action] = instrument_callback(
+                nested_callback, getattr(nested_callback, "__name__", action), state
+            )
+        return
+    callback = getattr(handler, "callback", None)
+    if callback is not None:
+        handler.callback = instrument_callback(callback, getattr(callback, "__name__", "unknown"), state)
+
+
+def instrument_application(app, state_names: Optional[Dict[Any, str]] = None):
+    """
+    Обгортає всі зареєстровані в Application обробники вимірюванням метрик.
+
+    Обробники всередині ConversationHandler отримують мітку стану
+    (``entry``, назва стану з ``state_names`` або ``fallback``).
+    Повторний виклик не обгортає обробники вдруге.
+
+    :param app: Об'єкт Application з уже зареєстрованими обробниками.
+    :type app: telegram.ext.Application
+    :param state_names: Відповідність значень станів діалогу їхнім назвам.
+    :type state_names: dict
+    """
+    if state_names:
+        _state_names.update(state_names)
+    for handlers in app.handlers.values():
+        for handler in handlers:
+            _instrument_handler(handler, "")
+
+
+def timed_storage_call(operation: str) -> Callable:
+    """
+    Декоратор для синхронних функцій доступу до сховищ: рахує виклики, помилки та затримку.
+
+    :param operation: Назва операції для мітки ``operation``.
+    :type operation: str
+    """
+    labels = (operation,)
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            except Exception:
+                registry.observe("storage", _STORAGE_LABELS, labels, time.perf_counter() - started, error=True)
+                raise
+            registry.observe("storage", _STORAGE_LABELS, labels, time.perf_counter() - started)
+            return result
+        return wrapper
+    return decorator
+
+
+class _MetricsRequestHandler(BaseHTTPRequestHandler):
+    def do_GET(self): # pylint: disable=invalid-name
+        if self.path.split("?", 1)[0] != METRICS_PATH:
+            self.send_error(404)
+            return
+        body = registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args): # pylint: disable=redefined-builtin
+        logger.debug("Metrics endpoint: " + format, *args)
+
+
+_metrics_server: Optional[ThreadingHTTPServer] = None
+
+
+def start_metrics_server(listen: str = METRICS_LISTEN, port: int = METRICS_PORT) -> Optional[ThreadingHTTPServer]:
+    """
+    Запускає HTTP-ендпоінт ``/metrics`` у фоновому потоці.
+
+    :param listen: Адреса для прослуховування.
+    :type listen: str
+    :param port: Порт (0 - ендпоінт вимкнено).
+    :type port: int
+    :returns: Запущений сервер або None, якщо ендпоінт вимкнено чи не вдалося зайняти порт.
+    """
+    global _metrics_server # pylint: disable=global-statement
+    if not port or _metrics_server is not None:
+        return _metrics_server
+    try:
+        server = ThreadingHTTPServer((listen, port), _MetricsRequestHandler)
+    except OSError as e:
+        logger.error("ERR_METRICS_002: Cannot start metrics endpoint on %s:%s: %s", listen, port, e)
+        return None
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    _metrics_server = server
+    logger.info("Metrics endpoint listening on http://%s:%s%s", listen, port, METRICS_PATH)
+    return server
+
+
+def stop_metrics_server():
+    """Зупиняє HTTP-ендпоінт метрик, якщо він запущений."""
+    global _metrics_server # pylint: disable=global-statement
+    server, _metrics_server = _metrics_server, None
+    if server is not None:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,267 @@
+"""
+Модуль фонової розсилки сповіщень адміністраторам Telegram-бота.
+
+Обробник, у якому сталася помилка, лише кладе сповіщення в обмежену чергу
+(:func:`send_admin_notification` не чекає на мережу). Фонове завдання
+:class:`AdminNotificationDispatcher` надсилає перше сповіщення з кожним
+кодом помилки одразу, а повтори того самого коду протягом вікна
+``ADMIN_NOTIFY_WINDOW`` збирає в одне зведення. Повідомлення всім
+адміністраторам надсилаються паралельно, з дотриманням ліміту частоти
+повідомлень в один чат.
+"""
+import asyncio
+import logging
+import os
+import re
+import time
+from typing import Dict, List, Optional, Set
+from telegram.error import RetryAfter
+from for_test.logging_config import get_correlation_id
+from for_test.responses import paginate_lines
+from for_test.utils import load_admin_ids_async, load_language_message
+
+# Створюємо логер для цього модуля
+logger = logging.getLogger(__name__)
+
+# Максимальна кількість сповіщень у черзі; надлишок відкидається
+ADMIN_NOTIFY_QUEUE_SIZE = int(os.environ.get("ADMIN_NOTIFY_QUEUE_SIZE", "1000"))
+# Вікно (секунди), протягом якого повтори одного коду помилки збираються у зведення
+ADMIN_NOTIFY_WINDOW = float(os.environ.get("ADMIN_NOTIFY_WINDOW", "60"))
+# Мінімальний інтервал (секунди) між повідомленнями в один чат (ліміт Telegram - 1 повідомлення/с)
+ADMIN_NOTIFY_CHAT_INTERVAL = float(os.environ.get("ADMIN_NOTIFY_CHAT_INTERVAL", "1.0"))
+# Скільки секунд чекати на доставку сповіщень під час зупинки бота
+_SHUTDOWN_TIMEOUT = 5.0
+
+# Код помилки в тексті сповіщення, наприклад ERR_HANDLER_006
+_ERROR_CODE_RE = re.compile(r"\b(?:ERR|WARN)_[A-Z]+_\d+\b")
+
+
+class _Digest:
+    """Повтори одного коду помилки у поточному вікні."""
+    __slots__ = ("code", "repeats", "last_message", "correlation_ids")
+
+    def __init__(self, code: str):
+        self.code = code
+        self.repeats = 0
+        self.last_message = ""
+        self.correlation_ids: List[str] = []
+
+
+class AdminNotificationDispatcher:
+    """Фоновий диспетчер сповіщень адміністраторам: черга, зведення повторів, ліміт частоти."""
+
+    def __init__(self, queue_size: int = ADMIN_NOTIFY_QUEUE_SIZE, window: float = ADMIN_NOTIFY_WINDOW,
+                 chat_interval: float = ADMIN_NOTIFY_CHAT_INTERVAL):
+        self._queue_size = queue_size
+        self._window = window
+        self._chat_interval = chat_interval
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._bot = None
+        # ключ (код помилки або текст) -> повтори у поточному вікні
+        self._pending: Dict[str, _Digest] = {}
+        self._window_timers: Dict[str, asyncio.TimerHandle] = {}
+        self._deliveries: Set[asyncio.Task] = set()
+        # чат -> найближчий момент (monotonic), коли в нього можна надсилати
+        self._chat_next_send: Dict[int, float] = {}
+        self._stats: Dict[str, int] = {"submitted": 0, "dropped": 0, "coalesced": 0, "sent": 0, "failed": 0}
+
+    @property
+    def is_running(self) -> bool:
+        """True, якщо фонове завдання диспетчера запущене."""
+        return self._worker is not None and not self._worker.done()
+
+    def start(self, bot):
+        """
+        Запускає фонове завдання диспетчера в поточному циклі подій.
+
+        :param bot: Екземпляр бота, через який надсилаються сповіщення.
+        :type bot: telegram.Bot
+        """
+        if self.is_running:
+            return
+        self._bot = bot
+        self._queue = asyncio.Queue(maxsize=self._queue_size)
+        self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    def submit(self, message: str) -> bool:
+        """
+        Додає сповіщення в чергу, не чекаючи на його надсилання.
+
+        :param message: Повний текст сповіщення.
+        :type message: str
+        :returns: False, якщо черга переповнена і сповіщення відкинуто.
+        :rtype: bool
+        """
+        try:
+            self._queue.put_nowait((message, get_correlation_id()))
+        except asyncio.QueueFull:
+            self._stats["dropped"] += 1
+            logger.warning("WARN_NOTIFY_001: Admin notification queue is full. Notification dropped.")
+            return False
+        self._stats["submitted"] += 1
+        return True
+
+    async def stop(self):
+        """Зупиняє диспетчер: надсилає зведення, що залишилися, і чекає на доставку."""
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+        while not self._queue.empty():
+            self._accept(*self._queue.get_nowait())
+        for key in list(self._pending):
+            self._close_window(key)
+        if self._deliveries:
+            _, pending = await asyncio.wait(self._deliveries, timeout=_SHUTDOWN_TIMEOUT)
+            for task in pending:
+                task.cancel()
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Повертає статистику диспетчера.
+
+        :returns: Словник з ключами 'submitted', 'dropped', 'coalesced' (повтори, зібрані у зведення),
+                  'sent', 'failed' та 'queued'.
+        :rtype: dict
+        """
+        stats = dict(self._stats)
+        stats["queued"] = self._queue.qsize() if self._queue is not None else 0
+        return stats
+
+    async def _run(self):
+        while True:
+            message, correlation_id = await self._queue.get()
+            self._accept(message, correlation_id)
+
+    def _accept(self, message: str, correlation_id: str):
+        match = _ERROR_CODE_RE.search(message)
+        key = match.group(0) if match else message
+        digest = self._pending.get(key)
+        if digest is not None:
+            # Повтор у межах вікна - лише рахуємо, надішлемо зведенням наприкінці вікна
+            digest.repeats += 1
+            digest.last_message = message
+            digest.correlation_ids.append(correlation_id)
+            self._stats["coalesced"] += 1
+            return
+        self._pending[key] = _Digest(match.group(0) if match else "")
+        self._window_timers[key] = asyncio.get_running_loop().call_later(
+            self._window, self._close_window, key
+        )
+        self._deliver(message)
+
+    def _close_window(self, key: str):
+        timer = self._window_timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        digest = self._pending.pop(key, None)
+        if digest is None or not digest.repeats:
+            return
+        code = digest.code or "сповіщення"
+        self._deliver(
+            f"🔁 {code} повторилася ще {digest.repeats} раз(и) за {self._window:g} с.\n"
+            f"REQ_ID: {', '.join(digest.correlation_ids[-5:])}\n\n"
+            f"Останнє сповіщення:\n{digest.last_message}"
+        )
+
+    def _deliver(self, text: str):
+        # Telegram обмежує довжину повідомлення - надсилаємо лише першу сторінку
+        text = paginate_lines(text.split("\n"))[0]
+        task = asyncio.get_running_loop().create_task(self.send_now(self._bot, text))
+        self._deliveries.add(task)
+        task.add_done_callback(self._deliveries.discard)
+
+    async def send_now(self, bot, text: str):
+        """
+        Надсилає повідомлення всім адміністраторам одразу, без черги та зведення.
+
+        :param bot: Екземпляр бота.
+        :type bot: telegram.Bot
+        :param text: Текст повідомлення.
+        :type text: str
+        """
+        admins = await load_admin_ids_async()
+        if not admins:
+            logger.warning("WARN_UTIL_006: No admin IDs found in admins.json. Cannot send notification.")
+            return
+        await asyncio.gather(*(self._send_to_chat(bot, admin_id, text) for admin_id in admins))
+
+    async def _send_to_chat(self, bot, chat_id: int, text: str):
+        await self._wait_chat_slot(chat_id)
+        try:
+            try:
+                await bot.send_message(chat_id=chat_id, text=text)
+            except RetryAfter as e:
+                # Telegram просить зачекати - повторюємо один раз після паузи
+                retry_after = e.retry_after
+                delay = retry_after.total_seconds() if hasattr(retry_after, "total_seconds") else retry_after
+                self._chat_next_send[chat_id] = time.monotonic() + delay
+                await self._wait_chat_slot(chat_id)
+                await bot.send_message(chat_id=chat_id, text=text)
+        except Exception as e: # pylint: disable=broad-except
+            self._stats["failed"] += 1
+            logger.error(
+                "ERR_UTIL_012: Failed to send notification to admin %s. Error: %s", chat_id, e, exc_info=True
+            )
+            return
+        self._stats["sent"] += 1
+        logger.info("Sent critical error notification to admin %s.", chat_id)
+
+    async def _wait_chat_slot(self, chat_id: int):
+        now = time.monotonic()
+        slot = max(now, self._chat_next_send.get(chat_id, 0.0))
+        self._chat_next_send[chat_id] = slot + self._chat_interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+# Глобальний диспетчер сповіщень процесу (запускається в on_start бота)
+dispatcher = AdminNotificationDispatcher()
+
+
+def _format_admin_message(message: str, user_info: Optional[dict]) -> str:
+    admin_notification_text = load_language_message('uk', 'admin_critical_error_notification')
+
+    # Додаємо контекстну інформацію про користувача, якщо вона надана
+    context_info = ""
+    if user_info:
+        context_info += f"\nКористувач: {user_info.get('username', 'N/A')} ({user_info.get('user_id', 'N/A')})"
+        context_info += f"\nREQ_ID: {user_info.get('correlation_id', get_correlation_id())}"
+        context_info += f"\nПовідомлення користувачу: {user_info.get('user_friendly_message', 'N/A')}"
+
+    return f"{admin_notification_text}{context_info}\n\nДеталі помилки:\n{message}"
+
+
+async def send_admin_notification(bot_instance, message: str, user_info: dict = None):
+    """
+    Надсилає повідомлення про критичну помилку адміністраторам бота.
+
+    Якщо диспетчер сповіщень запущений, повідомлення лише ставиться в його чергу
+    і виклик повертається одразу. Інакше (наприклад, до запуску бота)
+    повідомлення надсилається всім адміністраторам напряму.
+
+    :param bot_instance: Екземпляр бота (context.bot).
+    :param message: Текст повідомлення для адміністратора.
+    :type message: str
+    :param user_info: Словник з інформацією про користувача (id, username).
+                      Може бути None.
+    :type user_info: dict
+    """
+    try:
+        full_message = _format_admin_message(message, user_info)
+        if dispatcher.is_running:
+            dispatcher.submit(full_message)
+            return
+        await dispatcher.send_now(bot_instance, full_message)
+    except Exception as e:
+        logger.critical("ERR_UTIL_014: Unexpected error in send_admin_notification: %s", e, exc_info=True)
+
+
+def get_notification_stats() -> Dict[str, int]:
+    """Повертає статистику глобального диспетчера сповіщень (див. :meth:`AdminNotificationDispatcher.get_stats`)."""
+    return dispatcher.get_stats()
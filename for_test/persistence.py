@@ -0,0 +1,288 @@
+"""
+Модуль збереження станів діалогів Telegram-бота між перезапусками.
+
+:class:`SqlitePersistence` - реалізація ``BasePersistence`` python-telegram-bot,
+яка зберігає стани ``ConversationHandler`` (``ASK_NAME``/``ASK_DATE``/``ASK_TIME``)
+та ``context.user_data`` у SQLite (:class:`ConversationStateStore`).
+Application передає зміни раз на ``PERSISTENCE_UPDATE_INTERVAL`` секунд; вони лише
+ставляться в чергу сховища, а записуються пакетом у фоновому потоці, тому
+обробка оновлень на диск не чекає. Після перезапуску користувач продовжує
+запис на консультацію з того кроку, на якому зупинився.
+"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, Optional, Tuple
+from telegram.ext import BasePersistence, PersistenceInput
+from for_test.storage import WRITE_BEHIND_DELAY, WriteBehindStore
+from for_test.utils import run_blocking
+
+# Створюємо логер для цього модуля
+logger = logging.getLogger(__name__)
+
+# Як часто (секунди) Application передає змінені user_data та стани діалогів у сховище
+PERSISTENCE_UPDATE_INTERVAL = float(os.environ.get("PERSISTENCE_UPDATE_INTERVAL", "5"))
+# База даних станів діалогів і user_data
+CONVERSATIONS_DB_FILE = os.environ.get("CONVERSATIONS_DB", "conversations.db")
+
+
+class ConversationStateStore(WriteBehindStore):
+    """Сховище станів діалогів (ConversationHandler) і user_data на основі SQLite.
+
+    Зміни лише накопичуються в пам'яті (останнє значення для кожного користувача
+    чи діалогу) і записуються у фоновому потоці однією транзакцією на пакет,
+    рядок на користувача чи діалог, без перезапису всієї бази. Незмінені
+    user_data не записуються повторно. Значення зберігаються як JSON.
+
+    :param path: Шлях до файлу бази даних.
+    :type path: str
+    :param flush_delay: Вікно об'єднання змін (секунди).
+    :type flush_delay: float
+    """
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS user_data (
+            user_id INTEGER PRIMARY KEY,
+            data TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS conversations (
+            name TEXT NOT NULL,
+            conversation_key TEXT NOT NULL,
+            state TEXT NOT NULL,
+            PRIMARY KEY (name, conversation_key)
+        );
+    """
+
+    def __init__(self, path: str = CONVERSATIONS_DB_FILE, flush_delay: float = WRITE_BEHIND_DELAY):
+        super().__init__(flush_delay)
+        self.path = path
+        # Захищає накопичені зміни (змінюються з циклу подій, записуються з потоку таймера)
+        self._lock = threading.Lock()
+        # Серіалізує доступ до з'єднання
+        self._db_lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute("PRAGMA busy_timeout=5000")
+        self._connection.executescript(self._SCHEMA)
+        self._closed = False
+        # Незаписані зміни: ключ -> JSON (None - видалити)
+        self._pending_user_data: Dict[int, Optional[str]] = {}
+        self._pending_states: Dict[Tuple[str, str], Optional[str]] = {}
+        # Останній записаний (або запланований) JSON user_data кожного користувача
+        self._known_user_data: Dict[int, str] = {}
+        self._stats: Dict[str, int] = {"flushes": 0, "rows_written": 0, "unchanged_skipped": 0}
+
+    def load_user_data(self) -> Dict[int, dict]:
+        """Читає user_data усіх користувачів.
+
+        :returns: Словник {user_id: user_data}.
+        :rtype: dict
+        """
+        with self._db_lock:
+            rows = self._connection.execute("SELECT user_id, data FROM user_data").fetchall()
+        user_data = {}
+        for user_id, data in rows:
+            try:
+                user_data[user_id] = json.loads(data)
+            except json.JSONDecodeError as e:
+                logger.warning(
+                    "WARN_STORE_006: Skipping corrupted user_data of user %s in %s. Error: %s", user_id, self.path, e
+                )
+                continue
+            self._known_user_data[user_id] = data
+        logger.info("Loaded user_data of %d users from %s.", len(user_data), self.path)
+        return user_data
+
+    def load_conversations(self, name: str) -> Dict[tuple, Any]:
+        """Читає стани всіх незавершених діалогів обробника `name`.
+
+        :param name: Назва ConversationHandler.
+        :type name: str
+        :returns: Словник {ключ діалогу: стан}.
+        :rtype: dict
+        """
+        with self._db_lock:
+            rows = self._connection.execute(
+                "SELECT conversation_key, state FROM conversations WHERE name = ?", (name,)
+            ).fetchall()
+        conversations = {tuple(json.loads(key)): json.loads(state) for key, state in rows}
+        logger.info("Loaded %d '%s' conversations from %s.", len(conversations), name, self.path)
+        return conversations
+
+    def set_user_data(self, user_id: int, data: Optional[dict]):
+        """Планує запис user_data користувача (None - видалення).
+
+        :param user_id: ID користувача.
+        :type user_id: int
+        :param data: Нові user_data або None.
+        :type data: dict | None
+        """
+        if data is None:
+            encoded = None
+        else:
+            try:
+                encoded = json.dumps(data, ensure_ascii=False, sort_keys=True)
+            except (TypeError, ValueError) as e:
+                logger.error("ERR_STORE_006: user_data of user %s is not JSON-serializable. Error: %s", user_id, e)
+                return
+        with self._lock:
+            if encoded is not None and self._known_user_data.get(user_id) == encoded:
+                self._stats["unchanged_skipped"] += 1
+                return
+            if encoded is None:
+                self._known_user_data.pop(user_id, None)
+            else:
+                self._known_user_data[user_id] = encoded
+            self._pending_user_data[user_id] = encoded
+        self._schedule_flush()
+
+    def set_conversation_state(self, name: str, key: tuple, state: Any):
+        """Планує запис стану діалогу (None - діалог завершено, стан видаляється).
+
+        :param name: Назва ConversationHandler.
+        :type name: str
+        :param key: Ключ діалогу (наприклад, (chat_id, user_id)).
+        :type key: tuple
+        :param state: Новий стан або None.
+        """
+        encoded = None if state is None else json.dumps(state)
+        with self._lock:
+            self._pending_states[(name, json.dumps(list(key)))] = encoded
+        self._schedule_flush()
+
+    def flush(self):
+        with self._lock:
+            user_data, self._pending_user_data = self._pending_user_data, {}
+            states, self._pending_states = self._pending_states, {}
+        if not user_data and not states:
+            return
+        try:
+            with self._db_lock:
+                if self._closed:
+                    logger.warning(
+                        "WARN_STORE_007: %s is closed. %d conversation state changes were not saved.",
+                        self.path, len(user_data) + len(states)
+                    )
+                    return
+                self._connection.execute("BEGIN")
+                try:
+                    self._connection.executemany(
+                        "INSERT OR REPLACE INTO user_data (user_id, data) VALUES (?, ?)",
+                        [(user_id, data) for user_id, data in user_data.items() if data is not None]
+                    )
+                    self._connection.executemany(
+                        "DELETE FROM user_data WHERE user_id = ?",
+                        [(user_id,) for user_id, data in user_data.items() if data is None]
+                    )
+                    self._connection.executemany(
+                        "INSERT OR REPLACE INTO conversations (name, conversation_key, state) VALUES (?, ?, ?)",
+                        [(name, key, state) for (name, key), state in states.items() if state is not None]
+                    )
+                    self._connection.executemany(
+                        "DELETE FROM conversations WHERE name = ? AND conversation_key = ?",
+                        [key for key, state in states.items() if state is None]
+                    )
+                    self._connection.execute("COMMIT")
+                except BaseException:
+                    self._connection.execute("ROLLBACK")
+                    raise
+        except sqlite3.Error as e:
+            # Повертаємо зміни в чергу (новіші за них значення мають пріоритет)
+            with self._lock:
+                self._pending_user_data = {**user_data, **self._pending_user_data}
+                self._pending_states = {**states, **self._pending_states}
+            raise OSError(f"Failed to write conversation state to {self.path}: {e}") from e
+        self._stats["flushes"] += 1
+        self._stats["rows_written"] += len(user_data) + len(states)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Повертає статистику сховища.
+
+        :returns: Словник з ключами 'flushes', 'rows_written', 'unchanged_skipped' та 'pending'.
+        :rtype: dict
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["pending"] = len(self._pending_user_data) + len(self._pending_states)
+        return stats
+
+    def close(self):
+        super().close()
+        with self._db_lock:
+            if not self._closed:
+                self._connection.close()
+                self._closed = True
+
+
+class SqlitePersistence(BasePersistence[Dict, Dict, Dict]):
+    """
+    Збереження user_data та станів діалогів у SQLite.
+
+    chat_data, bot_data та callback_data бот не використовує, тому вони не зберігаються.
+
+    :param store: Сховище станів; за замовчуванням - база ``CONVERSATIONS_DB``.
+    :type store: ConversationStateStore
+    :param update_interval: Інтервал передачі змін у сховище (секунди).
+    :type update_interval: float
+    """
+
+    def __init__(self, store: Optional[ConversationStateStore] = None,
+                 update_interval: float = PERSISTENCE_UPDATE_INTERVAL):
+        super().__init__(
+            store_data=PersistenceInput(bot_data=False, chat_data=False, user_data=True, callback_data=False),
+            update_interval=update_interval,
+        )
+        self.store = store if store is not None else ConversationStateStore()
+
+    async def get_user_data(self) -> Dict[int, Dict]:
+        return await run_blocking(self.store.load_user_data)
+
+    async def get_chat_data(self) -> Dict[int, Dict]:
+        return {}
+
+    async def get_bot_data(self) -> Dict:
+        return {}
+
+    async def get_callback_data(self) -> Optional[Any]:
+        return None
+
+    async def get_conversations(self, name: str) -> Dict:
+        return await run_blocking(self.store.load_conversations, name)
+
+    async def update_conversation(self, name: str, key: tuple, new_state: Optional[object]) -> None:
+        self.store.set_conversation_state(name, key, new_state)
+
+    async def update_user_data(self, user_id: int, data: Dict) -> None:
+        self.store.set_user_data(user_id, data)
+
+    async def update_chat_data(self, chat_id: int, data: Dict) -> None:
+        pass
+
+    async def update_bot_data(self, data: Dict) -> None:
+        pass
+
+    async def update_callback_data(self, data: Any) -> None:
+        pass
+
+    async def drop_chat_data(self, chat_id: int) -> None:
+        pass
+
+    async def drop_user_data(self, user_id: int) -> None:
+        self.store.set_user_data(user_id, None)
+
+    async def refresh_user_data(self, user_id: int, user_data: Dict) -> None:
+        pass
+
+    async def refresh_chat_data(self, chat_id: int, chat_data: Dict) -> None:
+        pass
+
+    async def refresh_bot_data(self, bot_data: Dict) -> None:
+        pass
+
+    async def flush(self) -> None:
+        """Записує всі накопичені зміни та закриває базу (викликається під час зупинки бота)."""
+        await run_blocking(self.store.close)
+        logger.info("Conversation state saved to %s.", self.store.path)
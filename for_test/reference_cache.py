@@ -0,0 +1,152 @@
+"""
+Модуль кешу довідкових даних Telegram-бота.
+
+Зберігає в пам'яті розпарсені ``faq.json``, ``court_info.json``,
+``court_schedule.json`` і ``contacts.json`` разом з версією, яка змінюється
+при кожному перезавантаженні файлу, тому похідні кеші (клавіатури, готові
+тексти, пошуковий індекс FAQ) можуть звіряти з нею свою актуальність.
+Файли, встановлені перезавантаженням вмісту (:mod:`for_test.content`),
+повертаються з пам'яті без звернення до диска.
+"""
+import json
+import logging
+import os
+import threading
+from typing import Any, Dict, Tuple
+from for_test.metrics import timed_storage_call
+
+# Створюємо логер для цього модуля
+logger = logging.getLogger(__name__)
+
+# Ключ - абсолютний шлях до файлу, значення - ((mtime_ns, size), версія, розпарсені дані).
+_reference_cache: Dict[str, tuple] = {}
+_reference_cache_lock = threading.Lock()
+_reference_cache_stats: Dict[str, int] = {"hits": 0, "misses": 0, "reloads": 0}
+# Лічильник версій: кожне (пере)завантаження файлу отримує нову версію
+_reference_version_counter = 0
+# Файли, актуальність яких стежить фонове перезавантаження вмісту (for_test.content):
+# їхні дані повертаються з кешу без перевірки файлу на диску
+_watched_reference_paths: set = set()
+
+
+@timed_storage_call("load_reference")
+def load_reference_entry(file_name: str) -> Tuple[int, Any]:
+    """
+    Повертає версію та розпарсений вміст JSON-файлу з довідковими даними.
+
+    Версія змінюється щоразу, коли файл перезавантажується з диска, тому її
+    можна використовувати як ключ для похідних кешів (клавіатури, готові тексти).
+    Файл парситься лише під час першого звернення або коли змінюється його
+    час модифікації (mtime) чи розмір. Файли, встановлені через
+    :func:`install_reference_data`, повертаються з пам'яті без звернення до диска.
+
+    :param file_name: Шлях до JSON-файлу (наприклад, 'faq.json').
+    :type file_name: str
+    :returns: Кортеж (версія, розпарсені дані).
+    :rtype: tuple[int, Any]
+    :raises FileNotFoundError: Якщо файл не існує.
+    :raises json.JSONDecodeError: Якщо файл містить некоректний JSON.
+    """
+    global _reference_version_counter # pylint: disable=global-statement
+    path = os.path.abspath(file_name)
+    with _reference_cache_lock:
+        cached = _reference_cache.get(path)
+        if cached is not None and path in _watched_reference_paths:
+            _reference_cache_stats["hits"] += 1
+            return cached[1], cached[2]
+
+    file_stat = os.stat(path)
+    signature = (file_stat.st_mtime_ns, file_stat.st_size)
+
+    with _reference_cache_lock:
+        cached = _reference_cache.get(path)
+        if cached is not None and cached[0] == signature:
+            _reference_cache_stats["hits"] += 1
+            return cached[1], cached[2]
+
+    with open(path, "r", encoding="utf-8") as file_handle:
+        data = json.load(file_handle)
+
+    with _reference_cache_lock:
+        if cached is None:
+            _reference_cache_stats["misses"] += 1
+            logger.info("Reference data '%s' loaded into cache.", file_name)
+        else:
+            _reference_cache_stats["reloads"] += 1
+            logger.info("Reference data '%s' changed on disk and was reloaded.", file_name)
+        _reference_version_counter += 1
+        _reference_cache[path] = (signature, _reference_version_counter, data)
+        return _reference_version_counter, data
+
+
+def load_reference_data(file_name: str) -> Any:
+    """
+    Повертає розпарсений вміст JSON-файлу з довідковими даними, використовуючи кеш у пам'яті.
+
+    Файл парситься лише під час першого звернення або коли змінюється його
+    час модифікації (mtime) чи розмір. В іншому випадку повертається вже
+    розпарсений об'єкт, тому викликач не повинен його змінювати.
+
+    :param file_name: Шлях до JSON-файлу (наприклад, 'faq.json').
+    :type file_name: str
+    :returns: Розпарсений вміст файлу.
+    :rtype: Any
+    :raises FileNotFoundError: Якщо файл не існує.
+    :raises json.JSONDecodeError: Якщо файл містить некоректний JSON.
+    """
+    return load_reference_entry(file_name)[1]
+
+
+def install_reference_data(file_name: str, signature: Tuple[int, int], data: Any) -> int:
+    """
+    Встановлює в кеш уже перевірений вміст файлу довідкових даних.
+
+    Далі файл повертається з пам'яті без перевірки на диску; за його змінами
+    стежить :class:`for_test.content.ContentReloader`.
+
+    :param file_name: Шлях до JSON-файлу.
+    :type file_name: str
+    :param signature: (mtime_ns, size) файлу, з якого прочитано дані.
+    :type signature: tuple[int, int]
+    :param data: Розпарсений вміст файлу.
+    :returns: Нова версія даних.
+    :rtype: int
+    """
+    global _reference_version_counter # pylint: disable=global-statement
+    path = os.path.abspath(file_name)
+    with _reference_cache_lock:
+        if path in _reference_cache:
+            _reference_cache_stats["reloads"] += 1
+        else:
+            _reference_cache_stats["misses"] += 1
+        _reference_version_counter += 1
+        _reference_cache[path] = (signature, _reference_version_counter, data)
+        _watched_reference_paths.add(path)
+        return _reference_version_counter
+
+
+def is_reference_in_memory(file_name: str) -> bool:
+    """Чи повертається файл довідкових даних з пам'яті без звернення до диска."""
+    path = os.path.abspath(file_name)
+    return path in _watched_reference_paths and path in _reference_cache
+
+
+def get_reference_cache_stats() -> Dict[str, int]:
+    """
+    Повертає лічильники кешу довідкових даних.
+
+    :returns: Словник з ключами 'hits', 'misses', 'reloads' та 'files'
+              (кількість файлів, що зараз знаходяться в кеші).
+    :rtype: dict
+    """
+    with _reference_cache_lock:
+        stats = dict(_reference_cache_stats)
+        stats["files"] = len(_reference_cache)
+    return stats
+
+
+def clear_reference_cache():
+    """Очищує кеш довідкових даних (наступне звернення до кожного файлу знову його розпарсить)."""
+    with _reference_cache_lock:
+        _reference_cache.clear()
+        _watched_reference_paths.clear()
@@ -0,0 +1,203 @@
+"""
+Модуль для попереднього рендерингу текстових відповідей Telegram-бота.
+
+Відповіді, що залежать лише від мови та вмісту файлів даних (розклад засідань,
+контакти інших установ), рендеряться одразу для всіх мов при (пере)завантаженні
+вихідного файлу й зберігаються в пам'яті. Обробники лише надсилають готові
+сторінки. Довгі тексти заздалегідь розбиваються на сторінки, що не
+перевищують ліміт довжини повідомлення Telegram.
+"""
+import logging
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+from for_test.reference_cache import load_reference_entry
+from for_test.utils import get_message_catalog, load_language_message, format_message
+
+# Створюємо логер для цього модуля
+logger = logging.getLogger(__name__)
+
+# Максимальна довжина тексту одного повідомлення Telegram (у кодових одиницях UTF-16)
+TELEGRAM_MESSAGE_LIMIT = 4096
+
+# --- Кеш відрендерених відповідей ---
+# Ключ - тип відповіді, значення - (версія файлу даних, каталог повідомлень, {мова: сторінки}).
+_rendered_cache: Dict[str, Tuple[int, Any, Dict[str, Tuple[str, ...]]]] = {}
+_rendered_cache_lock = threading.Lock()
+_render_stats: Dict[str, int] = {"hits": 0, "renders": 0}
+
+
+def _telegram_length(text: str) -> int:
+    """Повертає довжину тексту так, як її рахує Telegram (кодові одиниці UTF-16)."""
+    return len(text.encode("utf-16-le")) // 2
+
+
+def _split_long_line(line: str, limit: int) -> List[str]:
+    """Розбиває рядок, довший за ліміт, на частини не довші за ліміт."""
+    parts = []
+    start = 0
+    length = 0
+    for index, char in enumerate(line):
+        char_length = 2 if ord(char) > 0xFFFF else 1
+        if length + char_length > limit:
+            parts.append(line[start:index])
+            start, length = index, 0
+        length += char_length
+    parts.append(line[start:])
+    return parts
+
+
+def paginate_lines(lines: Iterable[str], limit: int = TELEGRAM_MESSAGE_LIMIT) -> Tuple[str, ...]:
+    """
+    Збирає рядки у сторінки, кожна з яких не перевищує ліміт довжини повідомлення.
+
+    Сторінки розриваються лише між рядками; рядок, довший за ліміт,
+    розбивається на частини примусово.
+
+    :param lines: Рядки тексту (без символів нового рядка).
+    :type lines: Iterable[str]
+    :param limit: Максимальна довжина сторінки.
+    :type limit: int
+    :returns: Кортеж сторінок.
+    :rtype: tuple[str, ...]
+    """
+    pages: List[str] = []
+    current: List[str] = []
+    current_length = 0
+    for line in lines:
+        for part in _split_long_line(line, limit) if _telegram_length(line) > limit else (line,):
+            part_length = _telegram_length(part)
+            # +1 - символ нового рядка між рядками сторінки
+            added = part_length + (1 if current else 0)
+            if current and current_length + added > limit:
+                pages.append("\n".join(current))
+                current, current_length = [], 0
+                added = part_length
+            current.append(part)
+            current_length += added
+    if current:
+        pages.append("\n".join(current))
+    return tuple(pages)
+
+
+def _render_court_schedule(lang: str, data: Any) -> Tuple[str, ...]:
+    if not data:
+        logger.info("No schedule data found. Rendering empty schedule for lang %s.", lang)
+        return (load_language_message(lang, 'no_schedule_available'),)
+    lines = [load_language_message(lang, 'court_schedule_title')]
+    lines.extend(
+        format_message(
+            lang, 'court_schedule_row',
+            date=item['date'], case=item['case'], time=item['time'], judge=item['judge']
+        )
+        for item in data
+    )
+    return paginate_lines(lines)
+
+
+def _render_contacts(lang: str, data: Any) -> Tuple[str, ...]:
+    entries = data.get(lang, [])
+    if not entries:
+        logger.info("No contacts data found. Rendering empty contacts for lang %s.", lang)
+        return (load_language_message(lang, 'no_contacts_available'),)
+    lines = [load_language_message(lang, 'other_contacts_title')]
+    lines.extend(f"📌 {contact['org']} — {contact['phone']}" for contact in entries)
+    return paginate_lines(lines)
+
+
+# Тип відповіді -> (файл даних, функція рендерингу)
+_RENDERERS: Dict[str, Tuple[str, Callable[[str, Any], Tuple[str, ...]]]] = {
+    "court_schedule": ("court_schedule.json", _render_court_schedule),
+    "contacts": ("contacts.json", _render_contacts),
+}
+
+
+def get_rendered_pages(kind: str, lang: str) -> Tuple[str, ...]:
+    """
+    Повертає готові сторінки відповіді заданого типу для мови.
+
+    Якщо файл даних або каталог повідомлень змінилися, відповідь рендериться
+    заново одразу для всіх мов каталогу.
+
+    :param kind: Тип відповіді ('court_schedule' або 'contacts').
+    :type kind: str
+    :param lang: Код мови ('uk' або 'en').
+    :type lang: str
+    :returns: Кортеж сторінок (щонайменше одна).
+    :rtype: tuple[str, ...]
+    :raises FileNotFoundError: Якщо файл даних не існує.
+    :raises json.JSONDecodeError: Якщо файл даних містить некоректний JSON.
+    """
+    file_name, renderer = _RENDERERS[kind]
+    version, data = load_reference_entry(file_name)
+    catalog = get_message_catalog()
+    with _rendered_cache_lock:
+        cached = _rendered_cache.get(kind)
+        if cached is not None and cached[0] == version and cached[1] is catalog:
+            pages = cached[2].get(lang)
+            if pages is not None:
+                _render_stats["hits"] += 1
+                return pages
+            rendered = dict(cached[2])
+        else:
+            rendered = {}
+
+    languages = (set(catalog.languages) - set(rendered)) | {lang}
+    for language in languages:
+        rendered[language] = renderer(language, data)
+    logger.debug("Rendered '%s' for languages %s (data version %s).", kind, sorted(languages), version)
+    with _rendered_cache_lock:
+        _rendered_cache[kind] = (version, catalog, rendered)
+        _render_stats["renders"] += len(languages)
+    return rendered[lang]
+
+
+def render_court_schedule(lang: str) -> Tuple[str, ...]:
+    """
+    Повертає готові сторінки розкладу судових засідань для мови.
+
+    :param lang: Код мови ('uk' або 'en').
+    :type lang: str
+    :returns: Кортеж сторінок розкладу.
+    :rtype: tuple[str, ...]
+    """
+    return get_rendered_pages("court_schedule", lang)
+
+
+def render_contacts(lang: str) -> Tuple[str, ...]:
+    """
+    Повертає готові сторінки контактів інших установ для мови.
+
+    :param lang: Код мови ('uk' або 'en').
+    :type lang: str
+    :returns: Кортеж сторінок контактів.
+    :rtype: tuple[str, ...]
+    """
+    return get_rendered_pages("contacts", lang)
+
+
+def prerender_responses():
+    """
+    Рендерить усі відповіді для всіх мов заздалегідь (наприклад, під час запуску бота).
+
+    Помилки завантаження файлів даних логуються й не зупиняють запуск:
+    обробники повідомлять про них користувачеві під час звернення.
+    """
+    default_lang = next(iter(sorted(get_message_catalog().languages)), "uk")
+    for kind in _RENDERERS:
+        try:
+            get_rendered_pages(kind, default_lang)
+        except Exception as e: # pylint: disable=broad-except
+            logger.error("ERR_RESP_001: Failed to pre-render '%s': %s", kind, e, exc_info=True)
+
+
+def get_render_stats() -> Dict[str, int]:
+    """
+    Повертає статистику кешу відрендерених відповідей.
+
+    :returns: Словник з ключами 'hits', 'renders' та 'cached'.
+    :rtype: dict
+    """
+    with _rendered_cache_lock:
+        stats = dict(_render_stats)
+        stats["cached"] = sum(len(entry[2]) for entry in _rendered_cache.values())
+    return stats
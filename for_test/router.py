@@ -0,0 +1,79 @@
+"""
+Модуль маршрутизації натискань кнопок головного меню Telegram-бота.
+
+Кнопки меню - це точні рядки, тому замість ланцюжка обробників
+``MessageHandler(filters.Regex(...))``, кожен з яких перевіряє текст
+по черзі, натискання маршрутизуються одним пошуком у словнику
+{текст кнопки: дія}. Словник будується з того самого
+:data:`for_test.keyboards.MAIN_MENU_LAYOUT`, що й клавіатура меню.
+Регулярні вирази лишаються лише для довільного тексту.
+"""
+import logging
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+from telegram import Update
+from telegram.ext import BaseHandler, filters
+from for_test.keyboards import get_main_menu_actions
+
+# Створюємо логер для цього модуля
+logger = logging.getLogger(__name__)
+
+# Точний текст кнопки -> (дія, код мови)
+_MENU_ACTIONS: Dict[str, Tuple[str, str]] = get_main_menu_actions()
+
+
+def resolve_menu_action(text: Optional[str]) -> Optional[Tuple[str, str]]:
+    """
+    Повертає дію та мову кнопки головного меню за її текстом.
+
+    :param text: Текст повідомлення.
+    :type text: str
+    :returns: Кортеж (дія, код мови) або None, якщо це не кнопка меню.
+    :rtype: tuple[str, str] | None
+    """
+    return _MENU_ACTIONS.get(text) if text else None
+
+
+class MenuButtonFilter(filters.MessageFilter):
+    """Фільтр повідомлень, текст яких точно збігається з кнопкою меню (із заданими діями)."""
+
+    def __init__(self, actions: Optional[Iterable[str]] = None):
+        self._actions = frozenset(actions) if actions is not None else None
+        super().__init__(name=f"MenuButtonFilter({sorted(self._actions) if self._actions else 'all'})")
+
+    def filter(self, message) -> bool:
+        route = resolve_menu_action(message.text)
+        return route is not None and (self._actions is None or route[0] in self._actions)
+
+
+class MenuRouter(BaseHandler[Update, Any, Any]):
+    """
+    Обробник, що передає натискання кнопки меню колбеку її дії.
+
+    Перевірка оновлення - один пошук у словнику за точним текстом повідомлення,
+    незалежно від кількості кнопок.
+
+    :param callbacks: Відповідність дії колбеку обробника.
+    :type callbacks: dict
+    """
+
+    def __init__(self, callbacks: Dict[str, Callable], block: bool = True):
+        super().__init__(self._dispatch, block=block)
+        self.callbacks = dict(callbacks)
+
+    def check_update(self, update: object) -> Optional[Tuple[str, str]]:
+        if not isinstance(update, Update) or update.message is None:
+            return None
+        route = resolve_menu_action(update.message.text)
+        if route is None or route[0] not in self.callbacks:
+            return None
+        return route
+
+    async def handle_update(self, update, application, check_result, context):
+        logger.debug("Menu button '%s' routed to action '%s'.", update.message.text, check_result[0])
+        return await self.callbacks[check_result[0]](update, context)
+
+    async def _dispatch(self, update, context):
+        route = self.check_update(update)
+        if route is not None:
+            return await self.callbacks[route[0]](update, context)
+        return None
@@ -0,0 +1,240 @@
+"""
+Модуль роботи Telegram-бота в кількох процесах-обробниках (шардах).
+
+Один вхідний процес (polling або вебхук, див. :mod:`for_test.bot`) лише
+отримує оновлення і розподіляє їх між ``BOT_WORKERS`` процесами за
+``effective_user.id``: усі оновлення одного користувача потрапляють в один
+процес і в одну чергу FIFO, тому їхній порядок зберігається. Кожен
+процес-обробник - повноцінний Application зі своїм циклом подій, тож
+обробники використовують усі ядра сервера.
+
+Спільні між процесами дані мають зберігатися в сховищах, безпечних для
+кількох процесів (SQLite: ``APPOINTMENTS_BACKEND=sqlite``,
+``LANGUAGES_BACKEND=sqlite``, ``CONVERSATIONS_DB``).
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+import queue
+import signal
+from typing import Callable, Dict, List, Optional
+from telegram import Update
+
+# Створюємо логер для цього модуля
+logger = logging.getLogger(__name__)
+
+# Кількість процесів-обробників (1 - звичайний режим в одному процесі)
+BOT_WORKERS = int(os.environ.get("BOT_WORKERS", "1"))
+# Максимальна кількість оновлень у черзі одного процесу-обробника
+SHARD_QUEUE_SIZE = int(os.environ.get("SHARD_QUEUE_SIZE", "1000"))
+# Префікс назви процесу-обробника; за ним визначаються номер шарда, лог-файл і порт метрик
+WORKER_PROCESS_PREFIX = "bot-worker-"
+# Скільки секунд чекати на завершення процесів-обробників під час зупинки
+_WORKER_STOP_TIMEOUT = 30.0
+# Як часто (секунди) процес-обробник перевіряє, чи його не зупиняють, поки черга порожня
+_POLL_INTERVAL = 0.5
+
+
+def shard_for_user(user_id: int, workers: int) -> int:
+    """
+    Повертає номер процесу-обробника для користувача.
+
+    :param user_id: ID користувача (або чату, якщо користувача в оновленні немає).
+    :type user_id: int
+    :param workers: Кількість процесів-обробників.
+    :type workers: int
+    :rtype: int
+    """
+    # hash() цілого числа не залежить від PYTHONHASHSEED, тому однаковий в усіх процесах
+    return hash(user_id) % workers
+
+
+def update_shard_key(update: Update) -> int:
+    """Повертає ключ розподілу оновлення: ID користувача, інакше ID чату, інакше 0."""
+    if update.effective_user is not None:
+        return update.effective_user.id
+    if update.effective_chat is not None:
+        return update.effective_chat.id
+    return 0
+
+
+def current_shard() -> Optional[int]:
+    """Повертає номер шарда поточного процесу-обробника або None у вхідному/звичайному процесі."""
+    name = multiprocessing.current_process().name
+    if name.startswith(WORKER_PROCESS_PREFIX):
+        return int(name[len(WORKER_PROCESS_PREFIX):])
+    return None
+
+
+def shard_log_file(log_file: str) -> str:
+    """
+    Повертає шлях до лог-файлу поточного процесу.
+
+    Процеси-обробники пишуть в окремі файли (``bot.worker-0.log`` тощо),
+    бо ротація одного файлу з кількох процесів небезпечна.
+
+    :param log_file: Шлях до лог-файлу вхідного процесу.
+    :type log_file: str
+    :rtype: str
+    """
+    shard = current_shard()
+    if shard is None:
+        return log_file
+    root, ext = os.path.splitext(log_file)
+    return f"{root}.worker-{shard}{ext}"
+
+
+def shard_port(port: int) -> int:
+    """Повертає порт локального ендпоінту поточного процесу: базовий + 1 + номер шарда (0 - вимкнено)."""
+    shard = current_shard()
+    if not port or shard is None:
+        return port
+    return port + 1 + shard
+
+
+class ShardedIngress:
+    """
+    Розподіл оновлень між процесами-обробниками.
+
+    :param workers: Кількість процесів-обробників.
+    :type workers: int
+    :param target: Функція процесу-обробника ``target(shard, update_queue, *args)``;
+                   має бути доступна для імпорту (процеси запускаються методом spawn).
+    :type target: Callable
+    :param args: Додаткові аргументи ``target``.
+    :type args: tuple
+    :param queue_size: Місткість черги одного процесу-обробника.
+    :type queue_size: int
+    """
+
+    def __init__(self, workers: int, target: Callable, args: tuple = (), queue_size: int = SHARD_QUEUE_SIZE):
+        self.workers = workers
+        self._target = target
+        self._args = args
+        self._context = multiprocessing.get_context("spawn")
+        self._queues = [self._context.Queue(maxsize=queue_size) for _ in range(workers)]
+        self._processes: List[Optional[multiprocessing.Process]] = [None] * workers
+        self._forwarded = [0] * workers
+        self._stats: Dict[str, int] = {"backpressure_waits": 0, "restarts": 0}
+
+    def start(self):
+        """Запускає всі процеси-обробники."""
+        for shard in range(self.workers):
+            self._spawn(shard)
+        logger.info("Started %d bot worker processes.", self.workers)
+
+    def _spawn(self, shard: int):
+        process = self._context.Process(
+            target=self._target, args=(shard, self._queues[shard], *self._args),
+            name=f"{WORKER_PROCESS_PREFIX}{shard}",
+        )
+        process.start()
+        self._processes[shard] = process
+
+    def submit(self, update: Update) -> int:
+        """
+        Передає оновлення процесу-обробнику його користувача.
+
+        Якщо черга процесу заповнена, виклик чекає на вільне місце (зворотний тиск
+        на отримання оновлень). Процес-обробник, що аварійно завершився, перезапускається.
+
+        :param update: Оновлення Telegram.
+        :type update: telegram.Update
+        :returns: Номер процесу-обробника.
+        :rtype: int
+        """
+        shard = shard_for_user(update_shard_key(update), self.workers)
+        process = self._processes[shard]
+        if process is not None and not process.is_alive():
+            logger.error(
+                "ERR_SHARD_001: Bot worker %d exited with code %s. Restarting it.", shard, process.exitcode
+            )
+            self._stats["restarts"] += 1
+            self._spawn(shard)
+        data = update.to_dict()
+        try:
+            self._queues[shard].put_nowait(data)
+        except queue.Full:
+            self._stats["backpressure_waits"] += 1
+            logger.warning("WARN_SHARD_001: Queue of bot worker %d is full. Waiting for free space.", shard)
+            self._queues[shard].put(data)
+        self._forwarded[shard] += 1
+        return shard
+
+    async def forward(self, update: Update, context): # pylint: disable=unused-argument
+        """Колбек TypeHandler вхідного Application: передає оновлення, не блокуючи цикл подій."""
+        await asyncio.get_running_loop().run_in_executor(None, self.submit, update)
+
+    def stop(self, timeout: float = _WORKER_STOP_TIMEOUT):
+        """Просить процеси-обробники завершитися після обробки черги і чекає на них."""
+        for shard, process in enumerate(self._processes):
+            if process is not None and process.is_alive():
+                self._queues[shard].put(None)
+        for shard, process in enumerate(self._processes):
+            if process is None:
+                continue
+            process.join(timeout)
+            if process.is_alive():
+                logger.error("ERR_SHARD_002: Bot worker %d did not stop in %.0f s. Terminating it.", shard, timeout)
+                process.terminate()
+                process.join()
+        logger.info("Bot worker processes stopped. Updates forwarded: %s.", self._forwarded)
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Повертає статистику розподілу.
+
+        :returns: Словник з ключами 'forwarded_<шард>', 'queued_<шард>', 'backpressure_waits' та 'restarts'.
+        :rtype: dict
+        """
+        stats = dict(self._stats)
+        for shard in range(self.workers):
+            stats[f"forwarded_{shard}"] = self._forwarded[shard]
+            try:
+                stats[f"queued_{shard}"] = self._queues[shard].qsize()
+            except NotImplementedError: # macOS
+                pass
+        return stats
+
+
+async def serve_worker(application, update_queue):
+    """
+    Обробляє оновлення з черги процесу-обробника, доки вхідний процес не надішле None.
+
+    Повторює життєвий цикл ``Application.run_polling`` (post_init, start, stop,
+    post_stop, shutdown, post_shutdown), але оновлення бере з черги, а не з Bot API.
+    SIGINT/SIGTERM (наприклад, від systemd разом із вхідним процесом) також
+    зупиняють процес після обробки вже отриманих оновлень.
+
+    :param application: Application з зареєстрованими обробниками (без Updater).
+    :type application: telegram.ext.Application
+    :param update_queue: Черга словників оновлень від :class:`ShardedIngress`.
+    :type update_queue: multiprocessing.Queue
+    """
+    loop = asyncio.get_running_loop()
+    stopping = asyncio.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stopping.set)
+
+    await application.initialize()
+    if application.post_init:
+        await application.post_init(application)
+    await application.start()
+    try:
+        while not stopping.is_set():
+            try:
+                data = await loop.run_in_executor(None, update_queue.get, True, _POLL_INTERVAL)
+            except queue.Empty:
+                continue
+            if data is None:
+                break
+            await application.update_queue.put(Update.de_json(data, application.bot))
+    finally:
+        # Application.stop обробляє оновлення, що вже є в його черзі
+        await application.stop()
+        if application.post_stop:
+            await application.post_stop(application)
+        await application.shutdown()
+        if application.post_shutdown:
+            await application.post_shutdown(application)
@@ -0,0 +1,581 @@
+"""
+Модуль сховищ даних Telegram-бота.
+
+Містить основу постійних сховищ (атомарний запис JSON, журнал змін,
+відкладений запис) та сховища мовних налаштувань користувачів, які
+записують на диск лише зміни, замість повного перезапису JSON-файлів при
+кожному зверненні. JSON-сховища працюють з відкладеним записом: зміни
+одразу потрапляють у журнал, а файли перезаписуються атомарно і пакетно
+у фоновому потоці. Сховища записів на консультацію - у
+:mod:`for_test.appointments`, станів діалогів - у :mod:`for_test.persistence`.
+"""
+import abc
+import atexit
+import json
+import logging
+import os
+import sqlite3
+import threading
+import weakref
+from typing import Dict, List, Optional
+
+# Створюємо логер для цього модуля
+logger = logging.getLogger(__name__)
+
+# Файли сховища мовних налаштувань
+LEGACY_LANGUAGES_FILE = "languages.json"
+LANGUAGES_SNAPSHOT_FILE = "user_languages.json"
+LANGUAGES_JOURNAL_FILE = "user_languages.journal"
+# Після скількох записів у журналі запускається фонове ущільнення
+LANGUAGES_COMPACT_THRESHOLD = int(os.environ.get("LANGUAGES_COMPACT_THRESHOLD", "1000"))
+# Сховище мовних налаштувань: 'json' (знімок і журнал, за замовчуванням) або 'sqlite'
+# (обов'язково для кількох процесів-обробників, див. for_test.sharding)
+LANGUAGES_BACKEND = os.environ.get("LANGUAGES_BACKEND", "json").lower()
+LANGUAGES_DB_FILE = os.environ.get("LANGUAGES_DB", "user_languages.db")
+
+# Затримка (вікно об'єднання змін) перед відкладеним записом на диск
+WRITE_BEHIND_DELAY = float(os.environ.get("WRITE_BEHIND_DELAY_MS", "200")) / 1000
+
+# Усі сховища з відкладеним записом, які треба скинути на диск під час зупинки
+_write_behind_stores = weakref.WeakSet()
+
+
+def atomic_write_json(path: str, data, **dump_kwargs):
+    """Атомарно та надійно записує JSON-файл.
+
+    Дані записуються у тимчасовий файл, який синхронізується з диском (fsync)
+    і лише потім атомарно підміняє основний файл. Тому збій під час запису
+    ніколи не залишає пошкоджений або напівзаписаний файл.
+
+    :param path: Шлях до файлу.
+    :type path: str
+    :param data: Дані для серіалізації в JSON.
+    :param dump_kwargs: Додаткові параметри для :func:`json.dump`.
+    :raises OSError: Якщо запис не вдався.
+    """
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as file_handle:
+        json.dump(data, file_handle, ensure_ascii=False, **dump_kwargs)
+        file_handle.flush()
+        os.fsync(file_handle.fileno())
+    os.replace(tmp_path, path)
+    # Синхронізуємо каталог, щоб саме перейменування теж пережило збій живлення
+    if hasattr(os, "O_DIRECTORY"):
+        dir_fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+class AppendJournal:
+    """Журнал змін у форматі JSON Lines, до якого лише дописуються рядки.
+
+    Кожен запис одразу передається операційній системі (переживає аварійне
+    завершення процесу), а синхронізація з диском (fsync) виконується
+    пакетно методом :meth:`sync`. Клас не є потокобезпечним - блокування
+    забезпечує сховище, яке ним володіє.
+
+    :param path: Шлях до файлу журналу.
+    :type path: str
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.rotated_path = path + ".old"
+        self.entries = 0
+        self._handle = None
+        self._unsynced = False
+
+    def append(self, entry: dict):
+        """Дописує запис у журнал.
+
+        :raises OSError: Якщо запис не вдався.
+        """
+        if self._handle is None:
+            self._handle = open(self.path, "a", encoding="utf-8")  # pylint: disable=consider-using-with
+        self._handle.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._handle.flush()
+        self.entries += 1
+        self._unsynced = True
+
+    def sync(self):
+        """Синхронізує з диском усі записи, дописані після попередньої синхронізації."""
+        if self._handle is not None and self._unsynced:
+            os.fsync(self._handle.fileno())
+        self._unsynced = False
+
+    def replay(self, path: Optional[str] = None) -> List[dict]:
+        """Читає записи журналу.
+
+        Пошкоджені рядки (наприклад, недописаний останній рядок після збою) пропускаються.
+
+        :param path: Шлях до файлу журналу (за замовчуванням - поточний журнал).
+        :type path: str
+        :returns: Список записів.
+        :rtype: list[dict]
+        """
+        path = path or self.path
+        entries = []
+        try:
+            with open(path, "r", encoding="utf-8") as file_handle:
+                for line in file_handle:
+                    try:
+                        entries.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        logger.warning("WARN_STORE_002: Skipping corrupted line in %s.", path)
+        except FileNotFoundError:
+            pass
+        return entries
+
+    def rotate(self) -> bool:
+        """Перейменовує поточний журнал на `<path>.old` і починає новий.
+
+        Якщо попередній `.old` ще не видалено (знімок після попередньої ротації
+        не було записано), ротація не виконується, щоб не втратити його записи.
+
+        :returns: True, якщо журнал було ротовано.
+        :rtype: bool
+        """
+        self.sync()
+        self.close()
+        if os.path.exists(self.rotated_path) or not os.path.exists(self.path):
+            return False
+        os.replace(self.path, self.rotated_path)
+        self.entries = 0
+        return True
+
+    def discard_rotated(self):
+        """Видаляє ротований журнал, записи якого вже потрапили до знімка."""
+        if os.path.exists(self.rotated_path):
+            os.remove(self.rotated_path)
+
+    def close(self):
+        """Закриває файл журналу."""
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+
+class WriteBehindStore(abc.ABC):
+    """Базовий клас сховища з відкладеним (write-behind) записом на диск.
+
+    Зміни застосовуються в пам'яті одразу, а запис на диск виконується
+    у фоновому потоці не частіше ніж раз на `flush_delay` секунд, тому
+    серія змін за цей час об'єднується в одну операцію запису.
+    Підкласи реалізують :meth:`flush` і викликають :meth:`_schedule_flush`
+    після кожної зміни.
+
+    :param flush_delay: Вікно об'єднання змін (секунди).
+    :type flush_delay: float
+    """
+
+    def __init__(self, flush_delay: float = WRITE_BEHIND_DELAY):
+        self.flush_delay = flush_delay
+        self._flush_timer: Optional[threading.Timer] = None
+        self._timer_lock = threading.Lock()
+        _write_behind_stores.add(self)
+
+    def _schedule_flush(self):
+        """Планує відкладений запис, якщо його ще не заплановано."""
+        with self._timer_lock:
+            if self._flush_timer is None:
+                self._flush_timer = threading.Timer(self.flush_delay, self._flush_from_timer)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+
+    def _flush_from_timer(self):
+        with self._timer_lock:
+            self._flush_timer = None
+        try:
+            self.flush()
+        except OSError as e:
+            logger.error(
+                "ERR_STORE_004: Write-behind flush failed for %s. Error: %s", type(self).__name__, e,
+                exc_info=True
+            )
+            # Зміни залишилися в пам'яті та в журналі - повторимо спробу пізніше
+            self._schedule_flush()
+
+    @abc.abstractmethod
+    def flush(self):
+        """Записує на диск усі зміни, накопичені в пам'яті."""
+
+    def close(self):
+        """Скасовує відкладений запис і синхронно записує всі зміни."""
+        with self._timer_lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+        self.flush()
+
+
+def flush_all_stores():
+    """Синхронно записує на диск зміни всіх сховищ з відкладеним записом.
+
+    Викликається під час зупинки бота, щоб жодна зміна не залишилася лише в пам'яті.
+    """
+    for store in list(_write_behind_stores):
+        try:
+            store.close()
+        except OSError as e:
+            logger.error(
+                "ERR_STORE_005: Failed to flush %s on shutdown. Error: %s", type(store).__name__, e,
+                exc_info=True
+            )
+
+
+atexit.register(flush_all_stores)
+
+
+class UserLanguageStore(WriteBehindStore):
+    """Постійне сховище мовних налаштувань користувачів.
+
+    Усі налаштування тримаються у словнику в пам'яті, тому пошук мови
+    користувача виконується за O(1) без звернення до диска. Кожна зміна
+    одразу дописується одним рядком у журнал (append-only), а синхронізація
+    журналу з диском виконується пакетно у фоні (див. :class:`WriteBehindStore`).
+    Коли журнал виростає понад поріг, під час фонового запису створюється
+    новий знімок (snapshot), а журнал обнуляється.
+
+    Під час першого завантаження, якщо знімка ще немає, виконується
+    одноразова міграція зі старого файлу `languages.json`; журнал змін
+    застосовується поверх перенесених даних.
+
+    :param snapshot_path: Шлях до файлу знімка.
+    :type snapshot_path: str
+    :param journal_path: Шлях до файлу журналу змін.
+    :type journal_path: str
+    :param legacy_path: Шлях до старого файлу languages.json для міграції.
+    :type legacy_path: str
+    :param compact_threshold: Кількість записів у журналі, після якої запускається ущільнення.
+    :type compact_threshold: int
+    :param flush_delay: Вікно об'єднання змін перед записом на диск (секунди).
+    :type flush_delay: float
+    """
+
+    def __init__(self, snapshot_path: str = LANGUAGES_SNAPSHOT_FILE,
+                 journal_path: str = LANGUAGES_JOURNAL_FILE,
+                 legacy_path: str = LEGACY_LANGUAGES_FILE,
+                 compact_threshold: int = LANGUAGES_COMPACT_THRESHOLD,
+                 flush_delay: float = WRITE_BEHIND_DELAY):
+        super().__init__(flush_delay)
+        self.snapshot_path = snapshot_path
+        self.legacy_path = legacy_path
+        self.compact_threshold = compact_threshold
+        self._languages: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._journal = AppendJournal(journal_path)
+
+    # --- Завантаження ---
+
+    def _ensure_loaded(self):
+        """Завантажує знімок та журнал у пам'ять при першому зверненні."""
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            # Ознака завершеної міграції - наявність знімка, а не журналу: якщо запис знімка
+            # під час міграції не вдався, журнал уже міг з'явитися, але дані старого файлу в ньому немає
+            if not os.path.exists(self.snapshot_path) and os.path.exists(self.legacy_path):
+                self._migrate_legacy_file()
+            else:
+                self._languages = self._read_snapshot(self.snapshot_path)
+            # Журнал попереднього ущільнення, яке могло не завершитися
+            self._apply_journal(self._journal.replay(self._journal.rotated_path))
+            self._journal.entries = self._apply_journal(self._journal.replay())
+            self._loaded = True
+            logger.info(
+                "User language store loaded: %s users, "
+                "%s journal entries.", len(self._languages), self._journal.entries
+            )
+
+    @staticmethod
+    def _read_snapshot(path: str) -> Dict[str, str]:
+        """Читає файл знімка. Повертає порожній словник, якщо файлу немає або він пошкоджений."""
+        try:
+            with open(path, "r", encoding="utf-8") as file_handle:
+                data = json.load(file_handle)
+            if isinstance(data, dict):
+                return {str(user_id): lang for user_id, lang in data.items()}
+            logger.warning("WARN_STORE_001: %s has unexpected format. Ignoring it.", path)
+        except FileNotFoundError:
+            pass
+        except json.JSONDecodeError as e:
+            logger.warning("WARN_STORE_001: %s is corrupted. Ignoring it. Error: %s", path, e)
+        return {}
+
+    def _apply_journal(self, entries: List[dict]) -> int:
+        """Застосовує записи журналу до словника в пам'яті.
+
+        :returns: Кількість застосованих записів.
+        :rtype: int
+        """
+        applied = 0
+        for entry in entries:
+            try:
+                self._languages[str(entry["u"])] = entry["l"]
+                applied += 1
+            except (KeyError, TypeError):
+                logger.warning("WARN_STORE_002: Skipping malformed journal entry: %r", entry)
+        return applied
+
+    def _migrate_legacy_file(self):
+        """Одноразова міграція зі старого файлу languages.json у новий формат сховища."""
+        self._languages = self._read_snapshot(self.legacy_path)
+        try:
+            atomic_write_json(self.snapshot_path, dict(self._languages), separators=(",", ":"))
+        except OSError as e:
+            # Дані вже в пам'яті; поки знімка немає, міграцію буде повторено при наступному запуску
+            logger.error(
+                "ERR_STORE_002: Failed to write %s during migration. Error: %s",
+                self.snapshot_path, e,
+                exc_info=True
+            )
+            return
+        logger.info(
+            "Migrated %s user languages from %s "
+            "to %s.", len(self._languages), self.legacy_path, self.snapshot_path
+        )
+
+    # --- Публічний API ---
+
+    def get(self, user_id: int, default: str = "uk") -> str:
+        """Повертає мову користувача з пам'яті.
+
+        :param user_id: Унікальний ідентифікатор користувача Telegram.
+        :type user_id: int
+        :param default: Мова за замовчуванням, якщо користувач її ще не обирав.
+        :type default: str
+        :returns: Код мови.
+        :rtype: str
+        """
+        self._ensure_loaded()
+        return self._languages.get(str(user_id), default)
+
+    def set(self, user_id: int, lang: str):
+        """Зберігає мову користувача: оновлює пам'ять та дописує один рядок у журнал.
+
+        Синхронізація журналу з диском виконується у фоні.
+
+        :param user_id: Унікальний ідентифікатор користувача Telegram.
+        :type user_id: int
+        :param lang: Код мови.
+        :type lang: str
+        :raises OSError: Якщо не вдалося дописати журнал.
+        """
+        self._ensure_loaded()
+        key = str(user_id)
+        with self._lock:
+            if self._languages.get(key) == lang:
+                return
+            self._languages[key] = lang
+            self._journal.append({"u": key, "l": lang})
+        self._schedule_flush()
+
+    def __len__(self) -> int:
+        self._ensure_loaded()
+        return len(self._languages)
+
+    def as_dict(self) -> Dict[str, str]:
+        """Повертає копію всіх налаштувань {user_id: мова} (наприклад, для перенесення в інше сховище)."""
+        self._ensure_loaded()
+        with self._lock:
+            return dict(self._languages)
+
+    @property
+    def is_loaded(self) -> bool:
+        """True, якщо дані вже завантажені в пам'ять і звернення не читатиме диск."""
+        return self._loaded
+
+    # --- Запис на диск та ущільнення ---
+
+    def flush(self):
+        """Синхронізує журнал з диском і, якщо він завеликий, ущільнює сховище."""
+        if not self._loaded:
+            return
+        with self._lock:
+            self._journal.sync()
+            needs_compaction = self._journal.entries >= self.compact_threshold
+        if needs_compaction:
+            self.compact()
+
+    def compact(self):
+        """Записує новий знімок зі стану в пам'яті та обнуляє журнал.
+
+        Під блокуванням лише знімається копія словника та ротується журнал,
+        тому запис знімка на диск не затримує виклики :meth:`set`.
+        """
+        self._ensure_loaded()
+        with self._lock:
+            languages = dict(self._languages)
+            self._journal.rotate()
+        try:
+            atomic_write_json(self.snapshot_path, languages, separators=(",", ":"))
+            self._journal.discard_rotated()
+            logger.info("User language store compacted: %s users.", len(languages))
+        except OSError as e:
+            logger.error("ERR_STORE_001: Failed to compact user language store. Error: %s", e, exc_info=True)
+
+    def close(self):
+        """Записує всі зміни на диск і закриває файл журналу (наприклад, під час зупинки бота)."""
+        super().close()
+        with self._lock:
+            self._journal.close()
+
+
+class SqliteUserLanguageStore(WriteBehindStore):
+    """Сховище мовних налаштувань користувачів на основі SQLite у режимі WAL.
+
+    Безпечне для кількох процесів, що працюють з однією базою: кожна зміна -
+    окремий рядок, а не перезапис спільного файлу. Як і :class:`UserLanguageStore`,
+    тримає налаштування в пам'яті (база читається один раз) і записує зміни
+    пакетно у фоновому потоці. Кеш у пам'яті актуальний, доки мову кожного
+    користувача змінює лише один процес - саме так розподіляє оновлення
+    :mod:`for_test.sharding`.
+
+    :param path: Шлях до файлу бази даних.
+    :type path: str
+    :param flush_delay: Вікно об'єднання змін перед записом на диск (секунди).
+    :type flush_delay: float
+    """
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS user_languages (
+            user_id TEXT PRIMARY KEY,
+            lang TEXT NOT NULL
+        );
+    """
+
+    def __init__(self, path: str = LANGUAGES_DB_FILE, flush_delay: float = WRITE_BEHIND_DELAY):
+        super().__init__(flush_delay)
+        self.path = path
+        self._languages: Dict[str, str] = {}
+        self._pending: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._loaded = False
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute("PRAGMA busy_timeout=5000")
+        self._connection.executescript(self._SCHEMA)
+
+    def _ensure_loaded(self):
+        """Читає всі налаштування з бази при першому зверненні."""
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            with self._db_lock:
+                rows = self._connection.execute("SELECT user_id, lang FROM user_languages").fetchall()
+            self._languages = dict(rows)
+            self._loaded = True
+            logger.info("User language store loaded from %s: %s users.", self.path, len(self._languages))
+
+    def import_languages(self, languages: Dict[str, str]):
+        """Записує налаштування з іншого сховища (наприклад, з JSON-знімка), не перезаписуючи наявні."""
+        with self._db_lock:
+            self._connection.execute("BEGIN")
+            try:
+                self._connection.executemany(
+                    "INSERT OR IGNORE INTO user_languages (user_id, lang) VALUES (?, ?)", list(languages.items())
+                )
+                self._connection.execute("COMMIT")
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+        with self._lock:
+            self._loaded = False
+
+    def get(self, user_id: int, default: str = "uk") -> str:
+        """Повертає мову користувача з пам'яті (див. :meth:`UserLanguageStore.get`)."""
+        self._ensure_loaded()
+        return self._languages.get(str(user_id), default)
+
+    def set(self, user_id: int, lang: str):
+        """Зберігає мову користувача в пам'яті та планує її запис у базу."""
+        self._ensure_loaded()
+        key = str(user_id)
+        with self._lock:
+            if self._languages.get(key) == lang:
+                return
+            self._languages[key] = lang
+            self._pending[key] = lang
+        self._schedule_flush()
+
+    def __len__(self) -> int:
+        self._ensure_loaded()
+        return len(self._languages)
+
+    @property
+    def is_loaded(self) -> bool:
+        """True, якщо дані вже завантажені в пам'ять і звернення не читатиме диск."""
+        return self._loaded
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return
+        try:
+            with self._db_lock:
+                self._connection.execute("BEGIN")
+                try:
+                    self._connection.executemany(
+                        "INSERT OR REPLACE INTO user_languages (user_id, lang) VALUES (?, ?)", list(pending.items())
+                    )
+                    self._connection.execute("COMMIT")
+                except BaseException:
+                    self._connection.execute("ROLLBACK")
+                    raise
+        except sqlite3.Error as e:
+            with self._lock:
+                self._pending = {**pending, **self._pending}
+            raise OSError(f"Failed to write user languages to {self.path}: {e}") from e
+
+    def close(self):
+        super().close()
+        with self._db_lock:
+            self._connection.close()
+
+
+def create_language_store(backend: str = LANGUAGES_BACKEND):
+    """Створює сховище мовних налаштувань відповідно до налаштувань.
+
+    Для SQLite, якщо база даних створюється вперше, а поруч лежать знімок
+    і журнал JSON-сховища (або старий languages.json), налаштування з них
+    переносяться автоматично.
+
+    :param backend: 'json' або 'sqlite'.
+    :type backend: str
+    :returns: Сховище мовних налаштувань.
+    :rtype: UserLanguageStore | SqliteUserLanguageStore
+    """
+    if backend != "sqlite":
+        if backend != "json":
+            logger.warning("WARN_STORE_008: Unknown LANGUAGES_BACKEND '%s'. Using json.", backend)
+        return UserLanguageStore()
+
+    is_new_database = not os.path.exists(LANGUAGES_DB_FILE)
+    store = SqliteUserLanguageStore(LANGUAGES_DB_FILE)
+    logger.info("Using SQLite user language storage: %s.", LANGUAGES_DB_FILE)
+    if is_new_database and any(
+        os.path.exists(path) for path in (LANGUAGES_SNAPSHOT_FILE, LANGUAGES_JOURNAL_FILE, LEGACY_LANGUAGES_FILE)
+    ):
+        json_store = UserLanguageStore()
+        try:
+            languages = json_store.as_dict()
+            store.import_languages(languages)
+            logger.info("Imported %s user languages into %s.", len(languages), LANGUAGES_DB_FILE)
+        except (OSError, sqlite3.Error) as e:
+            logger.error(
+                "ERR_STORE_007: Failed to import user languages into %s. Error: %s", LANGUAGES_DB_FILE, e,
+                exc_info=True
+            )
+        finally:
+            json_store.close()
+    return store
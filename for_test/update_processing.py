@@ -0,0 +1,152 @@
+"""
+Модуль паралельної обробки оновлень Telegram-бота зі збереженням порядку в кожному чаті.
+
+python-telegram-bot за замовчуванням обробляє оновлення по одному, тому
+повільний обробник (запис у сховище, мережевий виклик) затримує всіх
+користувачів. :class:`PerChatUpdateProcessor` обробляє до
+``UPDATE_CONCURRENCY`` оновлень одночасно, але оновлення одного чату - лише
+по черзі й у порядку надходження, тож діалог запису на консультацію
+(ConversationHandler) бачить кроки користувача в правильному порядку.
+ConversationHandler розрізняє діалоги за парою (чат, користувач), тож
+послідовна обробка в межах чату охоплює кожен його діалог.
+
+:class:`AdmissionQueue` обмежує кількість прийнятих, але ще не оброблених
+оновлень (``UPDATE_QUEUE_LIMIT``): коли ліміт вичерпано, отримання нових
+оновлень (polling, вебхук, черга процесу-обробника) чекає на вільне місце.
+"""
+import asyncio
+import logging
+import os
+from typing import Any, Awaitable, Dict, Optional
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+
+# Створюємо логер для цього модуля
+logger = logging.getLogger(__name__)
+
+# Скільки оновлень (різних чатів) обробляються одночасно (1 - по одному, як раніше)
+UPDATE_CONCURRENCY = int(os.environ.get("UPDATE_CONCURRENCY", "16"))
+# Скільки оновлень можна прийняти до завершення їхньої обробки; далі отримання оновлень чекає
+UPDATE_QUEUE_LIMIT = int(os.environ.get("UPDATE_QUEUE_LIMIT", "256"))
+
+
+class AdmissionQueue(asyncio.Queue):
+    """
+    Черга оновлень Application із зворотним тиском.
+
+    :meth:`put` чекає, доки кількість прийнятих і ще не оброблених оновлень
+    (від :meth:`put` до :meth:`task_done`, який викликає Application після обробки)
+    не стане меншою за `limit`.
+
+    :param limit: Максимальна кількість оновлень у черзі та в обробці.
+    :type limit: int
+    """
+
+    def __init__(self, limit: int = UPDATE_QUEUE_LIMIT):
+        super().__init__()
+        self.limit = limit
+        self._admission = asyncio.Semaphore(limit)
+        self._stats: Dict[str, int] = {"admitted": 0, "waited": 0}
+
+    async def put(self, item):
+        if self._admission.locked():
+            self._stats["waited"] += 1
+            logger.debug("Update queue is full (%d updates). Waiting for free space.", self.limit)
+        await self._admission.acquire()
+        self._stats["admitted"] += 1
+        await super().put(item)
+
+    def task_done(self):
+        super().task_done()
+        self._admission.release()
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Повертає статистику черги.
+
+        :returns: Словник з ключами 'admitted', 'waited' (скільки разів отримання оновлення чекало
+                  на вільне місце) та 'in_flight' (прийняті, ще не оброблені оновлення).
+        :rtype: dict
+        """
+        stats = dict(self._stats)
+        stats["in_flight"] = self.limit - self._admission._value # pylint: disable=protected-access
+        return stats
+
+
+def _ordering_key(update: object) -> Optional[int]:
+    """Повертає чат, у межах якого треба зберегти порядок оновлень (None - порядок не важливий)."""
+    if not isinstance(update, Update):
+        return None
+    if update.effective_chat is not None:
+        return update.effective_chat.id
+    if update.effective_user is not None:
+        return update.effective_user.id
+    return None
+
+
+class PerChatUpdateProcessor(BaseUpdateProcessor):
+    """
+    Паралельна обробка оновлень різних чатів, послідовна - в межах одного чату.
+
+    Оновлення спершу займає чергу свого чату (блокування чату, FIFO), а вже
+    потім - одне з `concurrency` місць обробки. Тому кілька оновлень одного чату
+    не займають місця обробки, поки чекають на свою чергу.
+
+    :param concurrency: Максимальна кількість оновлень, що обробляються одночасно.
+    :type concurrency: int
+    :param limit: Максимальна кількість прийнятих оновлень (має збігатися з лімітом
+                  :class:`AdmissionQueue`).
+    :type limit: int
+    """
+
+    def __init__(self, concurrency: int = UPDATE_CONCURRENCY, limit: int = UPDATE_QUEUE_LIMIT):
+        # Семафор BaseUpdateProcessor обмежує прийняті оновлення, власний - ті, що обробляються
+        super().__init__(max(limit, concurrency, 2))
+        self.concurrency = concurrency
+        self._running = asyncio.Semaphore(concurrency)
+        # чат -> (блокування, кількість оновлень цього чату, що чекають або обробляються)
+        self._chat_locks: Dict[int, list] = {}
+        self._stats: Dict[str, int] = {"processed": 0, "chat_waits": 0}
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
+
+    async def do_process_update(self, update: object, coroutine: Awaitable[Any]) -> None:
+        key = _ordering_key(update)
+        if key is None:
+            async with self._running:
+                await coroutine
+            self._stats["processed"] += 1
+            return
+
+        entry = self._chat_locks.get(key)
+        if entry is None:
+            entry = self._chat_locks[key] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        try:
+            if entry[0].locked():
+                self._stats["chat_waits"] += 1
+            async with entry[0]:
+                async with self._running:
+                    await coroutine
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                del self._chat_locks[key]
+        self._stats["processed"] += 1
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Повертає статистику обробки.
+
+        :returns: Словник з ключами 'processed', 'chat_waits' (оновлення, що чекали на попереднє
+                  оновлення свого чату), 'running' та 'active_chats'.
+        :rtype: dict
+        """
+        stats = dict(self._stats)
+        stats["running"] = self.concurrency - self._running._value # pylint: disable=protected-access
+        stats["active_chats"] = len(self._chat_locks)
+        return stats
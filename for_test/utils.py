@@ -3,110 +3,188 @@
 
 Містить допоміжні функції для роботи з файлами JSON (зберігання та читання даних),
 генерації дат і часу, перевірки прав адміністратора та управління мовними налаштуваннями.
+Для обробників бота функції доступу до даних мають асинхронні відповідники
+(з суфіксом `_async`), які виконують блокуюче введення-виведення в окремому
+пулі потоків, не зупиняючи цикл подій asyncio.
 """
+import asyncio
+import contextvars
+import functools
 import json
 import logging
 import os
+import sqlite3
+import string
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Dict, Any, Union
+from time import perf_counter
+from types import MappingProxyType
+from typing import Callable, Dict, Any, FrozenSet, Mapping, NamedTuple, Optional, Tuple, Union
+from for_test.admins import AdminRegistry
+from for_test.faq_search import FaqIndex, FaqMatch
+from for_test.metrics import timed_storage_call
+from for_test.appointments import (
+    AppointmentRepository, SlotAvailabilityIndex, create_appointment_repository,
+    SLOT_CAPACITY_PER_DATE, SLOT_CAPACITY_PER_HOUR
+)
+from for_test.reference_cache import (
+    install_reference_data, is_reference_in_memory, load_reference_data, load_reference_entry
+)
+from for_test.storage import create_language_store
 
 # Створюємо логер для цього модуля
 logger = logging.getLogger(__name__)
 
 # --- Локалізація повідомлень ---
-_messages_data: Dict[str, Dict[str, str]] = {}
 MESSAGES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'messages.json')
+# Мова, до якої відбувається відкат, якщо повідомлення для обраної мови немає
+FALLBACK_MESSAGE_LANGUAGE = 'en'
+
+# Ключі, без яких бот не може відповісти користувачу чи адміністратору; вони мають
+# бути в мові відкату, яка є еталонним набором ключів messages.json
+REQUIRED_MESSAGE_KEYS = ("generic_user_error", "admin_appointments_button", "page_prev", "page_next")
+# Мінімальні повідомлення на випадок, якщо messages.json недоступний
+_EMERGENCY_MESSAGES: Dict[str, Dict[str, str]] = {
+    "uk": {"generic_user_error": "Вибачте, сталася неочікувана помилка. Будь ласка, спробуйте пізніше."},
+    "en": {"generic_user_error": "Sorry, an unexpected error occurred. Please try again later."},
+}
+
+
+class MessageCatalog(NamedTuple):
+    """Скомпільований незмінний каталог локалізованих повідомлень.
+
+    :ivar entries: Повідомлення за ключем (мова, ключ) з уже розв'язаним відкатом мови.
+    :ivar fields: Імена параметрів шаблону за ключем (мова, ключ) - лише для шаблонів з параметрами.
+    :ivar languages: Мови, наявні в каталозі.
+    """
+    entries: Mapping[Tuple[str, str], str]
+    fields: Mapping[Tuple[str, str], Tuple[str, ...]]
+    languages: FrozenSet[str]
+
+
+def compile_message_catalog(data: Dict[str, Dict[str, str]]) -> MessageCatalog:
+    """
+    Компілює словник повідомлень у плоский незмінний каталог.
+
+    Для кожної мови та кожного ключа messages.json заздалегідь визначається
+    текст: спершу з цієї мови, потім з мови відкату, потім з будь-якої іншої
+    мови, де ключ є. Еталонним набором ключів є мова відкату: ключі, яких у ній
+    немає, та відсутні :data:`REQUIRED_MESSAGE_KEYS` логуються. Усі пропуски
+    логуються один раз під час компіляції, а не при кожному запиті. Шаблони
+    з параметрами (наприклад, ``{date}``) розбираються заздалегідь.
+
+    :param data: Словник повідомлень у форматі messages.json.
+    :type data: dict
+    :returns: Скомпільований каталог.
+    :rtype: MessageCatalog
+    """
+    languages = set(data)
+    reference = data.get(FALLBACK_MESSAGE_LANGUAGE, {})
+    for key in REQUIRED_MESSAGE_KEYS:
+        if key not in reference:
+            logger.error(
+                "ERR_UTIL_017: Required message key '%s' is missing for fallback language '%s'.",
+                key, FALLBACK_MESSAGE_LANGUAGE
+            )
+    keys = set(reference)
+    for lang in sorted(languages):
+        for key in data[lang].keys() - keys:
+            logger.warning(
+                "WARN_UTIL_009: Message key '%s' (%s) is missing for fallback language '%s'.",
+                key, lang, FALLBACK_MESSAGE_LANGUAGE
+            )
+            keys.add(key)
+    # Порядок відкату: мова відкату, далі решта мов у сталому порядку
+    fallback_order = [FALLBACK_MESSAGE_LANGUAGE] + sorted(languages - {FALLBACK_MESSAGE_LANGUAGE})
+
+    formatter = string.Formatter()
+    entries: Dict[Tuple[str, str], str] = {}
+    fields: Dict[Tuple[str, str], Tuple[str, ...]] = {}
+    for lang in languages:
+        own = data.get(lang, {})
+        for key in keys:
+            message = own.get(key)
+            if message is None:
+                message = next(
+                    (data[other][key] for other in fallback_order if key in data.get(other, {})), None
+                )
+                logger.warning(
+                    "WARN_UTIL_008: Message key '%s' is missing for language '%s'. "
+                    "Using fallback text.", key, lang
+                )
+            if message is None:
+                message = own.get('generic_user_error', "Error: message not found.")
+            entries[(lang, key)] = message
+            try:
+                names = tuple(name for _, name, _, _ in formatter.parse(message) if name)
+            except ValueError as e:
+                logger.error("ERR_UTIL_015: Invalid template for message '%s' (%s): %s", key, lang, e)
+                names = ()
+            if names:
+                fields[(lang, key)] = names
+    return MessageCatalog(MappingProxyType(entries), MappingProxyType(fields), frozenset(languages))
+
+
+_message_catalog = MessageCatalog(MappingProxyType({}), MappingProxyType({}), frozenset())
+# Ключі та мови, про відсутність яких уже повідомлено в лозі (щоб не засмічувати лог)
+_reported_missing_messages: set = set()
+
 
 def _load_messages():
-    """Внутрішня функція для завантаження локалізованих повідомлень."""
-    global _messages_data # pylint: disable=global-statement
+    """Внутрішня функція для завантаження та компіляції локалізованих повідомлень."""
+    global _message_catalog # pylint: disable=global-statement
     try:
         with open(MESSAGES_FILE, "r", encoding="utf-8") as file_handle:
-            _messages_data = json.load(file_handle)
+            data = json.load(file_handle)
+        _message_catalog = compile_message_catalog(data)
         logger.info("Messages data loaded successfully.")
     except (FileNotFoundError, json.JSONDecodeError) as e:
-        logger.critical(f"ERR_UTIL_001: Critical error loading messages.json: {e}", exc_info=True)
-        # У випадку критичної помилки, ініціалізуємо базовими повідомленнями
-        _messages_data = {
-            "uk": {
-                "generic_user_error": "Вибачте, сталася неочікувана помилка. Будь ласка, спробуйте пізніше.",
-                "generic_user_error_with_contact": "Вибачте, сталася неочікувана помилка. Будь ласка, спробуйте пізніше або зверніться до адміністратора.",
-                "admin_critical_error_notification": "Критична помилка в роботі бота!",
-                "choose_language": "🌐 Оберіть мову / Choose language:",
-                "language_set_success": "✅ Мову встановлено!",
-                "choose_faq_question": "❓ Оберіть питання:",
-                "faq_answer_not_found": "⚠️ Вибачте, відповіді на це питання не знайдено. Спробуйте інше питання або зверніться до адміністратора.",
-                "data_load_error": "⚠️ Вибачте, сталася помилка при завантаженні даних. Будь ласка, спробуйте пізніше.",
-                "no_schedule_available": "Наразі розклад засідань відсутній.",
-                "court_schedule_title": "📅 Розклад засідань:",
-                "case": "Справа",
-                "judge": "Суддя",
-                "no_contacts_available": "Наразі контакти інших установ відсутні.",
-                "other_contacts_title": "📞 Контакти інших установ:",
-                "enter_full_name": "📝 Введіть ПІБ для запису:",
-                "choose_date": "📅 Оберіть дату:",
-                "no_dates_available": "На жаль, доступних дат для запису немає.",
-                "choose_time": "⏰ Оберіть час:",
-                "no_times_available": "На жаль, доступного часу для запису на цю дату немає.",
-                "appointment_booked_success": "✅ Ви успішно записані!",
-                "no_name_provided": "Без імені",
-                "unrecognized_command": "🤷‍♀️ Вибачте, я не зрозумів вашу команду. Будь ласка, оберіть опцію з меню або використайте /start.",
-                "unauthorized_access": "🚫 Вибачте, у вас немає доступу до цієї команди.",
-                "admin_panel_greeting": "Привіт, адміністраторе! Це адмін-панель.",
-                "address": "Адреса",
-                "schedule": "Графік",
-                "phone": "Телефон",
-                "email": "Email",
-                "no_appointments_admin": "Немає записів.",
-                "no_appointments_user": "No appointments yet."
-            },
-            "en": {
-                "generic_user_error": "Sorry, an unexpected error occurred. Please try again later.",
-                "generic_user_error_with_contact": "Sorry, an unexpected error occurred. Please try again later or contact the administrator.",
-                "admin_critical_error_notification": "Critical error in bot operation!",
-                "choose_language": "🌐 Оберіть мову / Choose language:",
-                "language_set_success": "✅ Language set!",
-                "choose_faq_question": "❓ Choose a question:",
-                "faq_answer_not_found": "⚠️ Sorry, no answer found for this question. Try another question or contact the administrator.",
-                "data_load_error": "⚠️ Sorry, there was an error loading data. Please try again later.",
-                "no_schedule_available": "No hearing schedule available at the moment.",
-                "court_schedule_title": "📅 Hearing Schedule:",
-                "case": "Case",
-                "judge": "Judge",
-                "no_contacts_available": "No contacts for other institutions available at the moment.",
-                "other_contacts_title": "📞 Other Institutions Contacts:",
-                "enter_full_name": "📝 Enter full name for appointment:",
-                "choose_date": "📅 Choose a date:",
-                "no_dates_available": "Sorry, no available dates for appointment.",
-                "choose_time": "⏰ Choose a time:",
-                "no_times_available": "Sorry, no available times for this date.",
-                "appointment_booked_success": "✅ You are successfully booked!",
-                "no_name_provided": "No name provided",
-                "unrecognized_command": "🤷‍♀️ Sorry, I didn't understand your command. Please choose an option from the menu or use /start.",
-                "unauthorized_access": "🚫 Sorry, you do not have access to this command.",
-                "admin_panel_greeting": "Hello, admin! This is the admin panel.",
-                "address": "Address",
-                "schedule": "Schedule",
-                "phone": "Phone",
-                "email": "Email",
-                "no_appointments_admin": "No appointments.",
-                "no_appointments_user": "No appointments yet."
-            }
-        }
+        logger.critical("ERR_UTIL_001: Critical error loading messages.json: %s", e, exc_info=True)
+        # У випадку критичної помилки бот відповідає лише загальним повідомленням про помилку
+        _message_catalog = compile_message_catalog(_EMERGENCY_MESSAGES)
     except Exception as ex:
-        logger.critical(f"ERR_UTIL_002: Very critical error during message loading fallback: {ex}", exc_info=True)
-        _messages_data = {
+        logger.critical("ERR_UTIL_002: Very critical error during message loading fallback: %s", ex, exc_info=True)
+        _message_catalog = compile_message_catalog({
             "uk": {"generic_user_error": "System error. Please try again later."},
             "en": {"generic_user_error": "System error. Please try again later."}
-        }
+        })
 
 _load_messages()
 
+def install_message_catalog(catalog: MessageCatalog):
+    """
+    Замінює каталог повідомлень (наприклад, після перезавантаження messages.json).
+
+    Заміна - одне присвоєння, тому обробники бачать або старий, або новий каталог цілком.
+
+    :param catalog: Скомпільований каталог.
+    :type catalog: MessageCatalog
+    """
+    global _message_catalog # pylint: disable=global-statement
+    _message_catalog = catalog
+    _reported_missing_messages.clear()
+
+def get_message_catalog() -> MessageCatalog:
+    """
+    Повертає поточний скомпільований каталог повідомлень.
+
+    Каталог незмінний і замінюється цілком при перезавантаженні messages.json,
+    тому похідні кеші можуть порівнювати його за ідентичністю (``is``).
+
+    :returns: Поточний каталог повідомлень.
+    :rtype: MessageCatalog
+    """
+    return _message_catalog
+
 def load_language_message(lang_code: str, message_key: str) -> str:
     """
     Завантажує локалізоване повідомлення за ключем та кодом мови.
     Повертає повідомлення англійською, якщо українське недоступне, або загальне повідомлення про помилку.
 
+    Пошук - це одне звернення до скомпільованого каталогу; відкат мови
+    розв'язано заздалегідь під час завантаження messages.json.
+
     :param lang_code: Код мови (наприклад, 'uk' або 'en').
     :type lang_code: str
     :param message_key: Ключ повідомлення в словнику повідомлень.
@@ -114,157 +192,328 @@ def load_language_message(lang_code: str, message_key: str) -> str:
     :returns: Локалізоване повідомлення.
     :rtype: str
     """
-    logger.debug(f"Attempting to load message '{message_key}' for language '{lang_code}'.")
-
-    if lang_code not in _messages_data:
-        logger.warning(f"WARN_UTIL_001: Language '{lang_code}' not found in messages data. Falling back to 'en'.")
-        lang_code = 'en'
-
-    message = _messages_data.get(lang_code, {}).get(message_key)
-    if message is None:
+    catalog = _message_catalog
+    message = catalog.entries.get((lang_code, message_key))
+    if message is not None:
+        return message
+
+    if lang_code not in catalog.languages:
+        if ("lang", lang_code) not in _reported_missing_messages:
+            _reported_missing_messages.add(("lang", lang_code))
+            logger.warning(
+                "WARN_UTIL_001: Language '%s' not found in messages data. Falling back to 'en'.", lang_code
+            )
+        lang_code = FALLBACK_MESSAGE_LANGUAGE
+        message = catalog.entries.get((lang_code, message_key))
+        if message is not None:
+            return message
+
+    if ("key", message_key) not in _reported_missing_messages:
+        _reported_missing_messages.add(("key", message_key))
         logger.error(
-            f"ERR_UTIL_003: Message key '{message_key}' not found for language '{lang_code}'. "
-            "Context: load_language_message failure."
+            "ERR_UTIL_003: Message key '%s' not found for language '%s'. "
+            "Context: load_language_message failure.", message_key, lang_code
         )
-        return _messages_data.get(lang_code, {}).get('generic_user_error', "Error: message not found.")
-    return message
+    return catalog.entries.get((lang_code, 'generic_user_error'), "Error: message not found.")
+
+
+def format_message(lang_code: str, message_key: str, **params) -> str:
+    """
+    Повертає локалізоване повідомлення з підставленими параметрами шаблону.
+
+    Шаблони без параметрів повертаються без форматування.
+
+    :param lang_code: Код мови (наприклад, 'uk' або 'en').
+    :type lang_code: str
+    :param message_key: Ключ повідомлення в словнику повідомлень.
+    :type message_key: str
+    :param params: Значення параметрів шаблону.
+    :returns: Відформатоване повідомлення.
+    :rtype: str
+    """
+    template = load_language_message(lang_code, message_key)
+    if (lang_code, message_key) not in _message_catalog.fields:
+        return template
+    try:
+        return template.format_map(params)
+    except (KeyError, IndexError, ValueError) as e:
+        logger.error("ERR_UTIL_016: Failed to format message '%s' (%s): %s", message_key, lang_code, e)
+        return template
 
 
 # --- Функції бота ---
 
-def load_language(user_id: int, correlation_id: str = "N/A") -> str:
+# Сховище мовних налаштувань користувачів (завантажується при першому зверненні)
+_language_store = create_language_store()
+# Сховище записів на консультацію (створюється при першому зверненні)
+_appointment_repository: Optional[AppointmentRepository] = None
+_appointment_repository_lock = threading.Lock()
+
+
+def get_appointment_repository() -> AppointmentRepository:
+    """
+    Повертає сховище записів на консультацію, створюючи його при першому зверненні.
+
+    Тип сховища визначається змінною середовища `APPOINTMENTS_BACKEND`
+    ('sqlite' за замовчуванням або 'json').
+
+    :returns: Сховище записів.
+    :rtype: appointments.AppointmentRepository
+    """
+    global _appointment_repository # pylint: disable=global-statement
+    if _appointment_repository is None:
+        with _appointment_repository_lock:
+            if _appointment_repository is None:
+                _appointment_repository = create_appointment_repository(
+                    capacity=SLOT_CAPACITY_PER_HOUR
+                )
+    return _appointment_repository
+
+
+# Робочі години для запису (обідня перерва о 13:00 виключена)
+APPOINTMENT_HOURS = tuple(hour for hour in range(9, 17) if hour != 13)
+# Кількість днів наперед, на які можна записатися
+BOOKING_WINDOW_DAYS = 14
+
+# Індекс вільних слотів (будується зі сховища записів при першому зверненні)
+_availability_index: Optional[SlotAvailabilityIndex] = None
+_availability_index_lock = threading.Lock()
+
+
+@timed_storage_call("availability_index")
+def get_availability_index() -> SlotAvailabilityIndex:
+    """
+    Повертає індекс вільних слотів, будуючи його при першому зверненні.
+
+    Індекс будується один раз із майбутніх записів у сховищі (минулі дати
+    для бронювання не потрібні) та далі оновлюється функцією :func:`save_appointment`.
+    Місткість слотів задається змінними середовища `SLOT_CAPACITY_PER_HOUR`
+    та `SLOT_CAPACITY_PER_DATE`.
+
+    :returns: Індекс вільних слотів.
+    :rtype: appointments.SlotAvailabilityIndex
+    """
+    global _availability_index # pylint: disable=global-statement
+    if _availability_index is None:
+        with _availability_index_lock:
+            if _availability_index is None:
+                index = SlotAvailabilityIndex()
+                today = str(datetime.now().date())
+                index.rebuild(get_appointment_repository().list_between(today, "9999-12-31"))
+                logger.info("Slot availability index built.")
+                _availability_index = index
+    return _availability_index
+
+
+def is_availability_index_loaded() -> bool:
+    """True, якщо індекс вільних слотів уже побудовано і звернення до нього не читатиме сховище."""
+    return _availability_index is not None
+
+
+def booking_window_dates() -> list:
+    """Повертає робочі дні (понеділок - п'ятниця) вікна бронювання у форматі "YYYY-MM-DD"."""
+    today = datetime.now().date()
+    window = (today + timedelta(days=day_offset) for day_offset in range(BOOKING_WINDOW_DAYS))
+    return [str(current_date) for current_date in window if current_date.weekday() < 5]
+
+
+def working_slots_for_date(selected_date: str) -> list:
+    """Повертає всі робочі часові слоти дати у форматі "YYYY-MM-DD HH:MM"."""
+    return [f"{selected_date} {hour:02d}:00" for hour in APPOINTMENT_HOURS]
+
+
+def is_slot_available(time: str) -> bool:
+    """
+    Перевіряє за O(1), чи є вільне місце у часовому слоті.
+
+    :param time: Часовий слот у форматі "YYYY-MM-DD HH:MM".
+    :type time: str
+    :returns: True, якщо слот ще можна забронювати.
+    :rtype: bool
+    """
+    return get_availability_index().has_capacity(time)
+
+
+@timed_storage_call("load_language")
+def load_language(user_id: int) -> str:
     """
-    Завантажує обрану мову для користувача з файлу languages.json.
-    Повертає 'uk' за замовчуванням у разі помилки або відсутності даних.
+    Повертає обрану мову користувача зі сховища мовних налаштувань.
+    Повертає 'uk' за замовчуванням, якщо користувач ще не обирав мову.
+
+    Пошук виконується у словнику в пам'яті (див. :class:`storage.UserLanguageStore`),
+    тому виклик не читає файли з диска.
 
     :param user_id: Унікальний ідентифікатор користувача Telegram.
     :type user_id: int
-    :param correlation_id: Унікальний ідентифікатор запиту для трасування.
-    :type correlation_id: str
     :returns: Код мови ('uk' або 'en').
     :rtype: str
     """
-    try:
-        with open("languages.json", "r", encoding="utf-8") as file_handle:
-            data = json.load(file_handle)
-        logger.debug(
-            f"[REQ_ID:{correlation_id}] Loaded language '{data.get(str(user_id))}' for user {user_id}."
-        )
-        return data.get(str(user_id), "uk")
-    except (FileNotFoundError, json.JSONDecodeError) as e:
-        logger.warning(
-            f"WARN_UTIL_002 [REQ_ID:{correlation_id}]: Failed to load languages.json for user {user_id}. Error: {e}"
-        )
-        return "uk"
+    return _language_store.get(user_id, "uk")
 
-def set_language(user_id: int, lang: str, correlation_id: str = "N/A"):
+@timed_storage_call("set_language")
+def set_language(user_id: int, lang: str):
     """
-    Зберігає обрану мову для користувача у файлі languages.json.
+    Зберігає обрану мову для користувача у сховищі мовних налаштувань.
 
-    Якщо файл `languages.json` не існує або пошкоджений, він буде створений
-    або перевизначений.
+    Оновлює словник у пам'яті та дописує один рядок у журнал змін,
+    замість перезапису всього файлу з налаштуваннями всіх користувачів.
 
     :param user_id: Унікальний ідентифікатор користувача Telegram.
     :type user_id: int
     :param lang: Код мови для збереження ('uk' або 'en').
     :type lang: str
-    :param correlation_id: Унікальний ідентифікатор запиту для трасування.
-    :type correlation_id: str
     """
-    data = {}
-    try:
-        if os.path.exists("languages.json"):
-            with open("languages.json", "r", encoding="utf-8") as file_handle:
-                data = json.load(file_handle)
-    except json.JSONDecodeError as e:
-        logger.warning(
-            f"WARN_UTIL_003 [REQ_ID:{correlation_id}]: languages.json is corrupted for user {user_id}. "
-            f"Resetting data. Error: {e}"
-        )
-    except FileNotFoundError:
-        logger.info(
-            f"[REQ_ID:{correlation_id}] languages.json not found for user {user_id}. Creating new file."
-        )
-        pass
-
-    data[str(user_id)] = lang
     try:
-        with open("languages.json", "w", encoding="utf-8") as file_handle:
-            json.dump(data, file_handle, ensure_ascii=False, indent=2)
-        logger.debug(f"[REQ_ID:{correlation_id}] Language '{lang}' saved for user {user_id}.")
-    except IOError as e:
+        _language_store.set(user_id, lang)
+        logger.debug("Language '%s' saved for user %s.", lang, user_id)
+    except OSError as e:
         logger.error(
-            f"ERR_UTIL_004 [REQ_ID:{correlation_id}]: Failed to write to languages.json "
-            f"for user {user_id}. Error: {e}", exc_info=True
+            "ERR_UTIL_004: Failed to write language journal "
+            "for user %s. Error: %s", user_id, e, exc_info=True
         )
 
 
-def is_admin(user_id: int, correlation_id: str = "N/A") -> bool:
+# Реєстр адміністраторів (admins.json у пам'яті, див. for_test.admins)
+_admin_registry = AdminRegistry()
+
+
+def get_admin_registry() -> AdminRegistry:
+    """Повертає реєстр адміністраторів процесу."""
+    return _admin_registry
+
+
+@timed_storage_call("is_admin")
+def is_admin(user_id: int) -> bool:
     """
     Перевіряє, чи є користувач адміністратором, згідно з файлом admins.json.
 
-    Читає список ID адміністраторів з `admins.json`. Якщо файл не знайдено
-    або він пошкоджений, повертає False (користувач не є адміністратором).
+    Перевірка - пошук у frozenset у пам'яті; файл перечитується лише після
+    його зміни (див. :class:`for_test.admins.AdminRegistry`). Якщо файл не знайдено,
+    повертає False (користувач не є адміністратором).
 
     :param user_id: Унікальний ідентифікатор користувача Telegram.
     :type user_id: int
-    :param correlation_id: Унікальний ідентифікатор запиту для трасування.
-    :type correlation_id: str
     :returns: True, якщо користувач є адміністратором, False - в іншому випадку.
     :rtype: bool
     """
-    try:
-        with open("admins.json", "r", encoding="utf-8") as file_handle:
-            admins = json.load(file_handle)
-        is_user_admin = user_id in admins
-        logger.debug(f"[REQ_ID:{correlation_id}] User {user_id} is admin: {is_user_admin}.")
-        return is_user_admin
-    except (FileNotFoundError, json.JSONDecodeError) as e:
-        logger.warning(
-            f"WARN_UTIL_004 [REQ_ID:{correlation_id}]: admins.json not found or corrupted. "
-            f"No admins defined. Error: {e}"
+    is_user_admin = user_id in _admin_registry
+    logger.debug("User %s is admin: %s.", user_id, is_user_admin)
+    return is_user_admin
+
+
+# Пошуковий індекс FAQ: (версія faq.json у кеші довідкових даних, індекс)
+_faq_index: Optional[Tuple[int, FaqIndex]] = None
+_faq_index_lock = threading.Lock()
+
+
+def get_faq_index() -> FaqIndex:
+    """
+    Повертає пошуковий індекс FAQ, перебудовуючи його лише після перезавантаження `faq.json`.
+
+    :returns: Індекс питань FAQ усіх мов.
+    :rtype: faq_search.FaqIndex
+    :raises FileNotFoundError: Якщо файл faq.json не знайдено.
+    :raises json.JSONDecodeError: Якщо файл faq.json пошкоджений.
+    """
+    global _faq_index # pylint: disable=global-statement
+    version, data = load_reference_entry("faq.json")
+    cached = _faq_index
+    # Версії лише зростають: індекс новішої версії вже встановлено перезавантаженням вмісту
+    if cached is not None and cached[0] >= version:
+        return cached[1]
+    with _faq_index_lock:
+        if _faq_index is None or _faq_index[0] < version:
+            started = perf_counter()
+            index = FaqIndex(data)
+            logger.info(
+                "FAQ search index built: %d questions in %.1f ms.",
+                sum(len(questions) for questions in data.values()), (perf_counter() - started) * 1000
+            )
+            _faq_index = (version, index)
+        return _faq_index[1]
+
+
+def install_faq_data(signature: Tuple[int, int], data: Any, index: FaqIndex) -> int:
+    """
+    Встановлює перевірений вміст faq.json разом із уже побудованим пошуковим індексом.
+
+    :param signature: (mtime_ns, size) файлу faq.json.
+    :type signature: tuple[int, int]
+    :param data: Розпарсений вміст faq.json.
+    :param index: Індекс, побудований з `data`.
+    :type index: faq_search.FaqIndex
+    :returns: Нова версія даних.
+    :rtype: int
+    """
+    global _faq_index # pylint: disable=global-statement
+    with _faq_index_lock:
+        version = install_reference_data("faq.json", signature, data)
+        _faq_index = (version, index)
+    return version
+
+
+def find_faq_answer(lang: str, question: str) -> Optional[FaqMatch]:
+    """
+    Шукає в FAQ питання, найближче до довільного тексту користувача.
+
+    Текст нормалізується (регістр, апострофи, розділові знаки), питання ранжуються
+    за BM25; слова з іншим закінченням чи друкарською помилкою зіставляються
+    зі схожими словами FAQ. Спершу шукаються питання мови користувача, потім - інших мов.
+
+    :param lang: Код мови ('uk' або 'en').
+    :type lang: str
+    :param question: Текст користувача.
+    :type question: str
+    :returns: Знайдене питання з відповіддю або None.
+    :rtype: faq_search.FaqMatch | None
+    :raises FileNotFoundError: Якщо файл faq.json не знайдено.
+    :raises json.JSONDecodeError: Якщо файл faq.json пошкоджений.
+    """
+    match = get_faq_index().search(question, lang)
+    if match is None:
+        logger.debug("No FAQ question matches '%s' (%s).", question, lang)
+    else:
+        logger.debug(
+            "FAQ question '%s' (%s, score %.2f) matches '%s'.", match.question, match.lang, match.score, question
         )
-        return False
+    return match
 
 
-def get_faq_answer(lang: str, question: str, correlation_id: str = "N/A") -> str:
+def get_faq_answer(lang: str, question: str) -> str:
     """
     Отримує відповідь на питання з файлу faq.json для обраної мови.
 
-    Читає базу питань та відповідей з `faq.json`. Якщо питання не знайдено
-    для вказаної мови або файл пошкоджений, повертає повідомлення про помилку.
+    Шукає питання в пошуковому індексі FAQ (див. :func:`find_faq_answer`), тому
+    текст не мусить точно збігатися з питанням у `faq.json`. Якщо схожого питання
+    не знайдено або файл пошкоджений, повертає повідомлення про помилку.
 
     :param lang: Код мови ('uk' або 'en').
     :type lang: str
     :param question: Текст питання, на яке потрібно знайти відповідь.
     :type question: str
-    :param correlation_id: Унікальний ідентифікатор запиту для трасування.
-    :type correlation_id: str
     :returns: Текст відповіді на питання або повідомлення про помилку.
     :rtype: str
     """
     try:
-        with open("faq.json", "r", encoding="utf-8") as file_handle:
-            data = json.load(file_handle)
-        answer = data[lang].get(question, load_language_message(lang, 'faq_answer_not_found'))
-        logger.debug(
-            f"[REQ_ID:{correlation_id}] FAQ answer for '{question}' ({lang}): '{answer[:50]}...'"
-        )
-        return answer
+        index = get_faq_index()
+        if lang not in index.languages: # Якщо мова не знайдена в файлі FAQ
+            logger.error(
+                "ERR_UTIL_006: Language '%s' not found in faq.json.", lang
+            )
+            return load_language_message(lang, 'data_load_error')
+        match = find_faq_answer(lang, question)
+        if match is None:
+            return load_language_message(lang, 'faq_answer_not_found')
+        return match.answer
     except (FileNotFoundError, json.JSONDecodeError) as e:
         logger.error(
-            f"ERR_UTIL_005 [REQ_ID:{correlation_id}]: Failed to load faq.json for lang '{lang}'. "
-            f"Error: {e}", exc_info=True
-        )
-        return load_language_message(lang, 'data_load_error')
-    except KeyError: # Якщо мова не знайдена в файлі FAQ
-        logger.error(
-            f"ERR_UTIL_006 [REQ_ID:{correlation_id}]: Language '{lang}' not found in faq.json."
+            "ERR_UTIL_005: Failed to load faq.json for lang '%s'. "
+            "Error: %s", lang, e, exc_info=True
         )
         return load_language_message(lang, 'data_load_error')
 
 
-def get_court_info(lang: str, correlation_id: str = "N/A") -> dict:
+def get_court_info(lang: str) -> dict:
     """
     Отримує інформацію про суд з файлу court_info.json для обраної мови.
 
@@ -274,20 +523,17 @@ def get_court_info(lang: str, correlation_id: str = "N/A") -> dict:
 
     :param lang: Код мови ('uk' або 'en').
     :type lang: str
-    :param correlation_id: Унікальний ідентифікатор запиту для трасування.
-    :type correlation_id: str
     :returns: Словник з інформацією про суд (адреса, графік, телефон, email).
     :rtype: dict
     """
     try:
-        with open("court_info.json", "r", encoding="utf-8") as file_handle:
-            data = json.load(file_handle)
-        logger.debug(f"[REQ_ID:{correlation_id}] Loaded court info for language '{lang}'.")
+        data = load_reference_data("court_info.json")
+        logger.debug("Loaded court info for language '%s'.", lang)
         return data[lang]
     except (FileNotFoundError, json.JSONDecodeError) as e:
         logger.error(
-            f"ERR_UTIL_007 [REQ_ID:{correlation_id}]: Failed to load court_info.json for lang '{lang}'. "
-            f"Error: {e}", exc_info=True
+            "ERR_UTIL_007: Failed to load court_info.json for lang '%s'. "
+            "Error: %s", lang, e, exc_info=True
         )
         return {
             "address": load_language_message(lang, 'info_not_available'),
@@ -297,7 +543,8 @@ def get_court_info(lang: str, correlation_id: str = "N/A") -> dict:
         }
     except KeyError:
         logger.error(
-            f"ERR_UTIL_008 [REQ_ID:{correlation_id}]: Language '{lang}' not found in court_info.json."
+            "ERR_UTIL_008: Language '%s' not found in court_info.json.",
+            lang
         )
         return {
             "address": load_language_message(lang, 'info_not_available'),
@@ -307,51 +554,49 @@ def get_court_info(lang: str, correlation_id: str = "N/A") -> dict:
         }
 
 
-def get_available_dates(correlation_id: str = "N/A") -> list:
+@timed_storage_call("get_available_dates")
+def get_available_dates() -> list:
     """
     Генерує список доступних дат для запису (будні дні протягом 14 днів).
 
-    :param correlation_id: Унікальний ідентифікатор запиту для трасування.
-    :type correlation_id: str
+    Повертає лише дати, на які ще є хоча б один вільний слот
+    (за індексом вільних слотів).
+
     :returns: Список доступних дат.
     :rtype: list[str]
     """
-    logger.debug(f"[REQ_ID:{correlation_id}] Generating available dates.")
-    today = datetime.now().date()
-    dates = []
-    for day_offset in range(14):
-        current_date = today + timedelta(days=day_offset)
-        if current_date.weekday() < 5:  # Понеділок (0) - П'ятниця (4)
-            dates.append(str(current_date))
-    return dates
-
-def get_available_times_for_date(selected_date: str, correlation_id: str = "N/A") -> list:
+    logger.debug("Generating available dates.")
+    index = get_availability_index()
+    return [
+        date_str for date_str in booking_window_dates()
+        if index.free_slots(date_str, working_slots_for_date(date_str))
+    ]
+
+@timed_storage_call("get_available_times")
+def get_available_times_for_date(selected_date: str) -> list:
     """
     Генерує список доступних часових слотів для вибраної дати.
-    Виключає обідню перерву (13:00).
+    Виключає обідню перерву (13:00) та слоти, у яких не залишилося вільних місць.
 
     :param selected_date: Вибрана дата у форматі Jamboree-MM-DD.
     :type selected_date: str
-    :param correlation_id: Унікальний ідентифікатор запиту для трасування.
-    :type correlation_id: str
     :returns: Список доступних часових слотів у форматі "YYYY-MM-DD HH:MM".
     :rtype: list[str]
     """
-    logger.debug(f"[REQ_ID:{correlation_id}] Generating available times for date: {selected_date}.")
-    times = []
-    for hour in range(9, 17):
-        if hour == 13:
-            continue
-        times.append(f"{selected_date} {hour:02d}:00")
-    return times
+    logger.debug("Generating available times for date: %s.", selected_date)
+    return get_availability_index().free_slots(selected_date, working_slots_for_date(selected_date))
 
-def save_appointment(user_id: int, name: str, time: str, correlation_id: str = "N/A"):
+@timed_storage_call("save_appointment")
+def save_appointment(user_id: int, name: str, time: str) -> bool:
     """
-    Зберігає інформацію про запис на консультацію до файлу appointments.json.
+    Зберігає інформацію про запис на консультацію у сховищі записів.
 
-    Додає новий запис (user_id, ПІБ, дата та час) до існуючого списку записів.
-    Якщо файл `appointments.json` не існує або пошкоджений, він буде створений
-    або перевизначений.
+    Додає новий запис (user_id, ПІБ, дата та час) через сховище, обране
+    змінною середовища `APPOINTMENTS_BACKEND` (SQLite або appointments.json).
+    Кількість записів на один слот обмежена `SLOT_CAPACITY_PER_HOUR`, а на один
+    день - `SLOT_CAPACITY_PER_DATE`; обидві межі перевіряє саме сховище разом
+    із вставкою, тому їх не обійдуть ні одночасні обробники, ні інші процеси.
+    Після успішного збереження оновлюється індекс вільних слотів.
 
     :param user_id: Унікальний ідентифікатор користувача Telegram.
     :type user_id: int
@@ -359,131 +604,206 @@ def save_appointment(user_id: int, name: str, time: str, correlation_id: str = "
     :type name: str
     :param time: Вибраний час запису у форматі "YYYY-MM-DD HH:MM".
     :type time: str
-    :param correlation_id: Унікальний ідентифікатор запиту для трасування.
-    :type correlation_id: str
+    :returns: True, якщо запис збережено, False - якщо слот або день уже заповнені.
+    :rtype: bool
+    :raises OSError: Якщо не вдалося записати appointments.json.
+    :raises sqlite3.Error: Якщо не вдалося записати до бази даних.
     """
-    data = []
-    try:
-        if os.path.exists("appointments.json"):
-            with open("appointments.json", "r", encoding="utf-8") as file_handle:
-                data = json.load(file_handle)
-    except json.JSONDecodeError as e:
-        logger.warning(
-            f"WARN_UTIL_005 [REQ_ID:{correlation_id}]: appointments.json is corrupted for user {user_id}. "
-            f"Resetting data. Error: {e}"
-        )
-    except FileNotFoundError:
-        logger.info(
-            f"[REQ_ID:{correlation_id}] appointments.json not found for user {user_id}. Creating new file."
-        )
-        pass
-
-    data.append({"user_id": user_id, "name": name, "time": time})
     try:
-        with open("appointments.json", "w", encoding="utf-8") as file_handle:
-            json.dump(data, file_handle, ensure_ascii=False, indent=2)
-        logger.info(
-            f"[REQ_ID:{correlation_id}] Appointment saved for user {user_id}: {name} on {time}."
+        saved = get_appointment_repository().add(
+            user_id, name, time, SLOT_CAPACITY_PER_HOUR, SLOT_CAPACITY_PER_DATE
         )
-    except IOError as e:
+    except (OSError, sqlite3.Error) as e:
         logger.error(
-            f"ERR_UTIL_009 [REQ_ID:{correlation_id}]: Failed to write to appointments.json "
-            f"for user {user_id}. Error: {e}", exc_info=True
+            "ERR_UTIL_009: Failed to save appointment "
+            "for user %s. Error: %s", user_id, e, exc_info=True
+        )
+        raise
+    if not saved:
+        logger.warning(
+            "WARN_UTIL_005: Slot %s or its date is already full. "
+            "Appointment for user %s was not saved.", time, user_id
         )
+        # Слот чи день міг заповнити інший процес-обробник - оновлюємо індекс для цієї дати
+        date = time[:10]
+        get_availability_index().refresh_date(date, get_appointment_repository().list_between(date, date))
+        return False
+    get_availability_index().add(time)
+    logger.info(
+        "Appointment saved for user %s: %s on %s.", user_id, name, time
+    )
+    return True
+
 
+# --- Асинхронний доступ до даних ---
 
-def get_appointments_for_admin(correlation_id: str = "N/A") -> str:
+# Обмежений пул потоків для блокуючого введення-виведення (файли, SQLite)
+IO_THREAD_POOL_SIZE = int(os.environ.get("IO_THREAD_POOL_SIZE", "4"))
+_io_executor = ThreadPoolExecutor(max_workers=IO_THREAD_POOL_SIZE, thread_name_prefix="bot-io")
+
+
+async def run_blocking(func: Callable, *args, **kwargs) -> Any:
+    """
+    Виконує блокуючу функцію в пулі потоків введення-виведення та очікує результат.
+
+    :param func: Синхронна функція, яку потрібно виконати.
+    :type func: Callable
+    :returns: Результат виклику функції.
+    :rtype: Any
     """
-    Отримує відформатований список всіх записів для адміністратора.
+    loop = asyncio.get_running_loop()
+    # Копіюємо контекст, щоб записи логу з пулу потоків мали ідентифікатор кореляції оновлення
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(_io_executor, functools.partial(context.run, func, *args, **kwargs))
 
-    Читає всі записи з `appointments.json` та повертає їх у вигляді
-    одного рядка, де кожен запис відображений на новому рядку.
 
-    :param correlation_id: Унікальний ідентифікатор запиту для трасування.
-    :type correlation_id: str
-    :returns: Рядок з усіма записами або повідомлення про їх відсутність.
-    :rtype: str
+def shutdown_io_executor():
+    """Дочікується завершення поточних операцій введення-виведення та зупиняє пул потоків."""
+    _io_executor.shutdown(wait=True)
+
+
+async def load_reference_data_async(file_name: str) -> Any:
+    """Асинхронний відповідник :func:`load_reference_data`."""
+    return await run_blocking(load_reference_data, file_name)
+
+
+async def load_language_async(user_id: int) -> str:
     """
-    try:
-        with open("appointments.json", "r", encoding="utf-8") as file_handle:
-            data = json.load(file_handle)
-        if not data:
-            logger.info(f"[REQ_ID:{correlation_id}] No appointments found for admin request.")
-            return load_language_message('uk', 'no_appointments_admin')
-        logger.debug(f"[REQ_ID:{correlation_id}] Appointments data retrieved for admin.")
-        return "\n".join([f"— {record['name']}, {record['time']}" for record in data])
-    except (FileNotFoundError, json.JSONDecodeError) as e:
-        logger.error(
-            f"ERR_UTIL_010 [REQ_ID:{correlation_id}]: Failed to load appointments.json for admin. "
-            f"Error: {e}", exc_info=True
-        )
-        return load_language_message('uk', 'data_load_error')
+    Асинхронний відповідник :func:`load_language`.
 
-def get_appointments_for_user(correlation_id: str = "N/A") -> str:
+    Коли сховище мов уже завантажене, пошук виконується одразу в пам'яті,
+    без переходу в пул потоків.
     """
-    Отримує відформатований список записів для конкретного користувача.
+    if _language_store.is_loaded:
+        return load_language(user_id)
+    return await run_blocking(load_language, user_id)
 
-    (Ця функція була у вихідному коді, але наразі не використовується
-    безпосередньо в обробниках бота для відображення користувачеві його власних записів.
-    Повертає загальний список зайнятих часів, як у вихідному коді.)
 
-    :param correlation_id: Унікальний ідентифікатор запиту для трасування.
-    :type correlation_id: str
-    :returns: Рядок з усіма зайнятими часами або повідомлення про їх відсутність.
-    :rtype: str
+async def set_language_async(user_id: int, lang: str):
+    """Асинхронний відповідник :func:`set_language`."""
+    await run_blocking(set_language, user_id, lang)
+
+
+async def is_admin_async(user_id: int) -> bool:
     """
-    try:
-        with open("appointments.json", "r", encoding="utf-8") as file_handle:
-            data = json.load(file_handle)
-        logger.debug(f"[REQ_ID:{correlation_id}] Appointments data retrieved for user (all).")
-        # Тут можна було б додати фільтрацію по user_id
-        return "\n".join([f"— {record['time']} ❌ Зайнято" for record in data])
-    except (FileNotFoundError, json.JSONDecodeError) as e:
-        logger.error(
-            f"ERR_UTIL_011 [REQ_ID:{correlation_id}]: Failed to load appointments.json for user. "
-            f"Error: {e}", exc_info=True
-        )
-        return load_language_message('uk', 'no_appointments_user')
+    Асинхронний відповідник :func:`is_admin`.
+
+    Поки реєстр адміністраторів не потребує перевірки файлу, відповідь повертається одразу з пам'яті.
+    """
+    if _admin_registry.is_fresh():
+        return is_admin(user_id)
+    return await run_blocking(is_admin, user_id)
 
 
-async def send_admin_notification(bot_instance, message: str, user_info: dict = None):
+async def add_admin_async(user_id: int) -> bool:
+    """Асинхронний відповідник :meth:`for_test.admins.AdminRegistry.add`."""
+    return await run_blocking(_admin_registry.add, user_id)
+
+
+async def remove_admin_async(user_id: int) -> bool:
+    """Асинхронний відповідник :meth:`for_test.admins.AdminRegistry.remove`."""
+    return await run_blocking(_admin_registry.remove, user_id)
+
+
+async def get_faq_answer_async(lang: str, question: str) -> str:
+    """Асинхронний відповідник :func:`get_faq_answer`."""
+    return await run_blocking(get_faq_answer, lang, question)
+
+
+async def find_faq_answer_async(lang: str, question: str) -> Optional[FaqMatch]:
+    """Асинхронний відповідник :func:`find_faq_answer`."""
+    return await run_blocking(find_faq_answer, lang, question)
+
+
+async def get_court_info_async(lang: str) -> dict:
     """
-    Надсилає повідомлення про критичну помилку адміністраторам бота.
-    Читає ID адміністраторів з файлу admins.json.
+    Асинхронний відповідник :func:`get_court_info`.
 
-    :param bot_instance: Екземпляр бота (context.bot).
-    :param message: Текст повідомлення для адміністратора.
-    :type message: str
-    :param user_info: Словник з інформацією про користувача (id, username, correlation_id).
-                      Може бути None.
-    :type user_info: dict
+    Коли court_info.json уже в пам'яті (див. :mod:`for_test.content`), відповідь повертається одразу.
     """
-    try:
-        with open("admins.json", "r", encoding="utf-8") as file_handle:
-            admins = json.load(file_handle)
-        if not admins:
-            logger.warning("WARN_UTIL_006: No admin IDs found in admins.json. Cannot send notification.")
-            return
+    if is_reference_in_memory("court_info.json"):
+        return get_court_info(lang)
+    return await run_blocking(get_court_info, lang)
 
-        admin_notification_text = load_language_message('uk', 'admin_critical_error_notification')
 
-        # Додаємо контекстну інформацію про користувача, якщо вона надана
-        context_info = ""
-        if user_info:
-            context_info += f"\nКористувач: {user_info.get('username', 'N/A')} ({user_info.get('user_id', 'N/A')})"
-            context_info += f"\nREQ_ID: {user_info.get('correlation_id', 'N/A')}"
-            context_info += f"\nПовідомлення користувачу: {user_info.get('user_friendly_message', 'N/A')}"
+async def get_available_dates_async() -> list:
+    """Асинхронний відповідник :func:`get_available_dates`."""
+    return await run_blocking(get_available_dates)
 
-        full_message = f"{admin_notification_text}{context_info}\n\nДеталі помилки:\n{message}"
 
-        for admin_id in admins:
-            try:
-                await bot_instance.send_message(chat_id=admin_id, text=full_message)
-                logger.info(f"Sent critical error notification to admin {admin_id}.")
-            except Exception as e:
-                logger.error(f"ERR_UTIL_012: Failed to send notification to admin {admin_id}. Error: {e}", exc_info=True)
-    except (FileNotFoundError, json.JSONDecodeError) as e:
-        logger.critical(f"ERR_UTIL_013: Critical: Cannot load admins.json to send notification. Error: {e}", exc_info=True)
-    except Exception as e:
-        logger.critical(f"ERR_UTIL_014: Unexpected error in send_admin_notification: {e}", exc_info=True)
+async def get_available_times_for_date_async(selected_date: str) -> list:
+    """Асинхронний відповідник :func:`get_available_times_for_date`."""
+    return await run_blocking(get_available_times_for_date, selected_date)
+
 
+async def is_slot_available_async(time: str) -> bool:
+    """
+    Асинхронний відповідник :func:`is_slot_available`.
+
+    Коли індекс вільних слотів уже побудований, перевірка виконується одразу в пам'яті.
+    """
+    if _availability_index is not None:
+        return is_slot_available(time)
+    return await run_blocking(is_slot_available, time)
+
+
+async def save_appointment_async(user_id: int, name: str, time: str) -> bool:
+    """Асинхронний відповідник :func:`save_appointment`."""
+    return await run_blocking(save_appointment, user_id, name, time)
+
+
+async def load_admin_ids_async() -> FrozenSet[int]:
+    """
+    Повертає ID адміністраторів з реєстру в пам'яті (файл перевіряється у пулі потоків, лише коли настав час).
+
+    :rtype: frozenset[int]
+    """
+    if _admin_registry.is_fresh():
+        return _admin_registry.ids()
+    return await run_blocking(_admin_registry.ids)
+
+
+# --- Моніторинг затримки циклу подій ---
+
+# Затримка (у мілісекундах), після якої в лог пишеться попередження
+EVENT_LOOP_LAG_WARN_MS = float(os.environ.get("EVENT_LOOP_LAG_WARN_MS", "100"))
+_event_loop_lag_stats: Dict[str, float] = {"last_ms": 0.0, "max_ms": 0.0, "total_ms": 0.0, "samples": 0}
+
+
+async def monitor_event_loop_lag(interval: float = 0.5):
+    """
+    Фонове завдання, яке вимірює затримку циклу подій asyncio.
+
+    Кожні `interval` секунд завдання засинає і вимірює, наскільки пізніше
+    за очікуване воно прокинулося. Ця різниця - час, протягом якого цикл
+    подій був зайнятий блокуючим кодом і не міг обробляти інші оновлення.
+
+    :param interval: Інтервал між вимірюваннями (секунди).
+    :type interval: float
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        started = loop.time()
+        await asyncio.sleep(interval)
+        lag_ms = max(0.0, loop.time() - started - interval) * 1000
+        _event_loop_lag_stats["last_ms"] = lag_ms
+        _event_loop_lag_stats["max_ms"] = max(_event_loop_lag_stats["max_ms"], lag_ms)
+        _event_loop_lag_stats["total_ms"] += lag_ms
+        _event_loop_lag_stats["samples"] += 1
+        if lag_ms > EVENT_LOOP_LAG_WARN_MS:
+            logger.warning("WARN_UTIL_007: Event loop was blocked for %.1f ms.", lag_ms)
+
+
+def get_event_loop_lag_stats() -> Dict[str, float]:
+    """
+    Повертає статистику затримки циклу подій.
+
+    :returns: Словник з ключами 'last_ms', 'max_ms', 'avg_ms' та 'samples'.
+    :rtype: dict
+    """
+    stats = dict(_event_loop_lag_stats)
+    samples = stats.pop("samples")
+    total_ms = stats.pop("total_ms")
+    stats["avg_ms"] = total_ms / samples if samples else 0.0
+    stats["samples"] = samples
+    return stats